@@ -0,0 +1,69 @@
+"""create stock movements
+
+Revision ID: a41c7e2d9b10
+Revises: 7034fbe2fbfd
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a41c7e2d9b10"
+down_revision: Union[str, None] = "7034fbe2fbfd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_stock_movements_id"), "stock_movements", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_stock_movements_order_id"),
+        "stock_movements",
+        ["order_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_stock_movements_product_id_id",
+        "stock_movements",
+        ["product_id", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_stock_movements_created_at",
+        "stock_movements",
+        ["created_at"],
+        unique=False,
+    )
+
+    # Abre o livro com o estoque atual de cada produto
+    op.execute(
+        "INSERT INTO stock_movements (product_id, quantity, reason, created_at) "
+        "SELECT id, stock, 'snapshot', CURRENT_TIMESTAMP FROM products"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_stock_movements_created_at", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_product_id_id", table_name="stock_movements")
+    op.drop_index(op.f("ix_stock_movements_order_id"), table_name="stock_movements")
+    op.drop_index(op.f("ix_stock_movements_id"), table_name="stock_movements")
+    op.drop_table("stock_movements")
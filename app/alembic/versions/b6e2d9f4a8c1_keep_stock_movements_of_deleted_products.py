@@ -0,0 +1,61 @@
+"""keep stock movements of deleted products
+
+Revision ID: b6e2d9f4a8c1
+Revises: e3f9b2d7c1a4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e2d9f4a8c1"
+down_revision: Union[str, None] = "e3f9b2d7c1a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A chave estrangeira foi criada sem nome: no Postgres ela tem o nome padrão;
+# no SQLite o batch recria a tabela e a convenção dá nome à refletida
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"
+}
+
+
+def _replace_product_fk(ondelete: str, nullable: bool, snapshot: bool):
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    fk_name = (
+        "fk_stock_movements_product_id_products"
+        if sqlite
+        else "stock_movements_product_id_fkey"
+    )
+    with op.batch_alter_table(
+        "stock_movements", naming_convention=NAMING_CONVENTION
+    ) as batch_op:
+        if snapshot:
+            batch_op.add_column(sa.Column("product_snapshot", sa.Text(), nullable=True))
+        else:
+            batch_op.drop_column("product_snapshot")
+        batch_op.alter_column(
+            "product_id", existing_type=sa.Integer(), nullable=nullable
+        )
+        batch_op.drop_constraint(fk_name, type_="foreignkey")
+        batch_op.create_foreign_key(
+            fk_name, "products", ["product_id"], ["id"], ondelete=ondelete
+        )
+
+
+# O livro de estoque sobrevive à exclusão do produto: a chave estrangeira
+# passa de CASCADE para SET NULL e a movimentação de exclusão guarda um
+# retrato do produto
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_product_fk("SET NULL", nullable=True, snapshot=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM stock_movements WHERE product_id IS NULL")
+    _replace_product_fk("CASCADE", nullable=False, snapshot=False)
@@ -0,0 +1,44 @@
+"""add stock alert indexes
+
+Revision ID: c5d2f8a1e3b7
+Revises: a41c7e2d9b10
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d2f8a1e3b7"
+down_revision: Union[str, None] = "a41c7e2d9b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_products_stock"), "products", ["stock"], unique=False)
+    op.create_index(
+        op.f("ix_products_expiration_date"),
+        "products",
+        ["expiration_date"],
+        unique=False,
+    )
+    op.create_table(
+        "scan_states",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("last_movement_id", sa.Integer(), nullable=False),
+        sa.Column("expiring_until", sa.Date(), nullable=True),
+        sa.Column("scanned_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("scan_states")
+    op.drop_index(op.f("ix_products_expiration_date"), table_name="products")
+    op.drop_index(op.f("ix_products_stock"), table_name="products")
@@ -0,0 +1,40 @@
+"""add open order status indexes
+
+Revision ID: d8c4e1f7a2b6
+Revises: f1a8d6c3b5e9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d8c4e1f7a2b6"
+down_revision: Union[str, None] = "f1a8d6c3b5e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATUSES = ("pending", "paid", "shipped")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for status in OPEN_STATUSES:
+        where = sa.text(f"status = '{status}'")
+        op.create_index(
+            f"ix_orders_{status}_created_at",
+            "orders",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_where=where,
+            sqlite_where=where,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for status in reversed(OPEN_STATUSES):
+        op.drop_index(f"ix_orders_{status}_created_at", table_name="orders")
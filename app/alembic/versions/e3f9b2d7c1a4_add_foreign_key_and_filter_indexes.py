@@ -0,0 +1,41 @@
+"""add foreign key and filter indexes
+
+Revision ID: e3f9b2d7c1a4
+Revises: d8c4e1f7a2b6
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f9b2d7c1a4"
+down_revision: Union[str, None] = "d8c4e1f7a2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Chaves estrangeiras sem índice (carregar os itens de um pedido, ou checar o
+# que referencia um produto, virava varredura completa) e filtros da listagem
+# de produtos
+INDEXES = (
+    ("orders", "client_id"),
+    ("orders", "created_by"),
+    ("order_products", "order_id"),
+    ("order_products", "product_id"),
+    ("products", "section"),
+    ("products", "price"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in INDEXES:
+        op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(INDEXES):
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
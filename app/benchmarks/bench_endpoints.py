@@ -0,0 +1,506 @@
+"""Suíte de benchmark das rotas de auth, clientes, produtos e pedidos.
+
+Popula o banco com volumes realistas (por padrão 10k clientes, 100k produtos
+e 1M itens de pedido) e mede, para cada rota, vazão, p50/p99 e número médio
+de queries por requisição. O resultado pode ser salvo como baseline em JSON
+e comparado depois: qualquer rota com p50/p99 acima do limite percentual, ou
+com mais queries que o baseline, é uma regressão (código de saída 1).
+
+O banco é populado por app.tools.seed e reaproveitado entre execuções se já
+estiver na mesma escala. Para medir em PostgreSQL, defina DATABASE_URL.
+
+Uso:
+  python -m app.benchmarks.bench_endpoints --scale full --save baseline.json
+  python -m app.benchmarks.bench_endpoints --scale full --compare baseline.json --threshold 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.main import app
+from app.db.database import SessionLocal, engine
+from app.models import Client, Order, OrderProduct, Product, User
+from app.services.auth_service import generate_tokens
+from app.tools.seed import SECTIONS, generate
+
+SCALES = {
+    "tiny": {"clients": 100, "products": 1_000, "order_lines": 10_000},
+    "small": {"clients": 1_000, "products": 10_000, "order_lines": 100_000},
+    "full": {"clients": 10_000, "products": 100_000, "order_lines": 1_000_000},
+}
+SCALE_USERS = 1_000
+LINES_PER_ORDER = 3
+USER_ORDERS = 50  # tamanho do histórico do usuário comum medido
+PASSWORD = "bench123"
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
+
+# Popula pelo gerador de app.tools.seed; reaproveita o banco já populado
+def seed(scale: dict, seed: int):
+    with engine.begin() as conn:
+        lines = conn.execute(select(func.count(OrderProduct.id))).scalar()
+        if lines:
+            if lines < scale["order_lines"]:
+                sys.exit("Banco populado em outra escala: apague-o e rode de novo")
+            return
+        print("Populando o banco...", flush=True)
+        start = time.perf_counter()
+        generate(
+            conn,
+            users=SCALE_USERS,
+            clients=scale["clients"],
+            products=scale["products"],
+            orders=scale["order_lines"] // LINES_PER_ORDER,
+            lines_per_order=LINES_PER_ORDER,
+            seed=seed,
+            password=PASSWORD,
+            log=lambda message: None,
+        )
+    print(f"Banco populado em {time.perf_counter() - start:.0f}s", flush=True)
+
+
+class Case:
+    # requests: função (i) -> (método, url, kwargs); prepare: roda antes, sem medir
+    def __init__(self, name, requests, repeat=None, prepare=None):
+        self.name = name
+        self.requests = requests
+        self.repeat = repeat
+        self.prepare = prepare
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def fresh_sessions(db, user, n: int) -> list:
+    return [generate_tokens(db, user) for _ in range(n)]
+
+
+def build_cases(client: TestClient, rng: random.Random, repeat: int) -> list:
+    db = SessionLocal()
+    admin = db.query(User).filter(User.is_admin == 1).order_by(User.id).first()
+    # Usuário comum com o histórico mais próximo de USER_ORDERS pedidos
+    order_count = func.count(Order.id)
+    user = (
+        db.query(User)
+        .join(Order, Order.created_by == User.id)
+        .filter(User.is_admin == 0)
+        .group_by(User.id)
+        .order_by(func.abs(order_count - USER_ORDERS), User.id)
+        .first()
+    )
+    admin_headers = bearer(generate_tokens(db, admin)[0])
+    user_headers = bearer(generate_tokens(db, user)[0])
+    client_ids = db.execute(select(Client.id).limit(1000)).scalars().all()
+    product_ids = db.execute(select(Product.id).limit(1000)).scalars().all()
+    user_orders = (
+        db.execute(select(Order.id).where(Order.created_by == user.id)).scalars().all()
+    )
+    bcrypt_repeat = min(repeat, 20)
+    state = {}
+
+    def new_client_payload():
+        n = uuid.uuid4().int
+        return {
+            "name": "Cliente Bench",
+            "email": f"{n}@bench.com",
+            "cpf": f"{n % 10**11:011d}",
+        }
+
+    def new_product_payload():
+        return {
+            "description": "Produto Bench",
+            "price": 10.0,
+            "barcode": uuid.uuid4().hex,
+            "section": "Roupas",
+            "stock": 1000,
+            "image_base64": VALID_IMAGE,
+        }
+
+    def new_order_payload():
+        return {
+            "client_id": rng.choice(client_ids),
+            "products": [
+                {"product_id": product_id, "quantity": 1}
+                for product_id in rng.sample(product_ids, LINES_PER_ORDER)
+            ],
+        }
+
+    # Recursos descartáveis para as rotas de exclusão e de sessão
+    def prepare_users(n):
+        emails = [f"{uuid.uuid4()}@bench.com" for _ in range(n)]
+        db.execute(
+            insert(User),
+            [{"email": e, "hashed_password": admin.hashed_password} for e in emails],
+        )
+        db.commit()
+        users = db.query(User).filter(User.email.in_(emails)).all()
+        state["deletable_users"] = [bearer(generate_tokens(db, u)[0]) for u in users]
+
+    def prepare_created(key, path, payload, headers, n):
+        state[key] = [
+            client.post(path, json=payload(), headers=headers).json()["id"]
+            for _ in range(n)
+        ]
+
+    def prepare_image():
+        response = client.post(
+            "/products/", json=new_product_payload(), headers=admin_headers
+        )
+        state["image"] = os.path.basename(response.json()["image_path"])
+
+    cases = [
+        # auth_route
+        Case(
+            "POST /auth/register",
+            lambda i: (
+                "POST",
+                "/auth/register",
+                {"json": {"email": f"{uuid.uuid4()}@bench.com", "password": PASSWORD}},
+            ),
+            bcrypt_repeat,
+        ),
+        Case(
+            "POST /auth/login",
+            lambda i: (
+                "POST",
+                "/auth/login",
+                {"data": {"username": user.email, "password": PASSWORD}},
+            ),
+            bcrypt_repeat,
+        ),
+        Case(
+            "POST /auth/refresh",
+            lambda i: ("POST", "/auth/refresh", {"json": state["sessions"][i][1]}),
+            prepare=lambda n: state.update(sessions=fresh_sessions(db, user, n)),
+        ),
+        Case(
+            "POST /auth/logout",
+            lambda i: (
+                "POST",
+                "/auth/logout",
+                {"headers": bearer(state["logouts"][i][0])},
+            ),
+            prepare=lambda n: state.update(logouts=fresh_sessions(db, user, n)),
+        ),
+        Case(
+            "DELETE /auth/delete",
+            lambda i: (
+                "DELETE",
+                "/auth/delete",
+                {"headers": state["deletable_users"][i]},
+            ),
+            prepare=prepare_users,
+        ),
+        # client_route
+        Case(
+            "GET /clients/",
+            lambda i: ("GET", "/clients/", {"headers": user_headers}),
+        ),
+        Case(
+            "POST /clients/",
+            lambda i: (
+                "POST",
+                "/clients/",
+                {"json": new_client_payload(), "headers": admin_headers},
+            ),
+        ),
+        Case(
+            "GET /clients/{id}",
+            lambda i: (
+                "GET",
+                f"/clients/{rng.choice(client_ids)}",
+                {"headers": user_headers},
+            ),
+        ),
+        Case(
+            "PUT /clients/{id}",
+            lambda i: (
+                "PUT",
+                f"/clients/{rng.choice(client_ids)}",
+                {"json": {"name": f"Cliente {i}"}, "headers": admin_headers},
+            ),
+        ),
+        Case(
+            "DELETE /clients/{id}",
+            lambda i: (
+                "DELETE",
+                f"/clients/{state['clients'][i]}",
+                {"headers": admin_headers},
+            ),
+            prepare=lambda n: prepare_created(
+                "clients", "/clients/", new_client_payload, admin_headers, n
+            ),
+        ),
+        # product_route
+        Case(
+            "GET /products/",
+            lambda i: ("GET", "/products/", {"headers": user_headers}),
+        ),
+        Case(
+            "GET /products/?section&available",
+            lambda i: (
+                "GET",
+                f"/products/?section={rng.choice(SECTIONS)}&available=true",
+                {"headers": user_headers},
+            ),
+        ),
+        Case(
+            "POST /products/",
+            lambda i: (
+                "POST",
+                "/products/",
+                {"json": new_product_payload(), "headers": admin_headers},
+            ),
+        ),
+        Case(
+            "GET /products/{id}",
+            lambda i: (
+                "GET",
+                f"/products/{rng.choice(product_ids)}",
+                {"headers": user_headers},
+            ),
+        ),
+        Case(
+            "PUT /products/{id}",
+            lambda i: (
+                "PUT",
+                f"/products/{rng.choice(product_ids)}",
+                {"json": {"price": 10.0 + i}, "headers": admin_headers},
+            ),
+        ),
+        Case(
+            "DELETE /products/{id}",
+            lambda i: (
+                "DELETE",
+                f"/products/{state['products'][i]}",
+                {"headers": admin_headers},
+            ),
+            prepare=lambda n: prepare_created(
+                "products", "/products/", new_product_payload, admin_headers, n
+            ),
+        ),
+        Case(
+            "GET /products/images/{file}",
+            lambda i: ("GET", f"/products/images/{state['image']}", {}),
+            prepare=lambda n: prepare_image(),
+        ),
+        # order_route
+        Case(
+            "POST /orders/",
+            lambda i: (
+                "POST",
+                "/orders/",
+                {"json": new_order_payload(), "headers": user_headers},
+            ),
+        ),
+        Case(
+            "GET /orders/ (usuário)",
+            lambda i: ("GET", "/orders/", {"headers": user_headers}),
+        ),
+        Case(
+            "GET /orders/ (admin, fields=id,status)",
+            lambda i: ("GET", "/orders/?fields=id,status", {"headers": admin_headers}),
+            min(repeat, 3),
+        ),
+        Case(
+            "GET /orders/?ids",
+            lambda i: (
+                "GET",
+                "/orders/?ids=" + ",".join(map(str, user_orders[:20])),
+                {"headers": user_headers},
+            ),
+        ),
+        Case(
+            "GET /orders/{id}",
+            lambda i: (
+                "GET",
+                f"/orders/{rng.choice(user_orders)}",
+                {"headers": user_headers},
+            ),
+        ),
+        Case(
+            "PUT /orders/{id}",
+            lambda i: (
+                "PUT",
+                f"/orders/{rng.choice(user_orders)}",
+                {"json": {"status": "paid"}, "headers": user_headers},
+            ),
+        ),
+        Case(
+            "DELETE /orders/{id}",
+            lambda i: (
+                "DELETE",
+                f"/orders/{state['orders'][i]}",
+                {"headers": user_headers},
+            ),
+            prepare=lambda n: prepare_created(
+                "orders", "/orders/", new_order_payload, user_headers, n
+            ),
+        ),
+        Case(
+            "DELETE /orders/?ids",
+            lambda i: (
+                "DELETE",
+                "/orders/?ids=" + ",".join(map(str, state["bulk"][i * 5 : i * 5 + 5])),
+                {"headers": admin_headers},
+            ),
+            prepare=lambda n: prepare_created(
+                "bulk", "/orders/", new_order_payload, admin_headers, n * 5
+            ),
+        ),
+    ]
+
+    # Aquece conexões e caches antes de medir
+    for _ in range(5):
+        client.get("/products/", headers=user_headers)
+    return cases, db
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run_case(client: TestClient, case: Case, repeat: int) -> dict:
+    n = case.repeat or repeat
+    if case.prepare:
+        case.prepare(n)
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    latencies = []
+    errors = 0
+    event.listen(Engine, "before_cursor_execute", count_query)
+    try:
+        for i in range(n):
+            method, url, kwargs = case.requests(i)
+            start = time.perf_counter()
+            response = client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_query)
+
+    return {
+        "requests": n,
+        "rps": round(n / sum(latencies), 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "queries": round(queries / n, 2),
+        "errors": errors,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            limit = previous[metric] * (1 + threshold / 100)
+            if current[metric] > limit:
+                change = (current[metric] / previous[metric] - 1) * 100
+                regressions.append(
+                    f"{name}: {metric} {previous[metric]} -> {current[metric]} "
+                    f"(+{change:.0f}%)"
+                )
+        # Meia query por requisição de folga: syncs periódicos (revogação,
+        # token_version) entram na média sem ser regressão
+        if current["queries"] >= previous["queries"] + 0.5:
+            regressions.append(
+                f"{name}: queries {previous['queries']} -> {current['queries']}"
+            )
+        # Rota que passou a falhar costuma ficar mais rápida: erro novo ou a
+        # mais que no baseline também é regressão
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(
+                f"{name}: errors {previous.get('errors', 0)} -> {current['errors']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="full")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="roda só as rotas que contêm este texto")
+    parser.add_argument("--save", help="grava os resultados neste JSON")
+    parser.add_argument("--compare", help="compara com este JSON de baseline")
+    parser.add_argument("--threshold", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed(SCALES[args.scale], args.seed)
+    client = TestClient(app)
+    cases, db = build_cases(client, rng, args.requests)
+
+    results = {}
+    print(f"{'rota':<40}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}")
+    for case in cases:
+        if args.only and args.only not in case.name:
+            continue
+        result = run_case(client, case, args.requests)
+        results[case.name] = result
+        errors = f"  ({result['errors']} erros)" if result["errors"] else ""
+        print(
+            f"{case.name:<40}{result['rps']:>9.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['queries']:>9.2f}{errors}",
+            flush=True,
+        )
+    db.close()
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "requests": args.requests,
+            "database": os.environ["DATABASE_URL"].split(":")[0],
+            "python": platform.python_version(),
+            "date": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\nRegressões acima de {args.threshold:.0f}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.threshold:.0f}%.")
+
+
+if __name__ == "__main__":
+    main()
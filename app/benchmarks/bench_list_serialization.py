@@ -0,0 +1,106 @@
+"""Serialização das listagens: caminho antigo x caminho otimizado.
+
+Antes: cada objeto do ORM é validado no `response_model`, convertido em dict
+(`model_dump(mode="json")`) e codificado com o `json` da biblioteca padrão,
+como faz o `JSONResponse` do FastAPI.
+Depois: `TypeAdapter(List[...])` valida a lista inteira e gera o JSON direto
+com `dump_json`.
+
+Uso: python -m app.benchmarks.bench_list_serialization [itens] [repeticoes]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.models import Client, Order, OrderProduct, Product
+from app.schemas.client_schema import ClientOut, ClientOutList
+from app.schemas.order_schema import OrderOut, OrderOutList
+from app.schemas.product_schema import ProductOut, ProductOutList
+from app.utils.responses import json_list_response
+
+
+def make_product(i: int) -> Product:
+    return Product(
+        id=i,
+        description=f"Produto {i}",
+        price=10.0 + i,
+        barcode=f"{i:013d}",
+        section="Roupas",
+        stock=100,
+        expiration_date=date(2030, 1, 1),
+        image_path=f"{i:032x}.png",
+    )
+
+
+def make_clients(n: int) -> list:
+    return [
+        Client(
+            id=i,
+            name=f"Cliente {i}",
+            email=f"cliente{i}@example.com",
+            cpf=f"{i:011d}",
+            whatsapp="+5511999999999",
+        )
+        for i in range(n)
+    ]
+
+
+def make_orders(n: int, lines_per_order: int = 3) -> list:
+    orders = []
+    for i in range(n):
+        lines = [
+            OrderProduct(id=i * lines_per_order + j, product_id=j, quantity=j + 1)
+            for j in range(lines_per_order)
+        ]
+        for j, line in enumerate(lines):
+            line.product = make_product(j)
+        orders.append(
+            Order(id=i, client_id=i, status="pending", created_by=1, products=lines)
+        )
+    return orders
+
+
+def stdlib_json_response(model, items) -> bytes:
+    content = [model.model_validate(item).model_dump(mode="json") for item in items]
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(items: int = 500, repeat: int = 50):
+    datasets = {
+        "/orders": (OrderOut, OrderOutList, make_orders(items)),
+        "/products": (
+            ProductOut,
+            ProductOutList,
+            [make_product(i) for i in range(items)],
+        ),
+        "/clients": (ClientOut, ClientOutList, make_clients(items)),
+    }
+
+    print(f"{items} itens por página, média de {repeat} repetições")
+    print(f"{'rota':<12}{'antes':>12}{'depois':>12}{'ganho':>10}")
+    for route, (model, adapter, data) in datasets.items():
+        assert json.loads(stdlib_json_response(model, data)) == json.loads(
+            json_list_response(adapter, data).body
+        )
+        before = timed(lambda: stdlib_json_response(model, data), repeat)
+        after = timed(lambda: json_list_response(adapter, data), repeat)
+        print(f"{route:<12}{before:>9.2f} ms{after:>9.2f} ms{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
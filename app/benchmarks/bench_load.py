@@ -0,0 +1,462 @@
+"""Teste de carga em malha aberta contra a API servida pelo uvicorn.
+
+Sobe a aplicação com N workers do uvicorn (ou usa --url de um servidor já no
+ar) e dispara requisições em taxa fixa, com chegadas de Poisson, sem esperar
+as anteriores terminarem: se o servidor atrasa, a fila cresce, como em
+produção. A latência é medida a partir do horário agendado de cada chegada,
+então o atraso do próprio gerador também conta (sem "coordinated omission").
+
+O mix padrão tem login, listagem de produtos, criação de pedido, listagem de
+pedidos e download de imagem. Roda offline: o servidor sobe com TWILIO_FAKE,
+com latência e taxa de erro configuráveis para o envio de WhatsApp.
+
+Para cada degrau de --rps, mostra por rota p50/p95/p99, taxa de erro e vazão
+atingida, e aponta o primeiro degrau em que cada rota satura (p99 acima do
+--slo-ms ou erros acima de --max-error-rate).
+
+O banco (loadtest.db por padrão, ou DATABASE_URL) é populado pelo
+app.tools.seed na primeira execução. SQLite serializa as escritas: para medir
+vários workers de verdade, use PostgreSQL.
+
+Uso:
+  python -m app.benchmarks.bench_load --workers 4 --rps 25,50,100,200 --duration 20
+  python -m app.benchmarks.bench_load --mix products=70,orders=30 --twilio-error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./loadtest.db")
+os.environ.setdefault("SECRET_KEY", "loadtest")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.db.database import Base, engine
+from app.models import Client, Order, Product, User
+from app.tools.seed import DEFAULT_PASSWORD, SECTIONS, generate
+
+DEFAULT_MIX = "login=5,products=40,create_order=10,orders=25,images=20"
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+SESSION_MAX_ORDERS = 200  # usuários com histórico maior não entram no pool
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(
+                f"Operação desconhecida no mix: {name} (use {', '.join(OPERATIONS)})"
+            )
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def seed_database(args):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(select(func.count(Order.id))).scalar():
+            return
+        print("Populando o banco...", flush=True)
+        generate(
+            conn,
+            users=args.users,
+            clients=args.clients,
+            products=args.products,
+            orders=args.orders,
+            whatsapp_share=args.whatsapp_share,
+            seed=args.seed,
+            log=lambda message: None,
+        )
+
+
+# Dados que as operações sorteiam: IDs existentes e usuários para as sessões
+def load_fixtures(rng: random.Random, sessions: int) -> dict:
+    with engine.connect() as conn:
+        admin = conn.execute(
+            select(User.email).where(User.is_admin == 1).order_by(User.id)
+        ).scalar()
+        order_count = func.count(Order.id)
+        users = (
+            conn.execute(
+                select(User.email)
+                .outerjoin(Order, Order.created_by == User.id)
+                .where(User.is_admin == 0)
+                .group_by(User.id)
+                .having(order_count <= SESSION_MAX_ORDERS)
+                .order_by(User.id)
+            )
+            .scalars()
+            .all()
+        )
+        client_ids = conn.execute(select(Client.id)).scalars().all()
+        product_ids = (
+            conn.execute(select(Product.id).where(Product.stock >= 100)).scalars().all()
+        )
+    if not (admin and users and client_ids and product_ids):
+        raise SystemExit("Banco sem admin, usuários, clientes ou produtos com estoque")
+    return {
+        "admin": admin,
+        "users": rng.sample(users, min(sessions, len(users))),
+        "client_ids": client_ids,
+        "product_ids": product_ids,
+    }
+
+
+def start_server(args) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        TWILIO_FAKE="true",
+        TWILIO_FAKE_LATENCY_MS=str(args.twilio_latency_ms),
+        TWILIO_FAKE_ERROR_RATE=str(args.twilio_error_rate),
+        RATE_LIMIT_ENABLED="true" if args.rate_limit else "false",
+    )
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def wait_ready(http: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await http.get("/openapi.json")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("O servidor não respondeu a tempo")
+
+
+async def login(http: httpx.AsyncClient, email: str) -> dict:
+    response = await http.post(
+        "/auth/login", data={"username": email, "password": DEFAULT_PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def prepare(http: httpx.AsyncClient, fixtures: dict) -> dict:
+    fixtures["sessions"] = [await login(http, email) for email in fixtures["users"]]
+    admin = await login(http, fixtures["admin"])
+    # Um produto com imagem de verdade para a rota de download
+    response = await http.post(
+        "/products/",
+        json={
+            "description": "Produto do teste de carga",
+            "price": 10.0,
+            "barcode": f"load-{time.time_ns()}",
+            "section": SECTIONS[0],
+            "stock": 0,
+            "image_base64": VALID_IMAGE,
+        },
+        headers=admin,
+    )
+    response.raise_for_status()
+    fixtures["image"] = os.path.basename(response.json()["image_path"])
+    return fixtures
+
+
+# Cada operação sorteia uma requisição: (método, url, kwargs)
+def op_login(rng, fixtures):
+    email = rng.choice(fixtures["users"])
+    return (
+        "POST",
+        "/auth/login",
+        {"data": {"username": email, "password": DEFAULT_PASSWORD}},
+    )
+
+
+def op_products(rng, fixtures):
+    section = rng.choice(SECTIONS)
+    skip = rng.randrange(0, 100, 10)
+    return (
+        "GET",
+        f"/products/?section={section}&skip={skip}&limit=10",
+        {"headers": rng.choice(fixtures["sessions"])},
+    )
+
+
+def op_create_order(rng, fixtures):
+    products = rng.sample(fixtures["product_ids"], min(3, len(fixtures["product_ids"])))
+    return (
+        "POST",
+        "/orders/",
+        {
+            "json": {
+                "client_id": rng.choice(fixtures["client_ids"]),
+                "products": [{"product_id": p, "quantity": 1} for p in products],
+            },
+            "headers": rng.choice(fixtures["sessions"]),
+        },
+    )
+
+
+def op_orders(rng, fixtures):
+    return ("GET", "/orders/", {"headers": rng.choice(fixtures["sessions"])})
+
+
+def op_images(rng, fixtures):
+    return ("GET", f"/products/images/{fixtures['image']}", {})
+
+
+OPERATIONS = {
+    "login": op_login,
+    "products": op_products,
+    "create_order": op_create_order,
+    "orders": op_orders,
+    "images": op_images,
+}
+
+
+async def fire(http, name, request, scheduled, step):
+    method, url, kwargs = request
+    step["lag"] = max(step["lag"], time.perf_counter() - scheduled)
+    try:
+        response = await http.request(method, url, **kwargs)
+        status = response.status_code
+    except httpx.HTTPError as exc:
+        status = type(exc).__name__
+    step["latencies"][name].append(time.perf_counter() - scheduled)
+    step["statuses"][name][status] += 1
+
+
+# Um degrau de carga: chegadas de Poisson a `rps` por `duration` segundos
+async def run_step(http, fixtures, weights, rps, duration, max_inflight, rng):
+    step = {
+        "latencies": defaultdict(list),
+        "statuses": defaultdict(Counter),
+        "dropped": Counter(),
+        "lag": 0.0,
+    }
+    names, values = list(weights), list(weights.values())
+    tasks = set()
+    started = time.perf_counter()
+    scheduled = started
+    while True:
+        scheduled += rng.expovariate(rps)
+        if scheduled - started >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, values)[0]
+        # Mais requisições pendentes que o limite: o gerador saturou, não o servidor
+        if len(tasks) >= max_inflight:
+            step["dropped"][name] += 1
+            continue
+        request = OPERATIONS[name](rng, fixtures)
+        task = asyncio.create_task(fire(http, name, request, scheduled, step))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    step["elapsed"] = time.perf_counter() - started
+    return step
+
+
+def summarize(step: dict, rps: float) -> dict:
+    endpoints = {}
+    for name, latencies in step["latencies"].items():
+        statuses = step["statuses"][name]
+        errors = sum(
+            count
+            for status, count in statuses.items()
+            if not isinstance(status, int) or status >= 400
+        )
+        dropped = step["dropped"][name]
+        endpoints[name] = {
+            "requests": len(latencies) + dropped,
+            "rps": round(len(latencies) / step["elapsed"], 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_rate": round((errors + dropped) / (len(latencies) + dropped), 4),
+            "statuses": {str(status): count for status, count in statuses.items()},
+            "dropped": dropped,
+        }
+    completed = sum(len(latencies) for latencies in step["latencies"].values())
+    return {
+        "target_rps": rps,
+        "achieved_rps": round(completed / step["elapsed"], 1),
+        "max_lag_ms": round(step["lag"] * 1000, 1),
+        "endpoints": endpoints,
+    }
+
+
+def print_step(summary: dict):
+    print(
+        f"\n== {summary['target_rps']:g} req/s alvo: "
+        f"{summary['achieved_rps']:g} req/s atingidos, "
+        f"atraso máx. do gerador {summary['max_lag_ms']:g} ms"
+    )
+    print(
+        f"{'rota':<14}{'req':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'erros':>8}  status"
+    )
+    for name, result in sorted(summary["endpoints"].items()):
+        statuses = " ".join(f"{s}:{c}" for s, c in sorted(result["statuses"].items()))
+        if result["dropped"]:
+            statuses += f" descartadas:{result['dropped']}"
+        print(
+            f"{name:<14}{result['requests']:>7}{result['rps']:>8.1f}"
+            f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+            f"{result['error_rate'] * 100:>7.1f}%  {statuses}",
+            flush=True,
+        )
+
+
+# Primeiro degrau em que cada rota estourou o SLO de p99 ou a taxa de erro
+def saturation_points(steps: list, slo_ms: float, max_error_rate: float) -> dict:
+    points = {}
+    for summary in steps:
+        for name, result in summary["endpoints"].items():
+            if name in points:
+                continue
+            if result["p99_ms"] > slo_ms:
+                points[name] = {
+                    "rps": summary["target_rps"],
+                    "reason": f"p99 {result['p99_ms']:g} ms > {slo_ms:g} ms",
+                }
+            elif result["error_rate"] > max_error_rate:
+                points[name] = {
+                    "rps": summary["target_rps"],
+                    "reason": f"erros {result['error_rate'] * 100:.1f}%",
+                }
+    return points
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    fixtures = load_fixtures(rng, args.sessions)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(
+        max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as http:
+        await wait_ready(http)
+        await prepare(http, fixtures)
+        steps = []
+        for rps in args.rps:
+            step = await run_step(
+                http, fixtures, weights, rps, args.duration, args.max_inflight, rng
+            )
+            steps.append(summarize(step, rps))
+            print_step(steps[-1])
+
+    points = saturation_points(steps, args.slo_ms, args.max_error_rate)
+    print(
+        f"\nSaturação (p99 > {args.slo_ms:g} ms ou erros > {args.max_error_rate:.0%}):"
+    )
+    for name in weights:
+        point = points.get(name)
+        print(
+            f"  {name:<14}"
+            + (
+                f"a partir de {point['rps']:g} req/s ({point['reason']})"
+                if point
+                else "não saturou"
+            )
+        )
+    return {"steps": steps, "saturation": points}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rps",
+        type=lambda value: [float(v) for v in value.split(",")],
+        default=[10.0, 25.0, 50.0, 100.0],
+        help="degraus de carga, ex: 25,50,100",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=15, help="segundos por degrau"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="usa um servidor já no ar em vez de subir um")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--max-inflight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--slo-ms", type=float, default=500)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--twilio-latency-ms", type=float, default=300)
+    parser.add_argument("--twilio-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="liga o rate limiting"
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=2_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--whatsapp-share", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="grava os resultados neste JSON")
+    args = parser.parse_args()
+
+    seed_database(args)
+    server = None if args.url else start_server(args)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server:
+            stop_server(server)
+
+    if args.save:
+        report["meta"] = {
+            "workers": None if args.url else args.workers,
+            "mix": args.mix,
+            "duration": args.duration,
+            "twilio_latency_ms": args.twilio_latency_ms,
+            "twilio_error_rate": args.twilio_error_rate,
+            "database": os.environ["DATABASE_URL"].split(":")[0],
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.save}")
+
+
+if __name__ == "__main__":
+    main()
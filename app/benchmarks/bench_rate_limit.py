@@ -0,0 +1,114 @@
+"""Overhead do rate limiting por requisição.
+
+Chama o middleware direto via ASGI, sobre uma aplicação vazia, para medir só
+o custo do limitador: rota sem regra, escrita com o usuário tirado do token
+e login com o corpo lido para achar o usuário. Mede também o token bucket
+em memória isolado.
+
+Uso: python -m app.benchmarks.bench_rate_limit [iteracoes]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.middlewares.rate_limit_middleware import (
+    AUTH_PATHS,
+    RateLimitMiddleware,
+    RateLimitRule,
+)
+from app.utils.jwt import create_access_token
+from app.utils.rate_limit import MemoryRateLimitStore
+
+# Limites altos: o benchmark mede o caminho que deixa a requisição passar
+RULES = [
+    RateLimitRule("auth_ip", "1000000000/1", "ip", AUTH_PATHS, ("POST",)),
+    RateLimitRule("auth_username", "1000000000/1", "username", AUTH_PATHS, ("POST",)),
+    RateLimitRule("writes_user", "1000000000/1", "user", ("/orders", "/products")),
+]
+
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send(message):
+    pass
+
+
+def make_scope(method: str, path: str, headers: list) -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers,
+        "client": ("10.0.0.1", 5000),
+    }
+
+
+def make_receive(body: bytes):
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return receive
+
+
+async def time_calls(call, iterations: int) -> float:
+    for _ in range(1000):  # aquecimento
+        await call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def run(iterations: int):
+    token = create_access_token({"sub": "bench@test.com"}).encode()
+    login_body = b"username=bench%40test.com&password=senha123"
+    cases = {
+        "GET /products/ (sem regra)": (
+            make_scope("GET", "/products/", []),
+            b"",
+        ),
+        "POST /orders/ (por usuário)": (
+            make_scope("POST", "/orders/", [(b"authorization", b"Bearer " + token)]),
+            b"{}",
+        ),
+        "POST /auth/login (IP + usuário)": (
+            make_scope(
+                "POST",
+                "/auth/login",
+                [(b"content-type", b"application/x-www-form-urlencoded")],
+            ),
+            login_body,
+        ),
+    }
+
+    store = MemoryRateLimitStore()
+    bucket = await time_calls(lambda: store.consume("bench", 10**9, 1), iterations)
+    print(f"{'token bucket em memória':<36}{bucket:>8.2f} us")
+
+    baseline = await time_calls(
+        lambda: empty_app(cases["GET /products/ (sem regra)"][0], None, send),
+        iterations,
+    )
+    middleware = RateLimitMiddleware(
+        empty_app, rules=RULES, store=MemoryRateLimitStore()
+    )
+    for name, (scope, body) in cases.items():
+        receive = make_receive(body)
+        elapsed = await time_calls(lambda: middleware(scope, receive, send), iterations)
+        print(f"{name:<36}{elapsed - baseline:>8.2f} us")
+
+
+def main(iterations: int = 100_000):
+    asyncio.run(run(iterations))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
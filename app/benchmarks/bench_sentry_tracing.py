@@ -0,0 +1,108 @@
+"""Overhead por requisição do tracing do Sentry.
+
+Compara o tempo médio de `GET /products/` e `GET /orders/` com tracing
+desligado, com a amostragem adaptativa e com 100% das transações.
+Nenhum evento sai da máquina: o transporte do Sentry descarta os envelopes.
+
+Uso: python -m app.benchmarks.bench_sentry_tracing [requisicoes]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import sentry_sdk
+from sentry_sdk.transport import Transport
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.database import SessionLocal
+from app.middlewares.sentry_middleware import SentrySamplingMiddleware
+from app.models import Product, User
+from app.utils.jwt import create_access_token
+from app.utils.sentry import init_sentry
+
+FAKE_DSN = "http://public@localhost/1"
+ROUTES = ("/products/", "/orders/")
+
+
+class NullTransport(Transport):
+    def capture_envelope(self, envelope):
+        pass
+
+
+def seed():
+    db = SessionLocal()
+    if not db.query(User).filter(User.email == "bench@test.com").first():
+        db.add(User(email="bench@test.com", hashed_password="x", is_admin=1))
+        for i in range(10):
+            db.add(
+                Product(
+                    description=f"Produto {i}",
+                    price=10.0 + i,
+                    barcode=f"bench-{i}",
+                    section="Roupas",
+                    stock=100,
+                    image_path="bench.png",
+                )
+            )
+        db.commit()
+    db.close()
+
+
+def measure(asgi_app, headers, requests: int) -> dict:
+    client = TestClient(asgi_app)
+    results = {}
+    for route in ROUTES:
+        for _ in range(50):  # aquecimento
+            client.get(route, headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(route, headers=headers)
+        results[route] = (time.perf_counter() - start) / requests * 1_000_000
+    return results
+
+
+def main(requests: int = 500):
+    seed()
+    token = create_access_token({"sub": "bench@test.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    modes = {
+        "desligado": (dict(dsn=None), app),
+        "amostrado": (
+            dict(dsn=FAKE_DSN, transport=NullTransport),
+            SentrySamplingMiddleware(app),
+        ),
+        "completo": (
+            dict(
+                dsn=FAKE_DSN,
+                transport=NullTransport,
+                traces_sampler=None,
+                traces_sample_rate=1.0,
+            ),
+            app,
+        ),
+    }
+
+    baseline = None
+    header = "".join(f"{route:>16}" for route in ROUTES)
+    print(f"{'modo':<12}{header}{'overhead':>12}")
+    for name, (options, asgi_app) in modes.items():
+        init_sentry(**options)
+        results = measure(asgi_app, headers, requests)
+        mean = sum(results.values()) / len(results)
+        baseline = baseline or mean
+        print(
+            f"{name:<12}"
+            + "".join(f"{results[route]:>13.0f} us" for route in ROUTES)
+            + f"{mean - baseline:>+9.0f} us"
+        )
+    sentry_sdk.get_client().close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
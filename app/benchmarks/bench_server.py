@@ -0,0 +1,197 @@
+"""Compara memória e vazão do servidor atual com o app.server pré-forkado.
+
+Sobe, um de cada vez:
+- uvicorn --reload (o comando atual do dockerfile);
+- uvicorn --workers N (vários processos, cada um importando a aplicação);
+- python -m app.server --workers N (import único no mestre + gc.freeze()).
+
+Para cada um, mede o RSS, o PSS (memória compartilhada dividida entre os
+processos) e a memória privada de cada processo, mais o PSS total da árvore,
+que é o consumo real. Depois, com C clientes simultâneos, mede vazão e
+p50/p99 em GET /products/.
+
+Só funciona no Linux (lê /proc/<pid>/smaps_rollup).
+
+Uso: python -m app.benchmarks.bench_server [workers] [segundos] [clientes]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.db.database import Base, engine
+from app.models import User
+from app.tools.seed import DEFAULT_PASSWORD, generate
+
+PORT = 8790
+
+
+def setups(workers: int) -> dict:
+    uvicorn = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT)]
+    return {
+        "uvicorn --reload": uvicorn + ["--reload"],
+        f"uvicorn --workers {workers}": uvicorn + ["--workers", str(workers)],
+        f"app.server --workers {workers}": [
+            sys.executable,
+            "-m",
+            "app.server",
+            "--port",
+            str(PORT),
+            "--workers",
+            str(workers),
+        ],
+    }
+
+
+def seed_database():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if not conn.execute(select(func.count(User.id))).scalar():
+            generate(conn, users=2, clients=100, products=2_000, orders=0, log=print)
+        return conn.execute(
+            select(User.email).where(User.is_admin == 0).order_by(User.id)
+        ).scalar()
+
+
+def children(pid: int) -> list:
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # O nome do processo pode ter espaços: o ppid vem depois do ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            found.append(int(entry))
+    return found
+
+
+def process_tree(pid: int) -> list:
+    tree = [pid]
+    for child in children(pid):
+        tree += process_tree(child)
+    return tree
+
+
+def memory(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[key] = int(rest.split()[0]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+async def wait_ready(http: httpx.AsyncClient):
+    for _ in range(150):
+        try:
+            if (await http.get("/openapi.json")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("O servidor não respondeu a tempo")
+
+
+async def load(http, headers, seconds: float, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await http.get("/products/?limit=10", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "rps": len(latencies) / (time.perf_counter() - started),
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors": errors,
+    }
+
+
+async def measure(command, email, seconds, concurrency) -> dict:
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=30
+        ) as http:
+            await wait_ready(http)
+            response = await http.post(
+                "/auth/login", data={"username": email, "password": DEFAULT_PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            # Aquece todos os workers antes de medir memória e vazão
+            await load(http, headers, 2, concurrency)
+            processes = {pid: memory(pid) for pid in process_tree(process.pid)}
+            result = await load(http, headers, seconds, concurrency)
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+    result["processes"] = processes
+    return result
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    email = seed_database()
+
+    results = {}
+    for name, command in setups(workers).items():
+        print(f"Medindo {name}...", flush=True)
+        results[name] = asyncio.run(measure(command, email, seconds, concurrency))
+
+    print(f"\n{'servidor':<28}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'erros':>7}")
+    for name, result in results.items():
+        print(
+            f"{name:<28}{result['rps']:>9.0f}{result['p50']:>9.1f}"
+            f"{result['p99']:>9.1f}{result['errors']:>7}"
+        )
+
+    print(
+        f"\n{'servidor':<28}{'proc.':>6}{'RSS/proc':>10}{'PSS/proc':>10}"
+        f"{'priv/proc':>11}{'PSS total':>11}  (MB)"
+    )
+    for name, result in results.items():
+        processes = list(result["processes"].values())
+        n = len(processes)
+        print(
+            f"{name:<28}{n:>6}"
+            f"{sum(p['rss'] for p in processes) / n:>10.1f}"
+            f"{sum(p['pss'] for p in processes) / n:>10.1f}"
+            f"{sum(p['private'] for p in processes) / n:>11.1f}"
+            f"{sum(p['pss'] for p in processes):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -11,3 +11,125 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
 PORT = int(os.getenv("PORT", 8000))
 BASE_URL = os.getenv("BASE_URL", f"http://localhost:{PORT}")
+
+# Amostragem de traces do Sentry
+SENTRY_DSN = os.getenv("SENTRY_DSN")
+SENTRY_SEND_DEFAULT_PII = (
+    os.getenv("SENTRY_SEND_DEFAULT_PII", "false").lower() == "true"
+)
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", 0.1))
+SENTRY_TRACES_HOT_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_HOT_SAMPLE_RATE", 0.01))
+SENTRY_SLOW_REQUEST_MS = int(os.getenv("SENTRY_SLOW_REQUEST_MS", 1000))
+SENTRY_BOOST_SECONDS = int(os.getenv("SENTRY_BOOST_SECONDS", 60))
+
+# Compressão das respostas
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+COMPRESSION_CONTENT_TYPES = tuple(
+    os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,text/,application/javascript,image/svg+xml",
+    ).split(",")
+)
+
+# Número máximo de IDs aceitos nas buscas em lote (?ids=1,2,3)
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+
+# Linhas buscadas por lote no cursor do banco durante as exportações
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# Pedidos processados por lote no cancelamento em massa
+BULK_DELETE_BATCH_SIZE = int(os.getenv("BULK_DELETE_BATCH_SIZE", 500))
+
+# Movimentações de estoque mais antigas que isso são compactadas em um snapshot
+STOCK_LEDGER_RETENTION_DAYS = int(os.getenv("STOCK_LEDGER_RETENTION_DAYS", 30))
+
+# Eventos SSE: fila por assinante, buffer de replay (Last-Event-ID) e keep-alive
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", 1000))
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", 15))
+
+# Alertas de estoque baixo e validade próxima (WhatsApp para a equipe de operações)
+ALERT_STOCK_THRESHOLD = int(os.getenv("ALERT_STOCK_THRESHOLD", 5))
+ALERT_SECTION_THRESHOLDS = {
+    section.strip(): int(threshold)
+    for section, threshold in (
+        item.split(":")
+        for item in os.getenv("ALERT_SECTION_THRESHOLDS", "").split(",")
+        if item.strip()
+    )
+}
+ALERT_EXPIRING_DAYS = int(os.getenv("ALERT_EXPIRING_DAYS", 7))
+ALERT_WHATSAPP_NUMBERS = [
+    number.strip()
+    for number in os.getenv("ALERT_WHATSAPP_NUMBERS", "").split(",")
+    if number.strip()
+]
+ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 30))
+ALERT_SCAN_INTERVAL_SECONDS = int(os.getenv("ALERT_SCAN_INTERVAL_SECONDS", 300))
+# Movimentações mais novas que isso esperam a próxima varredura: o id sai no
+# INSERT, mas a linha só aparece no COMMIT
+ALERT_SCAN_GRACE_SECONDS = int(os.getenv("ALERT_SCAN_GRACE_SECONDS", 60))
+
+# Rate limiting (token bucket): "capacidade/segundos" por IP, por usuário do login
+# e por usuário autenticado nas escritas. Sem RATE_LIMIT_STORE_URL, fica em memória
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_AUTH_PER_IP = os.getenv("RATE_LIMIT_AUTH_PER_IP", "20/60")
+RATE_LIMIT_AUTH_PER_USERNAME = os.getenv("RATE_LIMIT_AUTH_PER_USERNAME", "5/60")
+RATE_LIMIT_WRITES_PER_USER = os.getenv("RATE_LIMIT_WRITES_PER_USER", "120/60")
+RATE_LIMIT_STORE_URL = os.getenv("RATE_LIMIT_STORE_URL")
+RATE_LIMIT_TRUST_FORWARDED_FOR = (
+    os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+)
+
+# Intervalo para buscar no banco famílias de refresh token revogadas por outros workers
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", 5))
+
+# Por quanto tempo a versão dos tokens de um usuário fica em cache (rebaixamento de admin)
+TOKEN_VERSION_CACHE_SECONDS = float(os.getenv("TOKEN_VERSION_CACHE_SECONDS", 5))
+
+# Twilio falso para testes de carga offline: não chama a API, só simula a
+# latência (ms) e a fração de envios que falham
+TWILIO_FAKE = os.getenv("TWILIO_FAKE", "false").lower() == "true"
+TWILIO_FAKE_LATENCY_MS = float(os.getenv("TWILIO_FAKE_LATENCY_MS", 300))
+TWILIO_FAKE_ERROR_RATE = float(os.getenv("TWILIO_FAKE_ERROR_RATE", 0))
+
+# Servidor de produção (python -m app.server): WEB_CONCURRENCY=0 usa um worker
+# por CPU; workers são reciclados após N requisições (mais um jitter aleatório)
+# ou acima do RSS em MB (0 desliga)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 0))
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", 10000))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", 1000))
+SERVER_MAX_RSS_MB = int(os.getenv("SERVER_MAX_RSS_MB", 0))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+
+# Perfil de CPU sob demanda: com PROFILING_ENABLED, um admin pede o perfil de
+# uma requisição com "X-Profile: 1"; PROFILING_SAMPLE_ROUTE ("PUT /orders/{order_id}")
+# com PROFILING_SAMPLE_EVERY=N grava 1 em cada N requisições da rota
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", 1))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 200))
+PROFILING_SAMPLE_ROUTE = os.getenv("PROFILING_SAMPLE_ROUTE")
+PROFILING_SAMPLE_EVERY = int(os.getenv("PROFILING_SAMPLE_EVERY", 0))
+
+# Totais das listagens (with_total=true): conjuntos estimados pelo planner do
+# PostgreSQL com pelo menos esse número de linhas não recebem COUNT(*) exato;
+# o total sem filtros fica em cache por COUNT_CACHE_SECONDS
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", 100000))
+COUNT_CACHE_SECONDS = float(os.getenv("COUNT_CACHE_SECONDS", 30))
+
+# Armazenamento das imagens dos produtos: "local" (pasta IMAGE_STORAGE_DIR, com
+# fsync a cada gravação se IMAGE_STORAGE_FSYNC) ou "s3" (qualquer serviço
+# compatível com S3, para vários nós web sem disco compartilhado)
+IMAGE_STORAGE_BACKEND = os.getenv("IMAGE_STORAGE_BACKEND", "local")
+IMAGE_STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "app/static/images")
+IMAGE_STORAGE_FSYNC = os.getenv("IMAGE_STORAGE_FSYNC", "true").lower() == "true"
+IMAGE_S3_ENDPOINT_URL = os.getenv("IMAGE_S3_ENDPOINT_URL")
+IMAGE_S3_BUCKET = os.getenv("IMAGE_S3_BUCKET")
+IMAGE_S3_REGION = os.getenv("IMAGE_S3_REGION", "us-east-1")
+IMAGE_S3_ACCESS_KEY = os.getenv("IMAGE_S3_ACCESS_KEY")
+IMAGE_S3_SECRET_KEY = os.getenv("IMAGE_S3_SECRET_KEY")
+IMAGE_S3_PREFIX = os.getenv("IMAGE_S3_PREFIX", "images/")
@@ -1,11 +1,21 @@
+import time
 from passlib.context import CryptContext
+from app.utils.metrics import BCRYPT_DURATION, BCRYPT_QUEUE_DEPTH
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    with BCRYPT_QUEUE_DEPTH.track_inprogress():
+        start = time.perf_counter()
+        hashed = pwd_context.hash(password)
+        BCRYPT_DURATION.labels("hash").observe(time.perf_counter() - start)
+        return hashed
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with BCRYPT_QUEUE_DEPTH.track_inprogress():
+        start = time.perf_counter()
+        valid = pwd_context.verify(plain_password, hashed_password)
+        BCRYPT_DURATION.labels("verify").observe(time.perf_counter() - start)
+        return valid
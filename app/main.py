@@ -1,15 +1,61 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.core.config import PROFILING_ENABLED, RATE_LIMIT_ENABLED, SENTRY_DSN
 from app.db.database import engine, Base
-from app.routes import auth_route, order_route, client_route, product_route
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.middlewares.profiling_middleware import ProfilingMiddleware
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.middlewares.sentry_middleware import SentrySamplingMiddleware
+from app.routes import (
+    auth_route,
+    order_route,
+    client_route,
+    product_route,
+    metrics_route,
+    export_route,
+    event_route,
+    profile_route,
+)
+from app.utils.counts import track_count_invalidation
+from app.utils.file_utils import close_image_storage, get_storage
+from app.utils.metrics import instrument_sqlalchemy
 from app.utils.sentry import init_sentry
 
 init_sentry()
+instrument_sqlalchemy()
+track_count_invalidation()
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+
+# O armazenamento de imagens nasce em cada worker e fecha no desligamento
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_storage()
+    yield
+    await close_image_storage()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+if SENTRY_DSN:
+    app.add_middleware(SentrySamplingMiddleware)
+# Por último para ficar por fora: o perfil cobre a requisição inteira
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 app.include_router(auth_route.router)
 app.include_router(client_route.router)
 app.include_router(product_route.router)
-app.include_router(order_route.router)
\ No newline at end of file
+app.include_router(order_route.router)
+app.include_router(export_route.router)
+app.include_router(event_route.router)
+app.include_router(metrics_route.router)
+if PROFILING_ENABLED:
+    app.include_router(profile_route.router)
@@ -0,0 +1,108 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CONTENT_TYPES,
+)
+from app.utils.compression import StreamCompressor, accepted_encodings, compress
+
+
+class CompressionMiddleware:
+    # Comprime com brotli (se instalado) ou gzip as respostas acima do tamanho
+    # mínimo cujo content-type esteja na lista permitida. Respostas que já têm
+    # Content-Encoding (ex: imagens pré-comprimidas) passam direto.
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        content_types: tuple[str, ...] = COMPRESSION_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+        self.content_types = content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encodings[0], send)
+        await self.app(scope, receive, responder.send)
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        # SSE precisa chegar evento a evento; o compressor seguraria os bytes
+        if content_type.startswith("text/event-stream"):
+            return False
+        return any(content_type.startswith(allowed) for allowed in self.content_types)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.level = middleware.levels[encoding]
+        self._send = send
+        self.start_message: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self.middleware.is_compressible(
+                Headers(raw=message["headers"])
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        # Primeiro pedaço do corpo: decide entre resposta inteira ou streaming
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+
+            if not more_body:
+                if len(body) >= self.middleware.minimum_size:
+                    body = compress(body, self.encoding, self.level)
+                    headers["Content-Encoding"] = self.encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                else:
+                    self.passthrough = True
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            self.compressor = StreamCompressor(self.encoding, self.level)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            await self._send(start)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
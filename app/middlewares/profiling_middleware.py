@@ -0,0 +1,113 @@
+import threading
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    PROFILING_INTERVAL_MS,
+    PROFILING_SAMPLE_EVERY,
+    PROFILING_SAMPLE_ROUTE,
+)
+from app.db.database import get_db
+from app.services.auth_service import get_current_principal
+from app.utils.profiler import SamplingProfiler, profile_filename, save_profile
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = b"profile=1"
+
+
+class ProfilingMiddleware:
+    # Perfil de CPU por amostragem de uma única requisição, pedido por um
+    # admin com o header "X-Profile: 1" ou "?profile=1", ou de 1 em cada N
+    # requisições de uma rota ("PUT /orders/{order_id}"). O arquivo do
+    # speedscope é gravado em PROFILING_DIR e o nome volta no X-Profile-File.
+    # Sem o flag, o custo é procurar um header e um trecho da query string.
+    def __init__(
+        self,
+        app: ASGIApp,
+        interval_ms: float = PROFILING_INTERVAL_MS,
+        sample_route: Optional[str] = PROFILING_SAMPLE_ROUTE,
+        sample_every: int = PROFILING_SAMPLE_EVERY,
+    ):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.sample_method = None
+        self.sample_path = None
+        if sample_route and sample_every > 0:
+            method, _, path = sample_route.partition(" ")
+            self.sample_method = method.upper()
+            self.sample_path = compile_path(path)[0]
+        self.sample_every = sample_every
+        self.sample_count = 0
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not (
+            self.sampled(scope) or await self.requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(self.interval)
+        if not profiler.start():
+            # Já há um perfil em andamento no processo
+            await self.app(scope, receive, send)
+            return
+
+        filename = profile_filename(scope["method"])
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", filename.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            route = getattr(scope.get("route"), "path", scope["path"])
+            name = f"{scope['method']} {route} ({profiler.elapsed * 1000:.1f} ms)"
+            await run_in_threadpool(save_profile, profiler.speedscope(name), filename)
+
+    async def requested(self, scope: Scope) -> bool:
+        query = scope["query_string"]
+        flagged = (
+            PROFILE_QUERY in query and parse_qs(query.decode()).get("profile") == ["1"]
+        ) or any(
+            key == PROFILE_HEADER and value in (b"1", b"true")
+            for key, value in scope["headers"]
+        )
+        return flagged and await run_in_threadpool(self.is_admin, scope)
+
+    # Modo contínuo: a rota é comparada pelo padrão, antes do roteador rodar
+    def sampled(self, scope: Scope) -> bool:
+        if self.sample_path is None or scope["method"] != self.sample_method:
+            return False
+        if not self.sample_path.match(scope["path"]):
+            return False
+        with self._lock:
+            self.sample_count += 1
+            return self.sample_count % self.sample_every == 0
+
+    # Mesma validação das rotas (assinatura, sessão e versão do token); quem
+    # não é admin segue sem perfil e sem saber que o flag existe
+    def is_admin(self, scope: Scope) -> bool:
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        overrides = getattr(scope.get("app"), "dependency_overrides", {})
+        provider = overrides.get(get_db, get_db)
+        sessions = provider()
+        db = next(sessions)
+        try:
+            return get_current_principal(token, db).is_admin
+        except HTTPException:
+            return False
+        finally:
+            sessions.close()
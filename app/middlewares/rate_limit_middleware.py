@@ -0,0 +1,201 @@
+import math
+from typing import Optional, Sequence
+from urllib.parse import parse_qs
+
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    RATE_LIMIT_AUTH_PER_IP,
+    RATE_LIMIT_AUTH_PER_USERNAME,
+    RATE_LIMIT_TRUST_FORWARDED_FOR,
+    RATE_LIMIT_WRITES_PER_USER,
+)
+from app.utils.jwt import decode_access_token
+from app.utils.rate_limit import get_rate_limit_store, parse_limit
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+AUTH_PATHS = ("/auth/login", "/auth/register")
+
+# Corpo maior que isso não é lido para achar o usuário (o limite por IP vale)
+MAX_BODY_SIZE = 64 * 1024
+
+
+class RateLimitRule:
+    # key: "ip", "username" (campo do formulário/JSON de login e registro)
+    # ou "user" (sub do token com assinatura válida; sem ela, vale o IP)
+    def __init__(
+        self,
+        name: str,
+        limit: str,
+        key: str,
+        paths: Sequence[str],
+        methods: Sequence[str] = WRITE_METHODS,
+    ):
+        self.name = name
+        self.capacity, self.period = parse_limit(limit)
+        self.key = key
+        self.paths = tuple(paths)
+        self.methods = tuple(methods)
+
+    def matches(self, method: str, path: str) -> bool:
+        if method not in self.methods:
+            return False
+        return any(path == p or path.startswith(p + "/") for p in self.paths)
+
+
+def default_rules():
+    return [
+        RateLimitRule("auth_ip", RATE_LIMIT_AUTH_PER_IP, "ip", AUTH_PATHS, ("POST",)),
+        RateLimitRule(
+            "auth_username",
+            RATE_LIMIT_AUTH_PER_USERNAME,
+            "username",
+            AUTH_PATHS,
+            ("POST",),
+        ),
+        RateLimitRule(
+            "writes_user", RATE_LIMIT_WRITES_PER_USER, "user", ("/orders", "/products")
+        ),
+    ]
+
+
+class RateLimitMiddleware:
+    # Token bucket por IP/usuário antes de chegar no bcrypt ou no banco;
+    # estourou o limite, responde 429 com Retry-After sem chamar a rota
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: Optional[Sequence[RateLimitRule]] = None,
+        store=None,
+        trust_forwarded_for: bool = RATE_LIMIT_TRUST_FORWARDED_FOR,
+    ):
+        self.app = app
+        self.rules = list(default_rules() if rules is None else rules)
+        self.store = store or get_rate_limit_store()
+        self.trust_forwarded_for = trust_forwarded_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        rules = [rule for rule in self.rules if rule.matches(method, path)]
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if any(rule.key == "username" for rule in rules):
+            body, receive = await self.buffer_body(receive)
+            username = self.username_from_body(headers, body)
+        else:
+            username = None
+
+        for rule in rules:
+            identity = self.identity(rule.key, scope, headers, username)
+            if identity is None:
+                continue
+            retry_after = await self.store.consume(
+                f"{rule.name}:{identity}", rule.capacity, rule.period
+            )
+            if retry_after:
+                await self.reject(send, retry_after)
+                return
+
+        await self.app(scope, receive, send)
+
+    def identity(self, key: str, scope: Scope, headers: Headers, username):
+        if key == "username":
+            return username
+        if key == "user":
+            user = self.user_from_token(headers)
+            if user is not None:
+                return user
+        return self.client_ip(scope, headers)
+
+    def client_ip(self, scope: Scope, headers: Headers) -> str:
+        if self.trust_forwarded_for:
+            forwarded = headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    # Só a assinatura (HMAC, sem banco) antes de usar o sub como chave: um
+    # token forjado com o e-mail de outro usuário cai no limite por IP
+    @staticmethod
+    def user_from_token(headers: Headers) -> Optional[str]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        claims = decode_access_token(token)
+        sub = claims.get("sub") if claims else None
+        return str(sub) if sub is not None else None
+
+    @staticmethod
+    def username_from_body(headers: Headers, body: bytes) -> Optional[str]:
+        if not body:
+            return None
+        content_type = headers.get("content-type", "")
+        try:
+            if content_type.startswith("application/x-www-form-urlencoded"):
+                values = parse_qs(body.decode())
+                username = (values.get("username") or [None])[0]
+            elif content_type.startswith("application/json"):
+                data = orjson.loads(body)
+                username = data.get("email") if isinstance(data, dict) else None
+            else:
+                return None
+        except (UnicodeDecodeError, orjson.JSONDecodeError):
+            return None
+        return username.strip().lower() if isinstance(username, str) else None
+
+    # Lê o corpo para achar o usuário e devolve um receive que o reentrega à rota
+    @staticmethod
+    async def buffer_body(receive: Receive):
+        chunks = []
+        size = 0
+        more_body = True
+        pending = None
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                pending = message  # ex: http.disconnect, reentregue depois do corpo
+                break
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > MAX_BODY_SIZE:
+                break
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            if pending is not None:
+                return pending
+            return await receive()
+
+        return (body if size <= MAX_BODY_SIZE else b""), replay
+
+    @staticmethod
+    async def reject(send: Send, retry_after: float):
+        body = b'{"detail":"Too many requests"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,33 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import SENTRY_SLOW_REQUEST_MS
+from app.utils.sentry import boost_route
+
+
+class SentrySamplingMiddleware:
+    # Alimenta a amostragem adaptativa: rotas com erro ou lentas passam a ser
+    # rastreadas em 100% por alguns segundos
+    def __init__(self, app: ASGIApp, slow_request_ms: int = SENTRY_SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_seconds = slow_request_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if status_code >= 500 or elapsed >= self.slow_request_seconds:
+                boost_route(scope["method"], scope["path"])
@@ -1,4 +1,7 @@
 from app.models.user_model import User
 from app.models.client_model import Client
 from app.models.product_model import Product
-from app.models.order_model import Order, OrderProduct
\ No newline at end of file
+from app.models.order_model import Order, OrderProduct
+from app.models.stock_movement_model import StockMovement
+from app.models.scan_state_model import ScanState
+from app.models.refresh_token_model import RefreshToken
\ No newline at end of file
@@ -1,17 +1,46 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
 
+# Status dos pedidos e transições permitidas em PATCH /orders/{id}/status
+STATUS_PENDING = "pending"
+STATUS_PAID = "paid"
+STATUS_SHIPPED = "shipped"
+STATUS_DELIVERED = "delivered"
+STATUS_CANCELLED = "cancelled"
+
+STATUS_TRANSITIONS = {
+    STATUS_PENDING: (STATUS_PAID, STATUS_CANCELLED),
+    STATUS_PAID: (STATUS_SHIPPED, STATUS_CANCELLED),
+    STATUS_SHIPPED: (STATUS_DELIVERED,),
+    STATUS_DELIVERED: (),
+    STATUS_CANCELLED: (),
+}
+
+# Filas de operação: cada status em aberto tem um índice parcial pequeno
+OPEN_STATUSES = (STATUS_PENDING, STATUS_PAID, STATUS_SHIPPED)
+
+
+def _open_status_index(order_status: str) -> Index:
+    where = text(f"status = '{order_status}'")
+    return Index(
+        f"ix_orders_{order_status}_created_at",
+        "created_at",
+        "id",
+        postgresql_where=where,
+        sqlite_where=where,
+    )
+
 
 class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     status = Column(String, default="pending")
     created_at = Column(DateTime, default=datetime.utcnow)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     client = relationship("Client", back_populates="orders")
     products = relationship(
@@ -22,13 +51,15 @@ class Order(Base):
     )
     user = relationship("User")
 
+    __table_args__ = tuple(_open_status_index(status) for status in OPEN_STATUSES)
+
 
 class OrderProduct(Base):
     __tablename__ = "order_products"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
 
     order = relationship("Order", back_populates="products")
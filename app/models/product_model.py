@@ -7,9 +7,9 @@ class Product(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, nullable=False)
-    price = Column(Float, nullable=False)
+    price = Column(Float, nullable=False, index=True)
     barcode = Column(String, unique=True, nullable=False)
-    section = Column(String, nullable=False)
-    stock = Column(Integer, nullable=False)
-    expiration_date = Column(Date, nullable=True)
+    section = Column(String, nullable=False, index=True)
+    stock = Column(Integer, nullable=False, index=True)
+    expiration_date = Column(Date, nullable=True, index=True)
     image_path = Column(String, nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.database import Base
+
+
+# Um registro por refresh token emitido (jti). Tokens da mesma sessão de login
+# compartilham a família: reuso de um token já trocado revoga a família toda.
+# user_id sem FK para o registro de revogação sobreviver à exclusão da conta.
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    family_id = Column(String, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True, index=True)
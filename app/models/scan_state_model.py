@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from app.db.database import Base
+
+
+# Marca d'água dos scanners periódicos: até onde o livro de estoque e as
+# datas de validade já foram verificados
+class ScanState(Base):
+    __tablename__ = "scan_states"
+
+    name = Column(String, primary_key=True)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    expiring_until = Column(Date, nullable=True)
+    scanned_at = Column(DateTime, nullable=True)
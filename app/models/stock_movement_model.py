@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from datetime import datetime
+from app.db.database import Base
+
+# Razões das movimentações de estoque
+REASON_INITIAL = "initial"
+REASON_MANUAL = "manual"
+REASON_ORDER_CREATE = "order_create"
+REASON_ORDER_UPDATE = "order_update"
+REASON_ORDER_DELETE = "order_delete"
+REASON_ORDER_CANCEL = "order_cancel"
+REASON_SNAPSHOT = "snapshot"
+# Exclusão do produto: zera o saldo e guarda um retrato do produto
+REASON_PRODUCT_DELETE = "product_delete"
+# Troca de validade: quantidade 0, só avisa o scanner de alertas
+REASON_EXPIRATION = "expiration"
+
+
+# Livro de estoque: só recebe inserções (a compactação junta as antigas em um
+# snapshot por produto). A soma das movimentações de um produto é o seu estoque.
+# Excluir o produto não apaga o histórico: o product_id vira NULL e a
+# movimentação de exclusão guarda o retrato do produto (product_snapshot)
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True
+    )
+    quantity = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    order_id = Column(Integer, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    product_snapshot = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_stock_movements_product_id_id", "product_id", "id"),
+        Index("ix_stock_movements_created_at", "created_at"),
+    )
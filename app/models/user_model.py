@@ -10,3 +10,5 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Integer, default=1)
     is_admin = Column(Integer, default=0)
+    # Incrementada ao mudar o papel do usuário: invalida access tokens antigos
+    token_version = Column(Integer, default=0, nullable=False, server_default="0")
@@ -11,7 +11,12 @@ from app.services.auth_service import (
     generate_tokens,
     refresh_tokens,
     get_current_user,
+    get_current_principal,
     require_admin,
+    Principal,
+    delete_user,
+    logout,
+    oauth2_scheme,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -55,7 +60,7 @@ def login(
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token, refresh_token = generate_tokens(user.email)
+    access_token, refresh_token = generate_tokens(db, user)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -71,7 +76,8 @@ def login(
         "Exclui o usuário atualmente autenticado do sistema.\n\n"
         "Regras de negócio:\n"
         "- Apenas o próprio usuário pode excluir sua conta.\n"
-        "- A exclusão é definitiva.\n\n"
+        "- A exclusão é definitiva.\n"
+        "- Todas as sessões (refresh tokens) do usuário são revogadas.\n\n"
         "Casos de uso:\n"
         "- Usuário deseja remover sua conta permanentemente."
     ),
@@ -79,8 +85,7 @@ def login(
 def delete_current_user(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
-    db.delete(current_user)
-    db.commit()
+    delete_user(db, current_user)
     return None
 
 
@@ -91,14 +96,15 @@ def delete_current_user(
     description=(
         "Renova tokens JWT usando um refresh token válido.\n\n"
         "Regras de negócio:\n"
-        "- O refresh token deve ser válido e não expirado.\n"
-        "- Emite novos tokens de acesso e refresh.\n\n"
+        "- O refresh token deve ser válido, não expirado e ainda não usado.\n"
+        "- Emite novos tokens de acesso e refresh; o refresh token usado deixa de valer.\n"
+        "- Reusar um refresh token já trocado revoga a sessão inteira.\n\n"
         "Casos de uso:\n"
         "- Usuário mantém sessão ativa sem precisar fazer login novamente."
     ),
 )
-def refresh_token(refresh_token: str = Body(...)):
-    access_token, new_refresh_token = refresh_tokens(refresh_token)
+def refresh_token(refresh_token: str = Body(...), db: Session = Depends(get_db)):
+    access_token, new_refresh_token = refresh_tokens(db, refresh_token)
     if not access_token or not new_refresh_token:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     return {
@@ -106,3 +112,27 @@ def refresh_token(refresh_token: str = Body(...)):
         "refresh_token": new_refresh_token,
         "token_type": "bearer",
     }
+
+
+@router.post(
+    "/logout",
+    status_code=204,
+    summary="Logout",
+    description=(
+        "Encerra a sessão do token informado.\n\n"
+        "Regras de negócio:\n"
+        "- Revoga o refresh token da sessão e todos os que vieram dele.\n"
+        "- Access tokens da sessão deixam de ser aceitos imediatamente no worker que "
+        "atendeu o logout; nos outros workers, em até `TOKEN_REVOCATION_SYNC_SECONDS` "
+        "segundos (padrão 5), o intervalo de sincronização das revogações.\n\n"
+        "Casos de uso:\n"
+        "- Usuário sai do sistema em um dispositivo."
+    ),
+)
+def logout_current_session(
+    token: str = Depends(oauth2_scheme),
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    logout(db, token)
+    return None
@@ -2,11 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.schemas.client_schema import ClientCreate, ClientOut, ClientUpdate
+from app.schemas.client_schema import (
+    ClientCreate,
+    ClientOut,
+    ClientOutList,
+    ClientUpdate,
+)
 from app.db.database import get_db
-from app.routes.auth_route import get_current_user, require_admin
+from app.routes.auth_route import get_current_principal, require_admin
+from app.utils.batch import parse_ids, with_missing_ids
+from app.utils.fieldsets import fieldset_response, parse_fields
+from app.utils.responses import json_list_response, paginated_response
 from app.services.client_service import (
     get_clients as service_get_clients,
+    count_clients,
+    get_clients_by_ids,
     get_client_by_id,
     create_client as service_create_client,
     update_client as service_update_client,
@@ -24,20 +34,42 @@ router = APIRouter(prefix="/clients", tags=["clients"])
         "Lista todos os clientes cadastrados com suporte a paginação e filtros.\n\n"
         "Regras de negócio:\n"
         "- Suporta filtros por nome e email para facilitar a busca.\n"
-        "- Paginação controlada pelos parâmetros 'skip' e 'limit'.\n\n"
+        "- Paginação controlada pelos parâmetros 'skip' e 'limit'.\n"
+        "- O parâmetro `fields` limita os campos retornados (ex: `id,name`); campos inválidos retornam erro 400.\n"
+        "- O parâmetro `ids` (ex: `1,2,3`) busca vários registros de uma vez, na ordem pedida; os demais filtros e a paginação são ignorados. IDs não encontrados são informados no header `X-Missing-Ids`.\n"
+        "- Com `with_total=true` a resposta vira `{items, total, total_exact, skip, limit}`. O total é exato (`COUNT(*)`) para conjuntos pequenos; em tabelas grandes no PostgreSQL é a estimativa do planner, com `total_exact=false`.\n\n"
         "Casos de uso:\n"
         "- Visualizar clientes para administração ou consulta."
     ),
 )
 def get_clients(
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(get_current_principal),
     skip: int = 0,
     limit: int = 10,
     name: Optional[str] = Query(None),
     email: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    ids: Optional[str] = Query(None),
+    with_total: bool = Query(False),
 ):
-    return service_get_clients(db, skip, limit, name, email)
+    fieldset = parse_fields(fields, ClientOut)
+    missing = None
+    if ids is not None:
+        clients, missing = get_clients_by_ids(db, parse_ids(ids), fieldset)
+    else:
+        clients = service_get_clients(db, skip, limit, name, email, fieldset)
+
+    if fieldset:
+        response = fieldset_response(clients, fieldset)
+    else:
+        response = json_list_response(ClientOutList, clients)
+    if missing is not None:
+        return with_missing_ids(response, missing)
+    if with_total:
+        total, exact = count_clients(db, name, email)
+        return paginated_response(response, total, exact, skip, limit)
+    return response
 
 
 @router.post(
@@ -74,7 +106,7 @@ def create_client(
     ),
 )
 def get_client(
-    client_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)
+    client_id: int, db: Session = Depends(get_db), user=Depends(get_current_principal)
 ):
     client = get_client_by_id(db, client_id)
     if not client:
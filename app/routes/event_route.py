@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.routes.auth_route import Principal, get_current_principal
+from app.utils.events import broker, sse_stream
+
+router = APIRouter(tags=["events"])
+
+
+@router.get(
+    "/events",
+    summary="Stream de eventos de pedidos e estoque",
+    description=(
+        "Abre um stream Server-Sent Events com as alterações de pedidos e estoque.\n\n"
+        "Regras de negócio:\n"
+        "- Eventos: `order.created`, `order.updated`, `order.deleted` e `stock.changed`.\n"
+        "- Usuários admin recebem todos os eventos.\n"
+        "- Usuários comuns recebem apenas eventos dos pedidos que criaram e de estoque.\n"
+        "- Com o header `Last-Event-ID`, reenvia os eventos recentes perdidos na reconexão.\n"
+        "- Clientes lentos perdem os eventos mais antigos da fila, nunca os mais novos.\n"
+        "- Só funciona com um único worker: com `app.server` em vários workers, retorna erro 503.\n\n"
+        "Casos de uso:\n"
+        "- Dashboards acompanham pedidos e estoque sem fazer polling nas listagens."
+    ),
+)
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    if not broker.enabled:
+        raise HTTPException(
+            status_code=503,
+            detail="Eventos indisponíveis com vários workers (use --workers 1)",
+        )
+    user_id, is_admin = current_user.id, current_user.is_admin
+    # Libera a conexão do banco antes de manter o stream aberto
+    db.close()
+
+    resume_from = (
+        int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    )
+    return StreamingResponse(
+        sse_stream(broker, user_id, is_admin, request.is_disconnected, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
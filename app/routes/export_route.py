@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.routes.auth_route import Principal, get_current_principal
+from app.schemas.export_schema import ExportFormat
+from app.services.export_service import (
+    MEDIA_TYPES,
+    clients_statement,
+    orders_statement,
+    products_statement,
+    stream_export,
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def export_response(
+    db: Session, statement, export_format: ExportFormat, name: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(db, statement, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'
+        },
+    )
+
+
+@router.get(
+    "/orders",
+    summary="Exportar pedidos",
+    description=(
+        "Exporta os pedidos em CSV ou NDJSON, com uma linha por item do pedido.\n\n"
+        "Regras de negócio:\n"
+        "- Usuários admin exportam todos os pedidos.\n"
+        "- Usuários comuns exportam apenas os pedidos que criaram.\n"
+        "- O arquivo é gerado em streaming, com uso de memória constante.\n\n"
+        "Casos de uso:\n"
+        "- Conciliação de pedidos no fechamento do mês."
+    ),
+)
+def export_orders(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    format: ExportFormat = Query(ExportFormat.csv),
+):
+    is_admin = current_user.is_admin
+    statement = orders_statement(current_user.id, is_admin)
+    return export_response(db, statement, format, "orders")
+
+
+@router.get(
+    "/products",
+    summary="Exportar produtos",
+    description=(
+        "Exporta todos os produtos em CSV ou NDJSON.\n\n"
+        "Regras de negócio:\n"
+        "- Pode ser usado por qualquer usuário autenticado.\n"
+        "- O arquivo é gerado em streaming, com uso de memória constante.\n\n"
+        "Casos de uso:\n"
+        "- Conferência de estoque e catálogo."
+    ),
+)
+def export_products(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_principal),
+    format: ExportFormat = Query(ExportFormat.csv),
+):
+    return export_response(db, products_statement(), format, "products")
+
+
+@router.get(
+    "/clients",
+    summary="Exportar clientes",
+    description=(
+        "Exporta todos os clientes em CSV ou NDJSON.\n\n"
+        "Regras de negócio:\n"
+        "- Pode ser usado por qualquer usuário autenticado.\n"
+        "- O arquivo é gerado em streaming, com uso de memória constante.\n\n"
+        "Casos de uso:\n"
+        "- Conciliação e cópia da base de clientes."
+    ),
+)
+def export_clients(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_principal),
+    format: ExportFormat = Query(ExportFormat.csv),
+):
+    return export_response(db, clients_statement(), format, "clients")
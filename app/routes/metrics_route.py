@@ -0,0 +1,29 @@
+import os
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+router = APIRouter(tags=["metrics"])
+
+
+# Em modo multiprocesso (vários workers) agrega os arquivos de todos os processos
+def get_registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    summary="Métricas no formato Prometheus",
+)
+def metrics():
+    return Response(generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST)
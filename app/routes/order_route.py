@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
-from typing import List
-from app.models.user_model import User
-from app.schemas.order_schema import OrderCreate, OrderOut, OrderUpdate
+from typing import List, Optional
+from app.schemas.order_schema import (
+    OrderCreate,
+    OrderOut,
+    OrderOutList,
+    OrderStatus,
+    OrderStatusOut,
+    OrderStatusUpdate,
+    OrderUpdate,
+)
 from app.db.database import get_db
 from app.services.order_service import (
     create_order,
     get_order,
     list_orders,
+    get_orders_by_ids,
     update_order,
+    update_order_status,
     delete_order,
+    delete_orders,
 )
-from app.routes.auth_route import get_current_user
+from app.routes.auth_route import Principal, get_current_principal, require_admin
+from app.utils.batch import parse_ids, with_missing_ids
+from app.utils.fieldsets import fieldset_response, parse_fields
+from app.utils.responses import json_list_response
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -35,7 +48,7 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 def create_new_order(
     order_in: OrderCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     order = create_order(db, order_in, current_user.id)
     return order
@@ -49,19 +62,45 @@ def create_new_order(
         "Lista todos os pedidos do sistema, dependendo do tipo de usuário.\n\n"
         "Regras de negócio:\n"
         "- Usuários admin visualizam todos os pedidos.\n"
-        "- Usuários comuns visualizam apenas os pedidos que criaram.\n\n"
+        "- Usuários comuns visualizam apenas os pedidos que criaram.\n"
+        "- O parâmetro `fields` limita os campos retornados (ex: `id,status,products.quantity`); campos inválidos retornam erro 400.\n"
+        "- Sem `products` no `fields`, os itens e produtos nem são consultados.\n"
+        "- O parâmetro `ids` (ex: `1,2,3`) busca vários registros de uma vez, na ordem pedida; pedidos de outros usuários contam como não encontrados para usuários comuns. IDs não encontrados são informados no header `X-Missing-Ids`.\n"
+        "- O parâmetro `status` (ex: `pending`) filtra por status e ordena do pedido mais antigo para o mais novo.\n\n"
         "Casos de uso:\n"
         "- Consulta geral de pedidos para administração.\n"
+        "- Filas de operação, como todos os pedidos pendentes.\n"
         "- Visualização de histórico de pedidos por usuário."
     ),
 )
 def get_orders(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
+    fields: Optional[str] = Query(None),
+    ids: Optional[str] = Query(None),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
 ):
-    is_admin = getattr(current_user, "is_admin", False)
-    orders = list_orders(db, current_user.id, is_admin)
-    return orders
+    is_admin = current_user.is_admin
+    fieldset = parse_fields(fields, OrderOut)
+    missing = None
+    if ids is not None:
+        orders, missing = get_orders_by_ids(
+            db, parse_ids(ids), current_user.id, is_admin, fieldset
+        )
+    else:
+        orders = list_orders(
+            db,
+            current_user.id,
+            is_admin,
+            fieldset,
+            order_status.value if order_status else None,
+        )
+
+    if fieldset:
+        response = fieldset_response(orders, fieldset)
+    else:
+        response = json_list_response(OrderOutList, orders)
+    return with_missing_ids(response, missing) if missing is not None else response
 
 
 @router.get(
@@ -82,9 +121,9 @@ def get_orders(
 def get_order_by_id(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    is_admin = getattr(current_user, "is_admin", False)
+    is_admin = current_user.is_admin
     order = get_order(db, order_id, current_user.id, is_admin)
     return order
 
@@ -98,6 +137,7 @@ def get_order_by_id(
         "Regras de negócio:\n"
         "- Usuários admin podem atualizar qualquer pedido.\n"
         "- Usuários comuns só podem atualizar pedidos criados por eles.\n"
+        "- Sem o campo `products`, os itens do pedido não são alterados; para só trocar o status, prefira `PATCH /orders/{order_id}/status`.\n"
         "- Retorna erro 404 se o pedido não for encontrado ou se o acesso for negado.\n\n"
         "Casos de uso:\n"
         "- Corrigir informações de um pedido.\n"
@@ -108,13 +148,40 @@ def update_order_by_id(
     order_id: int,
     order_update: OrderUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    is_admin = getattr(current_user, "is_admin", False)
+    is_admin = current_user.is_admin
     order = update_order(db, order_id, order_update, current_user.id, is_admin)
     return order
 
 
+@router.patch(
+    "/{order_id}/status",
+    response_model=OrderStatusOut,
+    summary="Alterar status do pedido",
+    description=(
+        "Altera apenas o status de um pedido, sem carregar nem reescrever os itens.\n\n"
+        "Regras de negócio:\n"
+        "- Transições permitidas: `pending` → `paid` → `shipped` → `delivered`; `pending` ou `paid` → `cancelled`.\n"
+        "- Com `expected_status`, a troca só acontece se o pedido ainda estiver nesse status.\n"
+        "- Cancelar devolve ao estoque as quantidades dos itens, na mesma transação.\n"
+        "- Transição inválida para o status atual (ou troca concorrente) retorna erro 409.\n"
+        "- Usuários comuns só podem alterar pedidos criados por eles.\n"
+        "- Retorna erro 404 se o pedido não for encontrado.\n\n"
+        "Casos de uso:\n"
+        "- Confirmar o pagamento, despachar ou cancelar um pedido."
+    ),
+)
+def update_order_status_by_id(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    is_admin = current_user.is_admin
+    return update_order_status(db, order_id, status_update, current_user.id, is_admin)
+
+
 @router.delete(
     "/{order_id}",
     summary="Deletar pedido",
@@ -132,7 +199,34 @@ def update_order_by_id(
 def delete_order_by_id(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    is_admin = getattr(current_user, "is_admin", False)
+    is_admin = current_user.is_admin
     return delete_order(db, order_id, current_user.id, is_admin)
+
+
+@router.delete(
+    "/",
+    summary="Cancelar pedidos em massa",
+    description=(
+        "Remove vários pedidos de uma vez, repondo o estoque dos produtos.\n\n"
+        "Regras de negócio:\n"
+        "- Apenas administradores podem acessar esta rota.\n"
+        "- Informe `ids` (ex: `1,2,3`) e/ou `older_than_days`; sem nenhum dos dois retorna erro 400.\n"
+        "- `status` restringe o filtro (ex: `pending`).\n"
+        "- O estoque é reposto com um único UPDATE agregado por lote de pedidos.\n"
+        "- IDs não encontrados são informados em `missing_ids`.\n\n"
+        "Casos de uso:\n"
+        "- Cancelar pedidos pendentes antigos.\n"
+        "- Remover vários pedidos duplicados de uma vez."
+    ),
+)
+def delete_orders_in_bulk(
+    db: Session = Depends(get_db),
+    user: Principal = Depends(require_admin),
+    ids: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    older_than_days: Optional[int] = Query(None, ge=0),
+):
+    id_list = parse_ids(ids) if ids is not None else None
+    return delete_orders(db, id_list, status, older_than_days)
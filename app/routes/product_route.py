@@ -1,21 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import os
 
 from app.db.database import get_db
-from app.schemas.product_schema import ProductCreate, ProductUpdate, ProductOut
+from app.schemas.product_schema import (
+    ProductCreate,
+    ProductUpdate,
+    ProductOut,
+    ProductOutList,
+)
 from app.services.product_service import (
     get_products as service_get_products,
+    count_products,
+    get_products_by_ids,
     get_product_by_id,
     create_product as service_create_product,
     update_product as service_update_product,
     delete_product as service_delete_product,
 )
-from app.routes.auth_route import get_current_user, require_admin
-
-IMAGE_FOLDER = "app/static/images"
+from app.routes.auth_route import get_current_principal, require_admin
+from app.utils.file_utils import image_response
+from app.utils.batch import parse_ids, with_missing_ids
+from app.utils.fieldsets import fieldset_response, parse_fields
+from app.utils.responses import json_list_response, paginated_response
 
 router = APIRouter(prefix="/products", tags=["products"])
 
@@ -29,7 +36,10 @@ router = APIRouter(prefix="/products", tags=["products"])
         "Regras de negócio:\n"
         "- Pode ser usado por qualquer usuário autenticado.\n"
         "- Filtros disponíveis: seção (`section`), preço mínimo e máximo (`min_price`, `max_price`), disponibilidade (`available`).\n"
-        "- Paginação controlada pelos parâmetros `skip` e `limit`.\n\n"
+        "- Paginação controlada pelos parâmetros `skip` e `limit`.\n"
+        "- O parâmetro `fields` limita os campos retornados (ex: `id,description,price`); campos inválidos retornam erro 400.\n"
+        "- O parâmetro `ids` (ex: `1,2,3`) busca vários registros de uma vez, na ordem pedida; os demais filtros e a paginação são ignorados. IDs não encontrados são informados no header `X-Missing-Ids`.\n"
+        "- Com `with_total=true` a resposta vira `{items, total, total_exact, skip, limit}`. O total é exato (`COUNT(*)`) para conjuntos pequenos; em tabelas grandes no PostgreSQL é a estimativa do planner, com `total_exact=false`.\n\n"
         "Casos de uso:\n"
         "- Navegar por todos os produtos.\n"
         "- Buscar produtos dentro de uma faixa de preço específica.\n"
@@ -38,17 +48,36 @@ router = APIRouter(prefix="/products", tags=["products"])
 )
 def get_products(
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(get_current_principal),
     skip: int = 0,
     limit: int = 10,
     section: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None),
     max_price: Optional[float] = Query(None),
     available: Optional[bool] = Query(None),
+    fields: Optional[str] = Query(None),
+    ids: Optional[str] = Query(None),
+    with_total: bool = Query(False),
 ):
-    return service_get_products(
-        db, skip, limit, section, min_price, max_price, available
-    )
+    fieldset = parse_fields(fields, ProductOut)
+    missing = None
+    if ids is not None:
+        products, missing = get_products_by_ids(db, parse_ids(ids), fieldset)
+    else:
+        products = service_get_products(
+            db, skip, limit, section, min_price, max_price, available, fieldset
+        )
+
+    if fieldset:
+        response = fieldset_response(products, fieldset)
+    else:
+        response = json_list_response(ProductOutList, products)
+    if missing is not None:
+        return with_missing_ids(response, missing)
+    if with_total:
+        total, exact = count_products(db, section, min_price, max_price, available)
+        return paginated_response(response, total, exact, skip, limit)
+    return response
 
 
 @router.post(
@@ -65,12 +94,12 @@ def get_products(
         "- Atualizar o estoque com novos itens disponíveis."
     ),
 )
-def create_product(
+async def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
     user=Depends(require_admin),
 ):
-    return service_create_product(db, product)
+    return await service_create_product(db, product)
 
 
 @router.get(
@@ -90,7 +119,7 @@ def create_product(
 def get_product(
     product_id: int,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(get_current_principal),
 ):
     product = get_product_by_id(db, product_id)
     if not product:
@@ -112,13 +141,13 @@ def get_product(
         "- Atualizar preço ou disponibilidade de um item do catálogo."
     ),
 )
-def update_product(
+async def update_product(
     product_id: int,
     update_data: ProductUpdate,
     db: Session = Depends(get_db),
     user=Depends(require_admin),
 ):
-    product = service_update_product(db, product_id, update_data)
+    product = await service_update_product(db, product_id, update_data)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -137,12 +166,12 @@ def update_product(
         "- Apagar itens com erro de cadastro."
     ),
 )
-def delete_product(
+async def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
     user=Depends(require_admin),
 ):
-    success = service_delete_product(db, product_id)
+    success = await service_delete_product(db, product_id)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
     return {"detail": "Product deleted successfully"}
@@ -155,14 +184,17 @@ def delete_product(
         "Serve imagens estáticas dos produtos com base no nome do arquivo.\n\n"
         "Regras de negócio:\n"
         "- Qualquer usuário pode acessar esta rota.\n"
-        "- A imagem deve estar salva na pasta `app/static/images`.\n"
+        "- A imagem é lida do armazenamento configurado (`IMAGE_STORAGE_BACKEND`: pasta local ou S3).\n"
+        "- Se o cliente aceitar, serve a versão pré-comprimida (brotli/gzip) gerada no upload.\n"
         "- Retorna erro 404 se a imagem não existir.\n\n"
         "Casos de uso:\n"
         "- Carregar imagens dos produtos para exibição no frontend."
     ),
 )
-def serve_product_image(image_filename: str):
-    file_path = os.path.join(IMAGE_FOLDER, image_filename)
-    if not os.path.exists(file_path):
+async def serve_product_image(image_filename: str, request: Request):
+    response = await image_response(
+        image_filename, request.headers.get("accept-encoding", "")
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(file_path)
+    return response
@@ -0,0 +1,47 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from app.routes.auth_route import require_admin
+from app.schemas.profile_schema import ProfileOut
+from app.utils.profiler import list_profiles, profile_path
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+@router.get(
+    "/",
+    response_model=List[ProfileOut],
+    summary="Listar perfis de CPU",
+    description=(
+        "Lista os perfis de CPU gravados, do mais recente para o mais antigo.\n\n"
+        "Regras de negócio:\n"
+        "- Apenas usuários admin podem listar perfis.\n"
+        "- Só existe com PROFILING_ENABLED=true.\n\n"
+        "Casos de uso:\n"
+        "- Encontrar os perfis gravados no modo contínuo (1 em cada N requisições)."
+    ),
+)
+def get_profiles(user=Depends(require_admin)):
+    return list_profiles()
+
+
+@router.get(
+    "/{name}",
+    summary="Baixar perfil de CPU",
+    description=(
+        "Baixa um perfil no formato do speedscope (https://www.speedscope.app), "
+        "que mostra o flamegraph da requisição.\n\n"
+        "Regras de negócio:\n"
+        "- Apenas usuários admin podem baixar perfis.\n"
+        "- Retorna erro 404 se o perfil não existir.\n\n"
+        "Casos de uso:\n"
+        "- Ver onde o tempo de uma rota lenta foi gasto, sem novo deploy."
+    ),
+)
+def get_profile(name: str, user=Depends(require_admin)):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(path, media_type="application/json", filename=name)
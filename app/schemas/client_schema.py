@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict, constr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, constr, TypeAdapter
+from typing import List, Optional
 
 # Define o tipo CPF com restrições de tamanho (11 dígitos)
 CPFStr = constr(min_length=11, max_length=11)
@@ -25,5 +25,11 @@ class ClientUpdate(BaseModel):
 
 class ClientOut(ClientBase):
     id: int
+    # O email já foi validado na escrita; revalidar na saída custa caro nas listagens
+    email: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Adapter para serializar listas de ClientOut em uma única passada
+ClientOutList = TypeAdapter(List[ClientOut])
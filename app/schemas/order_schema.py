@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict, Field
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from app.schemas.product_schema import ProductOut
 
@@ -44,3 +45,30 @@ class OrderOut(OrderBase):
     products: List[OrderProductOut]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class OrderStatus(str, Enum):
+    pending = "pending"
+    paid = "paid"
+    shipped = "shipped"
+    delivered = "delivered"
+    cancelled = "cancelled"
+
+
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+    # Se informado, a troca só acontece se o pedido ainda estiver nesse status
+    expected_status: Optional[OrderStatus] = None
+
+
+class OrderStatusOut(BaseModel):
+    id: int
+    client_id: int
+    status: str
+    created_by: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Adapter para serializar listas de OrderOut em uma única passada
+OrderOutList = TypeAdapter(List[OrderOut])
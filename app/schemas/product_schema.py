@@ -1,6 +1,6 @@
 # schemas/product_schema.py
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from typing import List, Optional
 from datetime import date
 
 
@@ -34,3 +34,7 @@ class ProductOut(ProductBase):
     image_path: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Adapter para serializar listas de ProductOut em uma única passada
+ProductOutList = TypeAdapter(List[ProductOut])
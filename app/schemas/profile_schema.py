@@ -0,0 +1,9 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ProfileOut(BaseModel):
+    name: str
+    size: int
+    created_at: datetime
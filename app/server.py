@@ -0,0 +1,284 @@
+"""Servidor de produção: uvicorn com workers pré-forkados.
+
+O processo mestre importa a aplicação uma vez, congela o heap com
+gc.freeze() e faz fork dos workers, que compartilham essas páginas por
+copy-on-write em vez de cada um importar tudo de novo. O mestre mantém o
+número de workers, recicla os que passam de SERVER_MAX_REQUESTS requisições
+ou de SERVER_MAX_RSS_MB de memória e, no SIGTERM/SIGINT, espera as
+requisições em andamento terminarem (até SERVER_GRACEFUL_TIMEOUT segundos).
+
+Uso: python -m app.server [--workers N] [--port 8000]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+from prometheus_client import multiprocess
+
+from app.core.config import (
+    PORT,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_HOST,
+    SERVER_MAX_REQUESTS,
+    SERVER_MAX_REQUESTS_JITTER,
+    SERVER_MAX_RSS_MB,
+    WEB_CONCURRENCY,
+)
+
+logger = logging.getLogger("app.server")
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+# Um worker por CPU disponível para o processo (respeita cpuset de container)
+def default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None  # sem /proc (macOS) ou processo já encerrado
+
+
+class RequestLimit:
+    # Conta as requisições HTTP do worker e pede um desligamento gracioso ao
+    # atingir o limite; o mestre sobe outro no lugar
+    def __init__(self, app, max_requests: int):
+        self.app = app
+        self.max_requests = max_requests
+        self.count = 0
+        self.server = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.max_requests:
+            self.count += 1
+            if self.count == self.max_requests and self.server is not None:
+                logger.info(
+                    "Worker %s atingiu %s requisições, reciclando",
+                    os.getpid(),
+                    self.count,
+                )
+                self.server.should_exit = True
+        await self.app(scope, receive, send)
+
+
+def run_worker(app, sock: socket.socket, max_requests: int, graceful_timeout: int):
+    import uvicorn
+    from app.db.database import engine
+
+    # As conexões abertas pelo mestre não podem ser usadas por dois processos
+    engine.dispose(close=False)
+    gc.enable()
+    # O uvicorn repete o sinal ao terminar; aqui o worker só precisa sair
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *args: None)
+
+    limited = RequestLimit(app, max_requests)
+    config = uvicorn.Config(
+        limited,
+        timeout_graceful_shutdown=graceful_timeout,
+        access_log=False,
+        log_config=None,
+    )
+    server = uvicorn.Server(config)
+    limited.server = server
+    server.run(sockets=[sock])
+
+
+class Master:
+    def __init__(
+        self,
+        app,
+        sock: socket.socket,
+        workers: int,
+        max_requests: int = SERVER_MAX_REQUESTS,
+        max_requests_jitter: int = SERVER_MAX_REQUESTS_JITTER,
+        max_rss_mb: int = SERVER_MAX_RSS_MB,
+        graceful_timeout: int = SERVER_GRACEFUL_TIMEOUT,
+    ):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, float] = {}  # pid -> horário em que subiu
+        self.retiring: Dict[int, float] = {}  # pid -> prazo para encerrar
+        self.stopping = False
+
+    def spawn(self):
+        # Jitter para os workers não reciclarem todos ao mesmo tempo
+        limit = self.max_requests
+        if limit and self.max_requests_jitter:
+            limit += random.randint(0, self.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, limit, self.graceful_timeout)
+            except BaseException:
+                logger.exception("Worker %s falhou", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info("Worker %s iniciado", pid)
+
+    def retire(self, pid: int):
+        self.workers.pop(pid, None)
+        self.retiring[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            self.retiring.pop(pid, None)
+            # Gauges "live*" do Prometheus não devem contar o worker que saiu
+            if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+                multiprocess.mark_process_dead(pid)
+            if started is not None and not self.stopping:
+                code = os.waitstatus_to_exitcode(status)
+                logger.info("Worker %s saiu (código %s)", pid, code)
+                # Falha logo ao subir: espera antes de tentar de novo
+                if code != 0 and time.monotonic() - started < 1:
+                    time.sleep(1)
+
+    def check_memory(self):
+        if not self.max_rss:
+            return
+        for pid in list(self.workers):
+            rss = rss_bytes(pid)
+            if rss and rss > self.max_rss:
+                logger.info(
+                    "Worker %s com %.0f MB de RSS, reciclando", pid, rss / 2**20
+                )
+                # O substituto sobe antes, para não perder capacidade
+                self.spawn()
+                self.retire(pid)
+
+    def kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def handle_stop(self, sig, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        # Tudo que foi importado até aqui fica fora do GC dos workers: as
+        # páginas continuam compartilhadas por copy-on-write
+        gc.freeze()
+        while not self.stopping:
+            self.reap()
+            while len(self.workers) < self.size and not self.stopping:
+                self.spawn()
+            self.check_memory()
+            self.kill_overdue()
+            time.sleep(0.5)
+        self.shutdown()
+
+    def shutdown(self):
+        logger.info("Encerrando %s workers", len(self.workers))
+        for pid in list(self.workers):
+            self.retire(pid)
+        while self.retiring:
+            self.reap()
+            self.kill_overdue()
+            time.sleep(0.1)
+        self.sock.close()
+
+
+# O broker do /events é por processo (ids, replay e assinantes): com mais de
+# um worker ele é desligado antes do fork, e o /events responde 503
+def restrict_events(workers: int):
+    from app.utils.events import broker
+
+    if workers > 1:
+        broker.enabled = False
+        logger.warning(
+            "/events desativado: o broker de eventos é por processo e há %s "
+            "workers; use --workers 1 para o SSE",
+            workers,
+        )
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--max-requests", type=int, default=SERVER_MAX_REQUESTS)
+    parser.add_argument(
+        "--max-requests-jitter", type=int, default=SERVER_MAX_REQUESTS_JITTER
+    )
+    parser.add_argument("--max-rss-mb", type=int, default=SERVER_MAX_RSS_MB)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    # Sem coletas durante o import: os objetos criados não são tocados pelo GC
+    # antes do gc.freeze(), e as páginas não são copiadas à toa nos workers
+    gc.disable()
+    from app.main import app
+    from app.db.database import engine
+
+    engine.dispose()
+    sock = bind_socket(args.host, args.port)
+    workers = args.workers or default_workers()
+    restrict_events(workers)
+    logger.info(
+        "Servindo em %s:%s com %s workers (mestre %s)",
+        args.host,
+        args.port,
+        workers,
+        os.getpid(),
+    )
+    Master(
+        app,
+        sock,
+        workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        max_rss_mb=args.max_rss_mb,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
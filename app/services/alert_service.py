@@ -0,0 +1,211 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import (
+    ALERT_BATCH_SIZE,
+    ALERT_EXPIRING_DAYS,
+    ALERT_SCAN_GRACE_SECONDS,
+    ALERT_SECTION_THRESHOLDS,
+    ALERT_STOCK_THRESHOLD,
+    ALERT_WHATSAPP_NUMBERS,
+)
+from app.models.product_model import Product
+from app.models.scan_state_model import ScanState
+from app.models.stock_movement_model import (
+    REASON_EXPIRATION,
+    REASON_INITIAL,
+    REASON_SNAPSHOT,
+    StockMovement,
+)
+from app.utils.send_sms import send_whatsapp_message
+
+logger = logging.getLogger(__name__)
+
+STOCK_ALERTS_SCANNER = "stock_alerts"
+
+
+# Filtro de estoque baixo com limite por seção; o "stock < maior limite" deixa
+# o banco usar o índice de products.stock antes de olhar a seção
+def low_stock_filter(thresholds: Dict[str, int], default_threshold: int):
+    conditions = [
+        and_(Product.section == section, Product.stock < threshold)
+        for section, threshold in thresholds.items()
+    ]
+    if thresholds:
+        conditions.append(
+            and_(Product.section.notin_(thresholds), Product.stock < default_threshold)
+        )
+    else:
+        conditions.append(Product.stock < default_threshold)
+    return and_(
+        Product.stock < max([default_threshold, *thresholds.values()]),
+        or_(*conditions),
+    )
+
+
+def format_alerts(lines: List[str], batch_size: int) -> List[str]:
+    batches = [lines[i : i + batch_size] for i in range(0, len(lines), batch_size)]
+    return [
+        f"⚠️ Alerta de estoque ({n}/{len(batches)})\n" + "\n".join(batch)
+        for n, batch in enumerate(batches, start=1)
+    ]
+
+
+# Varre só o que mudou desde a última execução: produtos com movimentações
+# novas no livro de estoque e validades que entraram na janela de N dias.
+# A marca d'água só passa por movimentações com mais de `grace_seconds`: um
+# id menor pode ficar visível depois de um maior (commit mais lento), e as
+# linhas recentes esperam a próxima varredura para não serem puladas
+def scan_stock_alerts(
+    db: Session,
+    send: Callable[[str, str], object] = send_whatsapp_message,
+    numbers: List[str] = ALERT_WHATSAPP_NUMBERS,
+    thresholds: Dict[str, int] = ALERT_SECTION_THRESHOLDS,
+    default_threshold: int = ALERT_STOCK_THRESHOLD,
+    expiring_days: int = ALERT_EXPIRING_DAYS,
+    batch_size: int = ALERT_BATCH_SIZE,
+    today: Optional[date] = None,
+    grace_seconds: int = ALERT_SCAN_GRACE_SECONDS,
+) -> dict:
+    today = today or date.today()
+    horizon = today + timedelta(days=expiring_days)
+    state = db.get(ScanState, STOCK_ALERTS_SCANNER)
+    first_run = state is None
+    if first_run:
+        state = ScanState(name=STOCK_ALERTS_SCANNER, last_movement_id=0)
+        db.add(state)
+
+    # A primeira execução lê o estado atual e cobre todo o livro; nas outras,
+    # snapshots (created_at antigo, id novo) não podem puxar a marca
+    settled = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    latest = select(func.max(StockMovement.id))
+    if not first_run:
+        latest = latest.where(
+            StockMovement.created_at <= settled,
+            StockMovement.reason != REASON_SNAPSHOT,
+        )
+    top = max(db.execute(latest).scalar() or 0, state.last_movement_id)
+    is_low = low_stock_filter(thresholds, default_threshold)
+    expiring_from = today - timedelta(days=1)
+    if not first_run and state.expiring_until:
+        expiring_from = max(expiring_from, state.expiring_until)
+
+    if first_run:
+        # Primeira execução: estoque baixo atual via índice de stock
+        low_stock = db.execute(select(Product).where(is_low)).scalars().all()
+        created = []
+    else:
+        changed = (
+            select(
+                StockMovement.product_id,
+                func.sum(StockMovement.quantity).label("change"),
+                func.max(
+                    case((StockMovement.reason == REASON_INITIAL, 1), else_=0)
+                ).label("created"),
+                func.max(
+                    case((StockMovement.reason == REASON_EXPIRATION, 1), else_=0)
+                ).label("dated"),
+            )
+            .where(
+                StockMovement.id > state.last_movement_id,
+                StockMovement.id <= top,
+                # Snapshots da compactação repetem o saldo antigo com id novo:
+                # não são variação de estoque (a marca d'água passa por eles)
+                StockMovement.reason != REASON_SNAPSHOT,
+            )
+            .group_by(StockMovement.product_id)
+            .subquery()
+        )
+        # Variação depois da marca nova: o estoque atual já inclui, mas ela
+        # fica para a próxima varredura
+        later = (
+            select(
+                StockMovement.product_id,
+                func.sum(StockMovement.quantity).label("change"),
+            )
+            .where(
+                StockMovement.id > top,
+                StockMovement.reason != REASON_SNAPSHOT,
+            )
+            .group_by(StockMovement.product_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                Product,
+                changed.c.change,
+                func.coalesce(later.c.change, 0),
+                changed.c.created,
+                changed.c.dated,
+            )
+            .join(changed, changed.c.product_id == Product.id)
+            .outerjoin(later, later.c.product_id == Product.id)
+        ).all()
+
+        # Só alerta quem cruzou o limite na janela (ou foi cadastrado já abaixo
+        # dele) e continua abaixo agora
+        low_stock = []
+        for product, change, later_change, was_created, _ in rows:
+            threshold = thresholds.get(product.section, default_threshold)
+            at_top = product.stock - later_change
+            crossed = was_created or at_top - change >= threshold
+            if at_top < threshold and product.stock < threshold and crossed:
+                low_stock.append(product)
+        # Produtos novos ou com validade trocada: a data pode já estar na janela
+        created = [
+            product
+            for product, _, _, was_created, was_dated in rows
+            if was_created or was_dated
+        ]
+
+    # Validades que entraram na janela desde a última execução, mais produtos
+    # novos (ou com a validade editada) que já estão dentro dela
+    expiring = (
+        db.execute(
+            select(Product)
+            .where(
+                Product.expiration_date > expiring_from,
+                Product.expiration_date <= horizon,
+            )
+            .order_by(Product.expiration_date, Product.id)
+        )
+        .scalars()
+        .all()
+    )
+    expiring_ids = {product.id for product in expiring}
+    expiring += [
+        product
+        for product in created
+        if product.id not in expiring_ids
+        and product.expiration_date
+        and today <= product.expiration_date <= horizon
+    ]
+
+    lines = [
+        f"- Estoque baixo: {p.description} (#{p.id}, {p.section}): {p.stock} un. "
+        f"(mínimo {thresholds.get(p.section, default_threshold)})"
+        for p in sorted(low_stock, key=lambda p: p.id)
+    ] + [
+        f"- Vencendo: {p.description} (#{p.id}) em {p.expiration_date.isoformat()}"
+        for p in expiring
+    ]
+    messages = format_alerts(lines, batch_size)
+    for message in messages:
+        for number in numbers:
+            send(number, message)
+    if messages and not numbers:
+        logger.warning("Alertas de estoque sem destinatário: %s", "\n".join(lines))
+
+    # A marca d'água só avança depois do envio; se falhar, a próxima execução repete
+    state.last_movement_id = top
+    state.expiring_until = horizon
+    state.scanned_at = datetime.utcnow()
+    db.commit()
+
+    return {
+        "low_stock": sorted(p.id for p in low_stock),
+        "expiring": [p.id for p in expiring],
+        "messages": len(messages),
+    }
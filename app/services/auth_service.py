@@ -1,56 +1,109 @@
+import logging
+import uuid
+from typing import Annotated
+from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
+from app.models.refresh_token_model import RefreshToken
 from app.models.user_model import User
 from app.db.database import get_db
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import SECRET_KEY, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS
 from app.core.security import hash_password, verify_password
 from app.utils.jwt import create_access_token, create_refresh_token, decode_access_token
-from app.validations.auth_validation import validate_email_not_registered
+from app.utils.revocation import revoked_families, token_versions
+from app.utils.integrity import unique_guard
+from app.validations.auth_validation import USER_UNIQUE_MESSAGES
+
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+# Valida o access token e a sessão dele, sem consultar o usuário
+def decode_session_token(token: str, db: Session) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None or payload.get("typ") == "refresh":
+        raise _credentials_exception()
 
-    user = db.query(User).filter(User.email == email).first()
+    # Sessão encerrada (logout, reuso de refresh token ou conta excluída)
+    family_id = payload.get("fam")
+    if family_id:
+        revoked_families.sync(db)
+        if revoked_families.is_revoked(family_id):
+            raise _credentials_exception()
+    return payload
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> User:
+    payload = decode_session_token(token, db)
+    user = db.query(User).filter(User.email == payload["sub"]).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
-def require_admin(user: User = Depends(get_current_user)):
-    if user.is_admin != 1:
+# Identidade e papel do usuário autenticado, lidos das claims do token
+class Principal:
+    def __init__(self, id: int, email: str, is_admin: bool):
+        self.id = id
+        self.email = email
+        self.is_admin = is_admin
+
+
+# Para rotas que só precisam de id e papel: usa uid/adm do token e confere a
+# versão (ver) contra o cache, sem buscar o usuário. Tokens sem essas claims
+# caem na busca pelo e-mail.
+def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    payload = decode_session_token(token, db)
+    user_id, version = payload.get("uid"), payload.get("ver")
+    if user_id is None or version is None:
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        if user is None:
+            raise _credentials_exception()
+        return Principal(user.id, user.email, user.is_admin == 1)
+
+    if token_versions.get(db, user_id) != version:
+        raise _credentials_exception()
+    return Principal(user_id, payload["sub"], bool(payload.get("adm")))
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+def require_admin(principal: CurrentPrincipal) -> Principal:
+    if not principal.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso restrito a administradores",
         )
-    return user
+    return principal
 
 
 def create_user(db: Session, email: str, password: str) -> User:
-
-    # Validações
-    validate_email_not_registered(db, email)
     hashed_pw = hash_password(password)
     new_user = User(email=email, hashed_password=hashed_pw)
-    db.add(new_user)
+    # Email único garantido pelo índice de users.email
+    with unique_guard(db, USER_UNIQUE_MESSAGES):
+        db.add(new_user)
     db.commit()
     db.refresh(new_user)
     return new_user
@@ -65,19 +118,134 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
     return user
 
 
-def generate_tokens(email: str):
-    access_token = create_access_token(data={"sub": email})
-    refresh_token = create_refresh_token(data={"sub": email})
+# Abre uma família nova de tokens (uma por login)
+def generate_tokens(db: Session, user: User):
+    return _issue_tokens(db, user, str(uuid.uuid4()))
+
+
+# O access token leva id, papel e versão do usuário (uid/adm/ver)
+def _issue_tokens(db: Session, user: User, family_id: str):
+    jti = str(uuid.uuid4())
+    db.add(
+        RefreshToken(
+            jti=jti,
+            family_id=family_id,
+            user_id=user.id,
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    db.commit()
+    access_token = create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "adm": user.is_admin == 1,
+            "ver": user.token_version,
+            "fam": family_id,
+        }
+    )
+    refresh_token = create_refresh_token(
+        data={"sub": user.email, "fam": family_id, "jti": jti}
+    )
     return access_token, refresh_token
 
 
-def refresh_tokens(refresh_token: str):
+# Troca o refresh token por um par novo; cada refresh token vale uma única vez.
+# Reusar um token já trocado indica vazamento e revoga a família inteira.
+def refresh_tokens(db: Session, refresh_token: str):
     payload = decode_access_token(refresh_token)
-    if not payload:
+    if not payload or payload.get("typ") != "refresh" or not payload.get("jti"):
         return None, None
-    email = payload.get("sub")
-    if not email:
+
+    now = datetime.utcnow()
+    used = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == payload["jti"],
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if used.rowcount != 1:
+        token = db.get(RefreshToken, payload["jti"])
+        if token is not None and token.used_at is not None:
+            logger.warning(
+                "Refresh token reutilizado; revogando família %s", token.family_id
+            )
+            revoke_family(db, token.family_id)
+        db.rollback()
+        return None, None
+
+    token = db.get(RefreshToken, payload["jti"])
+    user = db.get(User, token.user_id)
+    if user is None:
+        db.rollback()
         return None, None
-    access_token = create_access_token(data={"sub": email})
-    new_refresh_token = create_refresh_token(data={"sub": email})
-    return access_token, new_refresh_token
+    return _issue_tokens(db, user, token.family_id)
+
+
+def revoke_family(db: Session, family_id: str):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    revoked_families.revoke(family_id)
+
+
+# Encerra a sessão do access token informado (a família dele)
+def logout(db: Session, token: str):
+    payload = decode_access_token(token)
+    family_id = payload.get("fam") if payload else None
+    if family_id:
+        revoke_family(db, family_id)
+
+
+# Revoga todas as sessões do usuário e exclui a conta
+def delete_user(db: Session, user: User):
+    families = (
+        db.execute(
+            select(RefreshToken.family_id)
+            .where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+            .distinct()
+        )
+        .scalars()
+        .all()
+    )
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    user_id = user.id
+    db.delete(user)
+    db.commit()
+    for family_id in families:
+        revoked_families.revoke(family_id)
+    token_versions.invalidate(user_id)
+
+
+# Muda o papel do usuário; a versão nova invalida os access tokens emitidos antes
+def toggle_admin(db: Session, user: User) -> User:
+    user.is_admin = 0 if user.is_admin == 1 else 1
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+    token_versions.invalidate(user.id)
+    return user
+
+
+# Remove refresh tokens expirados (não precisam mais de registro)
+def purge_expired_refresh_tokens(db: Session) -> int:
+    result = db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -1,8 +1,21 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models import Client
 from app.schemas.client_schema import ClientCreate, ClientUpdate
-from app.validations.client_validation import validate_unique_email, validate_unique_cpf
+from app.utils.batch import order_by_ids
+from app.utils.counts import Total, count_total
+from app.utils.fieldsets import Fieldset, loader_options
+from app.utils.integrity import unique_guard
+from app.validations.client_validation import CLIENT_UNIQUE_MESSAGES
+
+
+def filter_clients(db: Session, name: Optional[str], email: Optional[str]):
+    query = db.query(Client)
+    if name:
+        query = query.filter(Client.name.contains(name))
+    if email:
+        query = query.filter(Client.email.contains(email))
+    return query
 
 
 # Pesquisa todos os clientes com filtro e paginação
@@ -12,15 +25,32 @@ def get_clients(
     limit: int = 10,
     name: Optional[str] = None,
     email: Optional[str] = None,
+    fields: Optional[Fieldset] = None,
 ) -> List[Client]:
-    query = db.query(Client)
-    if name:
-        query = query.filter(Client.name.contains(name))
-    if email:
-        query = query.filter(Client.email.contains(email))
+    query = filter_clients(db, name, email)
+    if fields:
+        query = query.options(*loader_options(Client, fields))
     return query.offset(skip).limit(limit).all()
 
 
+# Total de clientes com os mesmos filtros da listagem (exato ou estimado)
+def count_clients(
+    db: Session, name: Optional[str] = None, email: Optional[str] = None
+) -> Total:
+    query = filter_clients(db, name, email)
+    return count_total(db, query, Client.__tablename__, bool(name or email))
+
+
+# Busca vários clientes por ID em uma única query, na ordem pedida
+def get_clients_by_ids(
+    db: Session, ids: List[int], fields: Optional[Fieldset] = None
+) -> Tuple[List[Client], List[int]]:
+    query = db.query(Client).filter(Client.id.in_(ids))
+    if fields:
+        query = query.options(*loader_options(Client, fields))
+    return order_by_ids(query.all(), ids)
+
+
 # Procura um cliente por ID
 def get_client_by_id(db: Session, client_id: int) -> Client | None:
     return db.get(Client, client_id)
@@ -28,13 +58,10 @@ def get_client_by_id(db: Session, client_id: int) -> Client | None:
 
 # Cria um novo cliente
 def create_client(db: Session, client_data: ClientCreate) -> Client:
-
-    # Validaçoes
-    validate_unique_email(db, client_data.email)
-    validate_unique_cpf(db, client_data.cpf)
-
     client = Client(**client_data.model_dump())
-    db.add(client)
+    # Email e CPF únicos garantidos pelos índices do banco, sem SELECT antes
+    with unique_guard(db, CLIENT_UNIQUE_MESSAGES):
+        db.add(client)
     db.commit()
     db.refresh(client)
     return client
@@ -48,12 +75,11 @@ def update_client(db: Session, client_id: int, update_data: ClientUpdate) -> Cli
 
     update_dict = update_data.model_dump(exclude_unset=True)
 
-    # Validações
-    validate_unique_email(db, update_dict.get("email"), client_id=client.id)
-    validate_unique_cpf(db, update_dict.get("cpf"), client_id=client.id)
-
-    for field, value in update_dict.items():
-        setattr(client, field, value)
+    # Só os campos que mudaram são gravados (e podem violar os índices únicos)
+    changes = {f: v for f, v in update_dict.items() if getattr(client, f) != v}
+    with unique_guard(db, CLIENT_UNIQUE_MESSAGES):
+        for field, value in changes.items():
+            setattr(client, field, value)
 
     db.commit()
     db.refresh(client)
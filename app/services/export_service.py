@@ -0,0 +1,90 @@
+import csv
+import io
+from typing import Iterator
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import EXPORT_BATCH_SIZE
+from app.models import Client, Order, OrderProduct, Product
+from app.schemas.export_schema import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def products_statement():
+    return select(
+        Product.id,
+        Product.description,
+        Product.price,
+        Product.barcode,
+        Product.section,
+        Product.stock,
+        Product.expiration_date,
+        Product.image_path,
+    ).order_by(Product.id)
+
+
+def clients_statement():
+    return select(
+        Client.id, Client.name, Client.email, Client.cpf, Client.whatsapp
+    ).order_by(Client.id)
+
+
+# Uma linha por item do pedido (pedidos sem itens aparecem com os campos do item vazios)
+def orders_statement(user_id: int, is_admin: bool):
+    statement = (
+        select(
+            Order.id.label("order_id"),
+            Order.client_id,
+            Order.status,
+            Order.created_by,
+            Order.created_at,
+            OrderProduct.id.label("order_product_id"),
+            OrderProduct.product_id,
+            OrderProduct.quantity,
+        )
+        .outerjoin(OrderProduct, OrderProduct.order_id == Order.id)
+        .order_by(Order.id, OrderProduct.id)
+    )
+    if not is_admin:
+        statement = statement.where(Order.created_by == user_id)
+    return statement
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunk(columns, rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+# Gera o arquivo em pedaços usando cursor no servidor (stream_results) e lotes
+# de EXPORT_BATCH_SIZE linhas: a memória fica constante, seja qual for o tamanho
+# da tabela. A sessão é fechada ao final do streaming.
+def stream_export(
+    db: Session,
+    statement,
+    export_format: ExportFormat,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    try:
+        result = db.execute(
+            statement.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        columns = list(result.keys())
+        if export_format == ExportFormat.csv:
+            yield _csv_chunk([columns])
+
+        for rows in result.partitions():
+            if export_format == ExportFormat.csv:
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(columns, rows)
+    finally:
+        db.close()
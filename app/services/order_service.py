@@ -1,12 +1,42 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from app.core.config import BULK_DELETE_BATCH_SIZE
 from app.models.client_model import Client
+from sqlalchemy import case, delete, func, insert, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List
-from app.models.order_model import Order, OrderProduct
-from app.schemas.order_schema import OrderCreate, OrderUpdate
+from typing import Dict, List, Optional
+from app.models.order_model import (
+    STATUS_CANCELLED,
+    STATUS_TRANSITIONS,
+    Order,
+    OrderProduct,
+)
 from app.models.product_model import Product
+from app.schemas.order_schema import (
+    OrderCreate,
+    OrderOut,
+    OrderProductUpdate,
+    OrderStatusUpdate,
+    OrderUpdate,
+)
+from app.utils.batch import order_by_ids
+from app.utils.fieldsets import Fieldset, full_fieldset, loader_options
 from app.utils.send_sms import send_whatsapp_message
-from app.validations.order_validation import adjust_stock, validate_stock
+from app.models.stock_movement_model import (
+    REASON_ORDER_CANCEL,
+    REASON_ORDER_CREATE,
+    REASON_ORDER_DELETE,
+    REASON_ORDER_UPDATE,
+)
+from app.validations.order_validation import apply_stock_deltas, validate_stock
+from app.utils.events import (
+    ORDER_CREATED,
+    ORDER_UPDATED,
+    publish_order_deleted,
+    publish_order_event,
+    publish_stock_changes,
+)
 
 
 def get_order(db: Session, order_id: int, user_id: int, is_admin: bool):
@@ -21,12 +51,49 @@ def get_order(db: Session, order_id: int, user_id: int, is_admin: bool):
     return order
 
 
-def list_orders(db: Session, user_id: int, is_admin: bool):
+def list_orders(
+    db: Session,
+    user_id: int,
+    is_admin: bool,
+    fields: Optional[Fieldset] = None,
+    order_status: Optional[str] = None,
+):
+    # Carrega só os campos pedidos; itens e produtos vêm em lote (selectinload)
+    query = db.query(Order).options(
+        *loader_options(Order, fields or full_fieldset(OrderOut))
+    )
+
+    # Fila por status (ex: pedidos pendentes), do mais antigo para o mais novo;
+    # nos status em aberto usa o índice parcial de (created_at, id)
+    if order_status is not None:
+        query = query.filter(Order.status == order_status).order_by(
+            Order.created_at, Order.id
+        )
+
     # Lista todos pedidos para admin, ou só os do usuário comum
     if is_admin:
-        return db.query(Order).all()
+        return query.all()
     else:
-        return db.query(Order).filter(Order.created_by == user_id).all()
+        return query.filter(Order.created_by == user_id).all()
+
+
+def get_orders_by_ids(
+    db: Session,
+    ids: List[int],
+    user_id: int,
+    is_admin: bool,
+    fields: Optional[Fieldset] = None,
+):
+    # Busca os pedidos em uma única query; pedidos de outros usuários contam
+    # como não encontrados para usuários comuns
+    query = (
+        db.query(Order)
+        .options(*loader_options(Order, fields or full_fieldset(OrderOut)))
+        .filter(Order.id.in_(ids))
+    )
+    if not is_admin:
+        query = query.filter(Order.created_by == user_id)
+    return order_by_ids(query.all(), ids)
 
 
 def create_order(db: Session, order_in: OrderCreate, user_id: int):
@@ -38,19 +105,28 @@ def create_order(db: Session, order_in: OrderCreate, user_id: int):
         client_id=order_in.client_id, status=order_in.status, created_by=user_id
     )
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
 
-    # Adiciona produtos ao pedido e atualiza estoque
+    # Adiciona produtos ao pedido e baixa o estoque, tudo na mesma transação
+    stock_deltas = defaultdict(int)
+    lines = []
     for item in order_in.products:
-        order_product = OrderProduct(
-            order_id=db_order.id, product_id=item.product_id, quantity=item.quantity
+        lines.append(
+            {
+                "order_id": db_order.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+            }
         )
-        db.add(order_product)
-        adjust_stock(db, item.product_id, -item.quantity)
+        stock_deltas[item.product_id] -= item.quantity
+    if lines:
+        db.execute(insert(OrderProduct), lines)
+    apply_stock_deltas(db, stock_deltas, REASON_ORDER_CREATE, db_order.id)
 
     db.commit()
     db.refresh(db_order)
+    publish_order_event(ORDER_CREATED, db_order)
+    publish_stock_changes(stock_deltas)
 
     # Busca o cliente para pegar o telefone do WhatsApp
     client = db.query(Client).filter(Client.id == order_in.client_id).first()
@@ -75,70 +151,197 @@ def update_order(
     if order_update.client_id is not None:
         order.client_id = order_update.client_id
 
-    current_products = {p.id: p for p in order.products}
-    updated_products = order_update.products or []
-
-    updated_ids = {p.id for p in updated_products if p.id is not None}
-    current_ids = set(current_products.keys())
-
-    # Identifica produtos removidos
-    removed_products = [current_products[p_id] for p_id in current_ids - updated_ids]
-
-    # Prepara lista de produtos para validar e ajustar estoque
-    product_ids = set()
-    product_ids.update([p.product_id for p in removed_products])
-    product_ids.update([p.product_id for p in updated_products])
-    products = db.query(Product).filter(Product.id.in_(product_ids)).all()
-    product_map = {p.id: p for p in products}
-
-    # Repõe estoque dos produtos removidos
-    for removed in removed_products:
-        adjust_stock(db, removed.product_id, removed.quantity)
-        db.delete(removed)
-
-    # Atualiza quantidades ou adiciona novos produtos no pedido
-    for p_data in updated_products:
-        if p_data.id in current_products:
-            order_prod = current_products[p_data.id]
-            product = product_map.get(order_prod.product_id)
-
-            diff = p_data.quantity - order_prod.quantity
-
-            # Checa estoque se aumentando quantidade
-            if diff > 0 and product.stock < diff:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for product {product.description}",
-                )
-
-            adjust_stock(db, order_prod.product_id, -diff)
-            order_prod.quantity = p_data.quantity
-            db.add(order_prod)
-        else:
-            product = product_map.get(p_data.product_id)
-            if not product:
-                raise HTTPException(
-                    status_code=404, detail=f"Product {p_data.product_id} not found"
-                )
-            if product.stock < p_data.quantity:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for product {product.description}",
-                )
-
-            new_order_product = OrderProduct(
-                order_id=order.id,
-                product_id=p_data.product_id,
-                quantity=p_data.quantity,
-            )
-            db.add(new_order_product)
-            adjust_stock(db, p_data.product_id, -p_data.quantity)
+    # Sem `products` no corpo, os itens ficam como estão
+    stock_deltas = {}
+    if order_update.products is not None:
+        stock_deltas = _update_order_lines(db, order.id, order_update.products)
+    apply_stock_deltas(db, stock_deltas, REASON_ORDER_UPDATE, order.id)
 
     db.commit()
-    db.refresh(order)
+    order = (
+        db.query(Order)
+        .options(*loader_options(Order, full_fieldset(OrderOut)))
+        .filter(Order.id == order.id)
+        .one()
+    )
+    publish_order_event(ORDER_UPDATED, order)
+    publish_stock_changes(stock_deltas)
     return order
 
 
+# Troca só o status com um único UPDATE condicional: a transição é validada
+# no próprio WHERE (o status atual precisa ser uma origem permitida), sem
+# carregar o pedido nem os itens (só o cancelamento lê os itens, para devolver
+# o estoque). Uma troca concorrente faz o UPDATE não afetar nenhuma linha, e a
+# resposta é 409
+def update_order_status(
+    db: Session,
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    user_id: int,
+    is_admin: bool,
+):
+    new_status = status_update.status.value
+    expected = status_update.expected_status
+    if expected is not None:
+        allowed = [expected.value]
+        if new_status not in STATUS_TRANSITIONS[expected.value]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status transition: {expected.value} -> {new_status}",
+            )
+    else:
+        allowed = [
+            source
+            for source, targets in STATUS_TRANSITIONS.items()
+            if new_status in targets
+        ]
+        if not allowed:
+            raise HTTPException(
+                status_code=400, detail=f"Status {new_status} cannot be set"
+            )
+
+    statement = (
+        update(Order)
+        .where(Order.id == order_id, Order.status.in_(allowed))
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    if not is_admin:
+        statement = statement.where(Order.created_by == user_id)
+    columns = (Order.id, Order.client_id, Order.status, Order.created_by)
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(statement.returning(*columns)).first()
+    else:
+        updated = db.execute(statement).rowcount
+        row = db.execute(select(*columns).where(Order.id == order_id)).first()
+        if not updated:
+            row = None
+
+    if row is None:
+        db.rollback()
+        _raise_status_conflict(db, order_id, status_update, user_id, is_admin)
+
+    # Cancelar devolve o estoque dos itens na mesma transação, como o
+    # cancelamento em massa
+    stock_deltas = {}
+    if new_status == STATUS_CANCELLED:
+        stock_deltas = dict(
+            db.execute(
+                select(OrderProduct.product_id, func.sum(OrderProduct.quantity))
+                .where(OrderProduct.order_id == order_id)
+                .group_by(OrderProduct.product_id)
+            ).all()
+        )
+        apply_stock_deltas(db, stock_deltas, REASON_ORDER_CANCEL, order_id)
+    db.commit()
+    publish_order_event(ORDER_UPDATED, row)
+    publish_stock_changes(stock_deltas)
+    return row
+
+
+# Só quando o UPDATE não afetou linhas: descobre o motivo para a resposta
+def _raise_status_conflict(
+    db: Session,
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    user_id: int,
+    is_admin: bool,
+):
+    current = db.execute(
+        select(Order.status, Order.created_by).where(Order.id == order_id)
+    ).first()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if not is_admin and current.created_by != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    expected = status_update.expected_status
+    if expected is not None:
+        detail = f"Order status is {current.status}, expected {expected.value}"
+    else:
+        detail = (
+            f"Invalid status transition: {current.status} -> "
+            f"{status_update.status.value}"
+        )
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+# Aplica o diff dos itens com um comando por tipo (sem commit). Retorna a
+# variação de estoque por produto
+def _update_order_lines(
+    db: Session, order_id: int, products: List[OrderProductUpdate]
+) -> Dict[int, int]:
+    # Itens atuais: só as colunas necessárias para o diff
+    current_lines = {
+        line.id: line
+        for line in db.execute(
+            select(
+                OrderProduct.id, OrderProduct.product_id, OrderProduct.quantity
+            ).where(OrderProduct.order_id == order_id)
+        )
+    }
+
+    # Calcula o diff em memória, agregando a variação de estoque por produto
+    stock_deltas = defaultdict(int)
+    quantity_updates = {}
+    new_lines = []
+    kept_ids = set()
+
+    for p_data in products:
+        line = current_lines.get(p_data.id)
+        if line is not None:
+            kept_ids.add(line.id)
+            diff = p_data.quantity - line.quantity
+            if diff:
+                stock_deltas[line.product_id] -= diff
+                quantity_updates[line.id] = p_data.quantity
+        else:
+            stock_deltas[p_data.product_id] -= p_data.quantity
+            new_lines.append(
+                {
+                    "order_id": order_id,
+                    "product_id": p_data.product_id,
+                    "quantity": p_data.quantity,
+                }
+            )
+
+    # Produtos dos itens novos precisam existir antes de qualquer escrita: a
+    # chave estrangeira falharia no INSERT (500) em vez de responder 404
+    new_product_ids = {line["product_id"] for line in new_lines}
+    if new_product_ids:
+        found = set(
+            db.execute(select(Product.id).where(Product.id.in_(new_product_ids)))
+            .scalars()
+            .all()
+        )
+        missing = sorted(new_product_ids - found)
+        if missing:
+            raise HTTPException(
+                status_code=404, detail=f"Produto {missing[0]} não encontrado"
+            )
+
+    # Itens removidos devolvem o estoque
+    removed_ids = [line_id for line_id in current_lines if line_id not in kept_ids]
+    for line_id in removed_ids:
+        line = current_lines[line_id]
+        stock_deltas[line.product_id] += line.quantity
+
+    # Um comando por tipo de alteração
+    if removed_ids:
+        db.execute(delete(OrderProduct).where(OrderProduct.id.in_(removed_ids)))
+    if quantity_updates:
+        db.execute(
+            update(OrderProduct)
+            .where(OrderProduct.id.in_(quantity_updates))
+            .values(quantity=case(quantity_updates, value=OrderProduct.id))
+            .execution_options(synchronize_session=False)
+        )
+    if new_lines:
+        db.execute(insert(OrderProduct), new_lines)
+    return stock_deltas
+
+
 def delete_order(db: Session, order_id: int, user_id: int, is_admin: bool):
     # Busca pedido para deletar
     order = db.query(Order).filter(Order.id == order_id).first()
@@ -149,11 +352,88 @@ def delete_order(db: Session, order_id: int, user_id: int, is_admin: bool):
     if not is_admin and order.created_by != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Repõe estoque antes de deletar o pedido
-    for order_product in order.products:
-        adjust_stock(db, order_product.product_id, order_product.quantity)
-
-    db.delete(order)
+    # Repõe estoque e remove itens e pedido com comandos em lote
+    deleted_id, created_by = order.id, order.created_by
+    restored = _delete_orders_batch(db, [deleted_id])
     db.commit()
+    publish_order_deleted(deleted_id, created_by)
+    publish_stock_changes(restored)
 
     return {"detail": "Order deleted successfully"}
+
+
+# Repõe o estoque com um UPDATE agregado por produto e remove itens e pedidos
+# com um DELETE cada (sem commit). Retorna o estoque devolvido por produto.
+def _delete_orders_batch(db: Session, order_ids: List[int]) -> Dict[int, int]:
+    restored = db.execute(
+        select(OrderProduct.product_id, func.sum(OrderProduct.quantity))
+        .where(OrderProduct.order_id.in_(order_ids))
+        .group_by(OrderProduct.product_id)
+    ).all()
+    db.execute(delete(OrderProduct).where(OrderProduct.order_id.in_(order_ids)))
+    db.execute(
+        delete(Order)
+        .where(Order.id.in_(order_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+    # Pedido único fica registrado na movimentação; em lote, só a razão
+    stock_deltas = {product_id: quantity for product_id, quantity in restored}
+    apply_stock_deltas(
+        db,
+        stock_deltas,
+        REASON_ORDER_DELETE,
+        order_ids[0] if len(order_ids) == 1 else None,
+    )
+    return stock_deltas
+
+
+def delete_orders(
+    db: Session,
+    ids: Optional[List[int]] = None,
+    order_status: Optional[str] = None,
+    older_than_days: Optional[int] = None,
+    batch_size: int = BULK_DELETE_BATCH_SIZE,
+):
+    # Cancelamento em massa por IDs ou por filtro (ex: pendentes há mais de N dias)
+    if ids is None and older_than_days is None:
+        raise HTTPException(
+            status_code=400, detail="Inform ids or older_than_days to delete orders"
+        )
+
+    query = select(Order.id, Order.created_by).with_for_update()
+    if ids is not None:
+        query = query.where(Order.id.in_(ids))
+    if order_status is not None:
+        query = query.where(Order.status == order_status)
+    if older_than_days is not None:
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        # Mais antigos primeiro: com status em aberto, percorre o índice
+        # parcial (created_at, id) em vez da tabela inteira na ordem do id
+        query = query.where(Order.created_at < cutoff).order_by(
+            Order.created_at, Order.id
+        )
+    else:
+        query = query.order_by(Order.id)
+
+    # Processa em lotes, com commit por lote para não segurar locks por muito tempo
+    deleted_ids = []
+    while True:
+        batch = db.execute(query.limit(batch_size)).all()
+        if not batch:
+            break
+        batch_ids = [order.id for order in batch]
+        restored = _delete_orders_batch(db, batch_ids)
+        db.commit()
+        deleted_ids.extend(batch_ids)
+        for order in batch:
+            publish_order_deleted(order.id, order.created_by)
+        publish_stock_changes(restored)
+
+    response = {"detail": "Orders deleted successfully", "deleted": len(deleted_ids)}
+    if ids is not None:
+        deleted = set(deleted_ids)
+        response["missing_ids"] = [
+            order_id for order_id in ids if order_id not in deleted
+        ]
+    return response
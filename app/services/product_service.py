@@ -1,25 +1,44 @@
-import os
+import orjson
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models import Product
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from app.models import Product, StockMovement
+from app.models.stock_movement_model import (
+    REASON_EXPIRATION,
+    REASON_INITIAL,
+    REASON_MANUAL,
+    REASON_PRODUCT_DELETE,
+)
 from app.schemas.product_schema import ProductCreate, ProductUpdate
+from app.services.stock_service import record_movements
+from app.utils.batch import order_by_ids
+from app.utils.counts import Total, count_total
+from app.utils.events import publish_stock_changes
+from app.utils.fieldsets import Fieldset, loader_options
 from app.utils.file_utils import delete_image, save_base64_image
+from app.utils.integrity import unique_guard
 from app.validations.product_validation import (
-    validate_unique_barcode,
+    PRODUCT_UNIQUE_MESSAGES,
     validate_expiration_date,
 )
 
-IMAGE_FOLDER = "app/static/images"
-
 
-def create_product(db: Session, product: ProductCreate) -> Product:
-    # Validações
-    validate_unique_barcode(db, product.barcode)
+# A imagem é gravada de forma assíncrona no armazenamento (pasta local ou
+# S3); o banco continua síncrono e roda no threadpool
+async def create_product(db: Session, product: ProductCreate) -> Product:
+    # Validações (o código de barras único fica com o índice do banco)
     validate_expiration_date(product.expiration_date)
 
-    image_path = save_base64_image(product.image_base64)
+    image_path = await save_base64_image(product.image_base64)
+    try:
+        return await run_in_threadpool(_insert_product, db, product, image_path)
+    except HTTPException:
+        await delete_image(image_path)
+        raise
+
 
+def _insert_product(db: Session, product: ProductCreate, image_path: str) -> Product:
     db_product = Product(
         description=product.description,
         price=product.price,
@@ -29,46 +48,84 @@ def create_product(db: Session, product: ProductCreate) -> Product:
         expiration_date=product.expiration_date,
         image_path=image_path,
     )
+    with unique_guard(db, PRODUCT_UNIQUE_MESSAGES):
+        db.add(db_product)
+
+    # Estoque inicial abre o livro de movimentações do produto
+    record_movements(db, {db_product.id: db_product.stock}, REASON_INITIAL)
 
-    db.add(db_product)
     db.commit()
     db.refresh(db_product)
     return db_product
 
 
-def update_product(db: Session, product_id: int, updates: ProductUpdate) -> Product:
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+async def update_product(
+    db: Session, product_id: int, updates: ProductUpdate
+) -> Product:
+    db_product = await run_in_threadpool(get_product_by_id, db, product_id)
     if not db_product:
         raise ValueError("Produto não encontrado")
 
     updates_dict = updates.model_dump(exclude_unset=True)
-
-    # Validações
-    validate_unique_barcode(db, updates_dict.get("barcode"), product_id=db_product.id)
     validate_expiration_date(updates_dict.get("expiration_date"))
 
-    for field, value in updates_dict.items():
-        if field == "image_base64" and value:
-            db_product.image_path = save_base64_image(value)
-        elif field != "image_base64":
+    image_base64 = updates_dict.pop("image_base64", None)
+    image_path = await save_base64_image(image_base64) if image_base64 else None
+    try:
+        return await run_in_threadpool(
+            _apply_product_updates, db, db_product, updates_dict, image_path
+        )
+    except HTTPException:
+        await delete_image(image_path)
+        raise
+
+
+def _apply_product_updates(
+    db: Session, db_product: Product, updates_dict: dict, image_path: Optional[str]
+) -> Product:
+    # Ajuste manual de estoque: relê o estoque com lock da linha, para a
+    # diferença registrada no livro ser a mesma que o UPDATE aplica mesmo com
+    # um pedido concorrente (stock + delta) gravado desde a leitura do produto
+    if updates_dict.get("stock") is not None:
+        db.refresh(db_product, ["stock"], with_for_update=True)
+
+    # Só os campos que mudaram são gravados (e podem violar o índice único)
+    changes = {f: v for f, v in updates_dict.items() if getattr(db_product, f) != v}
+    if image_path:
+        changes["image_path"] = image_path
+
+    # Ajuste manual de estoque vira uma movimentação com a diferença
+    stock_deltas = {}
+    if changes.get("stock") is not None:
+        stock_deltas[db_product.id] = changes["stock"] - db_product.stock
+
+    with unique_guard(db, PRODUCT_UNIQUE_MESSAGES):
+        for field, value in changes.items():
             setattr(db_product, field, value)
+    record_movements(db, stock_deltas, REASON_MANUAL)
+    # Validade editada: linha sem quantidade no livro para o scanner de alertas
+    # rever o produto (a data pode já estar dentro da janela de aviso)
+    if "expiration_date" in changes:
+        db.add(
+            StockMovement(
+                product_id=db_product.id, quantity=0, reason=REASON_EXPIRATION
+            )
+        )
 
     db.commit()
     db.refresh(db_product)
+    publish_stock_changes(stock_deltas)
     return db_product
 
 
-def get_products(
+def filter_products(
     db: Session,
-    skip: int = 0,
-    limit: int = 10,
-    section: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    available: Optional[bool] = None,
-) -> List[Product]:
+    section: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    available: Optional[bool],
+):
     query = db.query(Product)
-
     if section:
         query = query.filter(Product.section == section)
     if min_price is not None:
@@ -79,22 +136,93 @@ def get_products(
         query = query.filter(Product.stock > 0)
     elif available is False:
         query = query.filter(Product.stock <= 0)
+    return query
+
 
+def get_products(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    section: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+    fields: Optional[Fieldset] = None,
+) -> List[Product]:
+    query = filter_products(db, section, min_price, max_price, available)
+    if fields:
+        query = query.options(*loader_options(Product, fields))
     return query.offset(skip).limit(limit).all()
 
 
+# Total de produtos com os mesmos filtros da listagem (exato ou estimado)
+def count_products(
+    db: Session,
+    section: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+) -> Total:
+    query = filter_products(db, section, min_price, max_price, available)
+    filtered = any(
+        value is not None for value in (min_price, max_price, available)
+    ) or bool(section)
+    return count_total(db, query, Product.__tablename__, filtered)
+
+
+# Busca vários produtos por ID em uma única query, na ordem pedida
+def get_products_by_ids(
+    db: Session, ids: List[int], fields: Optional[Fieldset] = None
+) -> Tuple[List[Product], List[int]]:
+    query = db.query(Product).filter(Product.id.in_(ids))
+    if fields:
+        query = query.options(*loader_options(Product, fields))
+    return order_by_ids(query.all(), ids)
+
+
 def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
     return db.get(Product, product_id)
 
 
-def delete_product(db: Session, product_id: int) -> bool:
-    product = db.get(Product, product_id)
-    if not product:
+# A imagem só é apagada depois do commit: o produto nunca aponta para uma
+# imagem que não existe mais
+async def delete_product(db: Session, product_id: int) -> bool:
+    image_path = await run_in_threadpool(_delete_product_row, db, product_id)
+    if image_path is None:
         return False
+    await delete_image(image_path)
+    return True
 
-    # Deleta a imagem se existir
-    delete_image(product.image_path)
 
+def _delete_product_row(db: Session, product_id: int) -> Optional[str]:
+    product = db.get(Product, product_id)
+    if not product:
+        return None
+
+    # O histórico fica no livro: a movimentação de exclusão zera o saldo e
+    # guarda o retrato do produto, e a chave estrangeira (SET NULL) solta as
+    # movimentações anteriores
+    db.refresh(product, ["stock"], with_for_update=True)
+    image_path = product.image_path
+    db.add(
+        StockMovement(
+            product_id=product.id,
+            quantity=-product.stock,
+            reason=REASON_PRODUCT_DELETE,
+            product_snapshot=orjson.dumps(
+                {
+                    "id": product.id,
+                    "description": product.description,
+                    "barcode": product.barcode,
+                    "section": product.section,
+                    "price": product.price,
+                    "stock": product.stock,
+                    "expiration_date": product.expiration_date,
+                }
+            ).decode(),
+        )
+    )
+    db.flush()
     db.delete(product)
     db.commit()
-    return True
+    return image_path
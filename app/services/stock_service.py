@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.core.config import STOCK_LEDGER_RETENTION_DAYS
+from app.models.product_model import Product
+from app.models.stock_movement_model import REASON_SNAPSHOT, StockMovement
+
+
+# Registra as movimentações de vários produtos com um único INSERT (sem commit)
+def record_movements(
+    db: Session,
+    stock_deltas: Dict[int, int],
+    reason: str,
+    order_id: Optional[int] = None,
+):
+    rows = [
+        {
+            "product_id": product_id,
+            "quantity": quantity,
+            "reason": reason,
+            "order_id": order_id,
+            "created_at": datetime.utcnow(),
+        }
+        for product_id, quantity in stock_deltas.items()
+        if quantity
+    ]
+    if rows:
+        db.execute(insert(StockMovement), rows)
+
+
+# Junta as movimentações anteriores ao corte em um snapshot por produto
+def compact_movements(
+    db: Session, retention_days: int = STOCK_LEDGER_RETENTION_DAYS
+) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    # Movimentações de produtos excluídos (product_id NULL) ficam como estão
+    old_movements = and_(
+        StockMovement.created_at < cutoff, StockMovement.product_id.isnot(None)
+    )
+
+    db.execute(
+        insert(StockMovement).from_select(
+            ["product_id", "quantity", "reason", "created_at"],
+            select(
+                StockMovement.product_id,
+                func.sum(StockMovement.quantity),
+                literal(REASON_SNAPSHOT),
+                literal(cutoff),
+            )
+            .where(old_movements)
+            .group_by(StockMovement.product_id),
+        )
+    )
+    result = db.execute(
+        delete(StockMovement)
+        .where(old_movements)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+# Produtos cujo estoque diverge da soma das movimentações do livro
+def reconcile_stock(db: Session) -> List[dict]:
+    ledger = (
+        select(
+            StockMovement.product_id,
+            func.sum(StockMovement.quantity).label("ledger_stock"),
+        )
+        .group_by(StockMovement.product_id)
+        .subquery()
+    )
+    ledger_stock = func.coalesce(ledger.c.ledger_stock, 0)
+    rows = db.execute(
+        select(Product.id, Product.stock, ledger_stock.label("ledger_stock"))
+        .outerjoin(ledger, ledger.c.product_id == Product.id)
+        .where(Product.stock != ledger_stock)
+        .order_by(Product.id)
+    ).all()
+    return [
+        {
+            "product_id": row.id,
+            "stock": row.stock,
+            "ledger_stock": row.ledger_stock,
+            "drift": row.stock - row.ledger_stock,
+        }
+        for row in rows
+    ]
@@ -2,9 +2,12 @@ import os
 import uuid
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+# Os testes de rate limiting montam o próprio middleware com limites controlados
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 from app.main import app
 from app.db.database import Base, get_db
 from app.models import User, Client
@@ -15,6 +18,10 @@ from app.utils.jwt import create_access_token
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
 # Remove arquivo se existir para garantir banco limpo
 if os.path.exists("test.db"):
     os.remove("test.db")
@@ -22,6 +29,15 @@ if os.path.exists("test.db"):
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+
+# O SQLite não confere chaves estrangeiras por padrão; liga para os testes
+# falharem como no Postgres
+@event.listens_for(engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -73,6 +89,19 @@ def token_user():
     return create_access_token({"sub": "user@test.com", "is_admin": False})
 
 
+@pytest.fixture()
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+# Sessão no mesmo banco das rotas, para conferir o que elas gravaram
+@pytest.fixture()
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
 @pytest.fixture()
 def create_test_client():
     db = TestingSessionLocal()
@@ -107,6 +136,43 @@ def create_test_product():
     return product
 
 
+# Cria produtos pela API (passa pelo livro de estoque); devolve o id
+@pytest.fixture()
+def create_product(client, admin_headers):
+    def _create(stock=50, section="Roupas", expiration_date=None):
+        payload = {
+            "description": "Produto Teste",
+            "price": 10.0,
+            "barcode": uuid.uuid4().hex,
+            "section": section,
+            "stock": stock,
+            "image_base64": VALID_IMAGE,
+        }
+        if expiration_date:
+            payload["expiration_date"] = expiration_date.isoformat()
+        response = client.post("/products/", json=payload, headers=admin_headers)
+        return response.json()["id"]
+
+    return _create
+
+
+# Cria pedidos pela API a partir de pares (produto, quantidade)
+@pytest.fixture()
+def create_order(client, admin_headers, create_test_client):
+    def _create(lines, status="pending"):
+        payload = {
+            "client_id": create_test_client.id,
+            "status": status,
+            "products": [
+                {"product_id": product_id, "quantity": quantity}
+                for product_id, quantity in lines
+            ],
+        }
+        return client.post("/orders/", json=payload, headers=admin_headers)
+
+    return _create
+
+
 @pytest.fixture
 def create_second_client(client, token_admin):
     headers = {"Authorization": f"Bearer {token_admin}"}
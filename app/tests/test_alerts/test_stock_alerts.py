@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+import pytest
+
+from app.models.scan_state_model import ScanState
+from app.services.stock_service import compact_movements
+from app.services.alert_service import (
+    STOCK_ALERTS_SCANNER,
+    format_alerts,
+    scan_stock_alerts,
+)
+
+SECTION = "Alertas"
+
+
+# Cada teste começa sem marca d'água: a primeira varredura é a inicial
+@pytest.fixture(autouse=True)
+def reset_scanner(db):
+    db.query(ScanState).filter(ScanState.name == STOCK_ALERTS_SCANNER).delete()
+    db.commit()
+
+
+# Só a seção de teste tem limite; o padrão 0 ignora os produtos dos outros testes
+def scan(db, sent=None, **overrides):
+    options = {
+        "send": lambda number, message: sent.append((number, message)),
+        "numbers": ["+5511999999999"],
+        "thresholds": {SECTION: 5},
+        "default_threshold": 0,
+        "expiring_days": 7,
+        "grace_seconds": 0,
+    }
+    options.update(overrides)
+    sent = [] if sent is None else sent
+    return scan_stock_alerts(db, **options)
+
+
+# Scanner de estoque baixo e validade próxima
+class TestStockAlerts:
+
+    def test_first_run_reports_current_low_stock(self, db, create_product):
+        low = create_product(stock=2, section=SECTION)
+        ok = create_product(stock=9, section=SECTION)
+        sent = []
+        result = scan(db, sent)
+
+        assert low in result["low_stock"]
+        assert ok not in result["low_stock"]
+        assert sent and sent[0][0] == "+5511999999999"
+        assert f"#{low}" in "".join(message for _, message in sent)
+
+    def test_only_alerts_when_crossing_threshold(
+        self, db, create_product, create_order
+    ):
+        product = create_product(stock=6, section=SECTION)
+        scan(db)
+
+        create_order([(product, 2)])
+        assert scan(db)["low_stock"] == [product]
+        assert product not in scan(db)["low_stock"]
+
+        create_order([(product, 1)])
+        assert product not in scan(db)["low_stock"]
+
+    def test_crossing_after_ledger_compaction(self, db, create_product, create_order):
+        product = create_product(stock=10, section=SECTION)
+        scan(db)
+
+        # O snapshot da compactação entra na janela com o saldo inteiro e não
+        # pode contar como variação do estoque
+        compact_movements(db, retention_days=-1)
+        create_order([(product, 6)])
+        assert scan(db)["low_stock"] == [product]
+
+    def test_recent_movements_wait_for_next_scan(
+        self, db, create_product, create_order
+    ):
+        product = create_product(stock=6, section=SECTION)
+        scan(db)
+
+        # Dentro do período de carência a marca d'água não passa pela
+        # movimentação (um commit mais lento de id menor ainda pode aparecer)
+        create_order([(product, 2)])
+        assert scan(db, grace_seconds=60)["low_stock"] == []
+        assert scan(db)["low_stock"] == [product]
+
+    def test_new_product_below_threshold(self, db, create_product):
+        scan(db)
+        product = create_product(stock=1, section=SECTION)
+        assert scan(db)["low_stock"] == [product]
+
+    def test_expiring_products_alerted_once(self, db, create_product):
+        today = date.today()
+        scan(db, today=today)
+        soon = create_product(
+            section=SECTION, expiration_date=today + timedelta(days=3)
+        )
+        later = create_product(
+            section=SECTION, expiration_date=today + timedelta(days=10)
+        )
+
+        assert scan(db, today=today)["expiring"] == [soon]
+        assert scan(db, today=today)["expiring"] == []
+        assert scan(db, today=today + timedelta(days=4))["expiring"] == [later]
+
+    def test_edited_expiration_is_alerted(
+        self, db, client, admin_headers, create_product
+    ):
+        today = date.today()
+        product = create_product(section=SECTION)
+        scan(db, today=today)
+
+        response = client.put(
+            f"/products/{product}",
+            json={"expiration_date": (today + timedelta(days=3)).isoformat()},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert scan(db, today=today)["expiring"] == [product]
+        assert scan(db, today=today)["expiring"] == []
+
+    def test_failed_send_keeps_high_water_mark(self, db, create_product):
+        scan(db)
+        product = create_product(stock=1, section=SECTION)
+
+        def failing_send(number, message):
+            raise RuntimeError("twilio fora do ar")
+
+        with pytest.raises(RuntimeError):
+            scan(db, send=failing_send)
+        db.rollback()
+        assert scan(db)["low_stock"] == [product]
+
+    def test_alerts_are_batched(self):
+        messages = format_alerts([f"- item {n}" for n in range(5)], batch_size=2)
+        assert len(messages) == 3
+        assert messages[0].startswith("⚠️ Alerta de estoque (1/3)")
+        assert messages[2].endswith("- item 4")
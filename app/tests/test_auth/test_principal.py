@@ -0,0 +1,84 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.database import get_db
+from app.main import app
+from app.models.user_model import User
+from app.services.auth_service import toggle_admin
+from app.utils.helpers import generate_unique_email
+from app.utils.jwt import decode_access_token
+
+CLIENT_PASSWORD = "senha123"
+
+
+def login(client, email=None):
+    email = email or generate_unique_email()
+    client.post("/auth/register", json={"email": email, "password": CLIENT_PASSWORD})
+    response = client.post(
+        "/auth/login", data={"username": email, "password": CLIENT_PASSWORD}
+    )
+    return email, response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def toggle(email):
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    toggle_admin(db, db.query(User).filter(User.email == email).one())
+    sessions.close()
+
+
+# Claims de identidade no access token (uid/adm/ver)
+class TestPrincipalClaims:
+
+    def test_access_token_carries_claims(self, client):
+        _, tokens = login(client)
+        payload = decode_access_token(tokens["access_token"])
+        assert isinstance(payload["uid"], int)
+        assert payload["adm"] is False
+        assert payload["ver"] == 0
+
+    # Com a versão em cache, a rota não consulta a tabela de usuários
+    def test_hot_route_skips_user_lookup(self, client):
+        _, tokens = login(client)
+        client.get("/orders/", headers=bearer(tokens["access_token"]))
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.get("/orders/", headers=bearer(tokens["access_token"]))
+        finally:
+            event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == 200
+        assert not [s for s in statements if "FROM users" in s]
+
+    def test_role_change_invalidates_old_tokens(self, client):
+        email, tokens = login(client)
+        assert (
+            client.delete("/clients/999999", headers=bearer(tokens["access_token"]))
+        ).status_code == 403
+
+        toggle(email)
+        old = client.get("/orders/", headers=bearer(tokens["access_token"]))
+        assert old.status_code == 401
+
+        refreshed = client.post("/auth/refresh", json=tokens["refresh_token"]).json()
+        assert decode_access_token(refreshed["access_token"])["adm"] is True
+        response = client.delete(
+            "/clients/999999", headers=bearer(refreshed["access_token"])
+        )
+        assert response.status_code == 404
+
+    def test_deleted_account_token_rejected(self, client):
+        _, tokens = login(client)
+        client.delete("/auth/delete", headers=bearer(tokens["access_token"]))
+        response = client.get("/orders/", headers=bearer(tokens["access_token"]))
+        assert response.status_code == 401
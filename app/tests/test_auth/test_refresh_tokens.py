@@ -0,0 +1,121 @@
+from datetime import datetime
+from sqlalchemy import update
+
+from app.db.database import get_db
+from app.main import app
+from app.models.refresh_token_model import RefreshToken
+from app.utils.helpers import generate_unique_email
+from app.utils.jwt import decode_access_token
+from app.utils.revocation import RevocationList
+
+CLIENT_PASSWORD = "senha123"
+
+
+def login(client):
+    email = generate_unique_email()
+    client.post("/auth/register", json={"email": email, "password": CLIENT_PASSWORD})
+    response = client.post(
+        "/auth/login", data={"username": email, "password": CLIENT_PASSWORD}
+    )
+    return response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Rotação, reuso e revogação de refresh tokens
+class TestRefreshTokens:
+
+    def test_refresh_rotates_tokens(self, client):
+        tokens = login(client)
+        response = client.post("/auth/refresh", json=tokens["refresh_token"])
+
+        assert response.status_code == 200
+        rotated = response.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        old, new = (
+            decode_access_token(tokens["refresh_token"]),
+            decode_access_token(rotated["refresh_token"]),
+        )
+        assert old["fam"] == new["fam"] and old["jti"] != new["jti"]
+        assert (
+            client.post("/auth/refresh", json=rotated["refresh_token"]).status_code
+            == 200
+        )
+
+    def test_reuse_revokes_whole_family(self, client):
+        tokens = login(client)
+        rotated = client.post("/auth/refresh", json=tokens["refresh_token"]).json()
+
+        reuse = client.post("/auth/refresh", json=tokens["refresh_token"])
+        assert reuse.status_code == 401
+        assert (
+            client.post("/auth/refresh", json=rotated["refresh_token"]).status_code
+            == 401
+        )
+        assert (
+            client.get("/clients/", headers=bearer(rotated["access_token"])).status_code
+            == 401
+        )
+
+    def test_access_token_is_not_a_refresh_token(self, client):
+        tokens = login(client)
+        response = client.post("/auth/refresh", json=tokens["access_token"])
+        assert response.status_code == 401
+
+    def test_refresh_token_is_not_an_access_token(self, client):
+        tokens = login(client)
+        response = client.get("/clients/", headers=bearer(tokens["refresh_token"]))
+        assert response.status_code == 401
+
+    def test_logout_revokes_session(self, client):
+        tokens, other_session = login(client), login(client)
+
+        response = client.post("/auth/logout", headers=bearer(tokens["access_token"]))
+        assert response.status_code == 204
+        assert (
+            client.get("/clients/", headers=bearer(tokens["access_token"])).status_code
+            == 401
+        )
+        assert (
+            client.post("/auth/refresh", json=tokens["refresh_token"]).status_code
+            == 401
+        )
+        assert (
+            client.get(
+                "/clients/", headers=bearer(other_session["access_token"])
+            ).status_code
+            == 200
+        )
+
+    def test_account_deletion_revokes_refresh_tokens(self, client):
+        tokens = login(client)
+        client.delete("/auth/delete", headers=bearer(tokens["access_token"]))
+        assert (
+            client.post("/auth/refresh", json=tokens["refresh_token"]).status_code
+            == 401
+        )
+
+    # Revogação feita por outro worker chega pela sincronização incremental
+    def test_revocation_list_syncs_from_database(self, client):
+        tokens = login(client)
+        family_id = decode_access_token(tokens["access_token"])["fam"]
+        revocations = RevocationList(ttl_seconds=60, sync_seconds=3600)
+
+        sessions = app.dependency_overrides[get_db]()
+        db = next(sessions)
+        revocations.sync(db)
+        assert not revocations.is_revoked(family_id)
+
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id)
+            .values(revoked_at=datetime.utcnow())
+        )
+        db.commit()
+        revocations.sync(db)
+        assert not revocations.is_revoked(family_id)
+        revocations.sync(db, force=True)
+        assert revocations.is_revoked(family_id)
+        sessions.close()
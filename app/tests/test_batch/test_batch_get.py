@@ -0,0 +1,70 @@
+import pytest
+from app.core.config import BATCH_MAX_IDS
+
+
+@pytest.fixture
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+# Testes da busca em lote (?ids=)
+class TestBatchGet:
+
+    def test_products_keep_request_order_and_report_missing(
+        self, client, admin_headers, create_test_product
+    ):
+        product_id = create_test_product.id
+        response = client.get(
+            f"/products/?ids=999999,{product_id},999998", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == [product_id]
+        assert response.headers["x-missing-ids"] == "999999,999998"
+
+    def test_clients_in_request_order(
+        self, client, admin_headers, create_test_client, create_second_client
+    ):
+        ids = [create_second_client["id"], create_test_client.id]
+        response = client.get(
+            f"/clients/?ids={ids[0]},{ids[1]},{ids[0]}", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()] == ids
+        assert response.headers["x-missing-ids"] == ""
+
+    def test_orders_batch_with_fields(self, client, admin_headers, create_test_order):
+        response = client.get(
+            f"/orders/?ids={create_test_order.id}&fields=id,status",
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"id": create_test_order.id, "status": "pending"}]
+
+    # Pedido de outro usuário conta como não encontrado
+    def test_orders_of_other_users_are_reported_missing(
+        self, client, admin_headers, token_user, create_test_client
+    ):
+        payload = {
+            "client_id": create_test_client.id,
+            "status": "pending",
+            "products": [],
+        }
+        admin_order = client.post("/orders/", json=payload, headers=admin_headers)
+        order_id = admin_order.json()["id"]
+
+        headers_user = {"Authorization": f"Bearer {token_user}"}
+        response = client.get(f"/orders/?ids={order_id}", headers=headers_user)
+        assert response.status_code == 200
+        assert response.json() == []
+        assert response.headers["x-missing-ids"] == str(order_id)
+
+    @pytest.mark.parametrize("ids", ["a,b", ",", "1.5"])
+    def test_invalid_ids_are_rejected(self, client, admin_headers, ids):
+        response = client.get(f"/products/?ids={ids}", headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_batch_size_is_limited(self, client, admin_headers):
+        ids = ",".join(str(i) for i in range(1, BATCH_MAX_IDS + 2))
+        response = client.get(f"/products/?ids={ids}", headers=admin_headers)
+        assert response.status_code == 400
+        assert "Too many ids" in response.json()["detail"]
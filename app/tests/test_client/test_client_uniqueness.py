@@ -0,0 +1,174 @@
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.db.database import get_db
+from app.main import app
+from app.models import Client
+from app.schemas.client_schema import ClientCreate
+from app.services.client_service import create_client
+from app.utils.file_utils import IMAGE_FOLDER
+from app.utils.integrity import violated_unique_columns
+
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
+
+def client_payload():
+    return {
+        "name": "Cliente Único",
+        "email": f"{uuid.uuid4().hex[:8]}@example.com",
+        "cpf": str(uuid.uuid4().int)[:11],
+    }
+
+
+def new_session():
+    sessions = app.dependency_overrides[get_db]()
+    return next(sessions)
+
+
+class CapturedStatements(list):
+    def __call__(self, conn, cursor, statement, *args):
+        self.append(statement.split()[0].upper())
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self)
+
+
+# Unicidade garantida pelos índices do banco, sem SELECT antes da escrita
+class TestUniqueConstraints:
+    @pytest.fixture(autouse=True)
+    def setup_headers(self, token_admin):
+        self.headers = {"Authorization": f"Bearer {token_admin}"}
+
+    def test_create_has_no_pre_insert_select(self):
+        db = new_session()
+        with CapturedStatements() as statements:
+            create_client(db, ClientCreate(**client_payload()))
+        db.close()
+        assert statements[0] == "INSERT"
+        assert "SELECT" not in statements[: statements.index("INSERT")]
+
+    def test_duplicate_messages(self, client, create_test_client):
+        payload = client_payload()
+        payload["email"] = create_test_client.email
+        response = client.post("/clients/", json=payload, headers=self.headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email is already in use"
+
+        payload = client_payload()
+        payload["cpf"] = create_test_client.cpf
+        response = client.post("/clients/", json=payload, headers=self.headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "CPF is already in use"
+
+    def test_update_only_writes_changed_fields(self, client, create_test_client):
+        # Reenviar o próprio email/CPF não é conflito nem gera UPDATE
+        with CapturedStatements() as statements:
+            response = client.put(
+                f"/clients/{create_test_client.id}",
+                json={"email": create_test_client.email, "cpf": create_test_client.cpf},
+                headers=self.headers,
+            )
+        assert response.status_code == 200
+        assert "UPDATE" not in statements
+
+    def test_update_conflict_keeps_session_usable(
+        self, client, create_test_client, create_second_client
+    ):
+        response = client.put(
+            f"/clients/{create_second_client['id']}",
+            json={"cpf": create_test_client.cpf, "name": "Não deve gravar"},
+            headers=self.headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "CPF is already in use"
+
+        stored = client.get(
+            f"/clients/{create_second_client['id']}", headers=self.headers
+        ).json()
+        assert stored["name"] == "Second Client"
+        assert stored["cpf"] == create_second_client["cpf"]
+
+    def test_concurrent_inserts_resolved_by_index(self):
+        # Duas sessões com o mesmo email: a segunda perde no índice, não no SELECT
+        payload = client_payload()
+        first, second = new_session(), new_session()
+        second.query(Client).first()  # transação já aberta antes do commit da outra
+        create_client(first, ClientCreate(**payload))
+        with pytest.raises(HTTPException) as exc:
+            create_client(second, ClientCreate(**{**payload, "cpf": "98765432100"}))
+        assert exc.value.status_code == 400
+        assert exc.value.detail == "Email is already in use"
+        first.close()
+        second.close()
+
+    def test_read_only_transaction_needs_no_savepoint(self, create_test_client):
+        # O SELECT já abriu a transação, mas não há escrita a preservar
+        db = new_session()
+        db.query(Client).first()
+        with CapturedStatements() as statements:
+            create_client(db, ClientCreate(**client_payload()))
+            with pytest.raises(HTTPException):
+                duplicate = {**client_payload(), "cpf": create_test_client.cpf}
+                create_client(db, ClientCreate(**duplicate))
+        db.close()
+        assert "SAVEPOINT" not in statements
+        assert "RELEASE" not in statements
+
+    def test_savepoint_preserves_earlier_writes(self, create_test_client):
+        db = new_session()
+        kept = Client(**client_payload())
+        db.add(kept)
+        db.flush()
+
+        duplicate = {**client_payload(), "cpf": create_test_client.cpf}
+        with pytest.raises(HTTPException):
+            create_client(db, ClientCreate(**duplicate))
+
+        db.commit()
+        assert db.get(Client, kept.id) is not None
+        db.close()
+
+    def test_duplicate_barcode_removes_saved_image(self, client, create_test_product):
+        before = set(os.listdir(IMAGE_FOLDER)) if os.path.isdir(IMAGE_FOLDER) else set()
+        response = client.post(
+            "/products/",
+            json={
+                "description": "Duplicado",
+                "price": 10.0,
+                "barcode": create_test_product.barcode,
+                "section": "Roupas",
+                "stock": 1,
+                "image_base64": VALID_IMAGE,
+            },
+            headers=self.headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Barcode already exists for another product"
+        assert set(os.listdir(IMAGE_FOLDER)) == before
+
+    def test_constraint_names_from_other_databases(self):
+        def error(message, constraint=None):
+            orig = Exception(message)
+            orig.diag = SimpleNamespace(constraint_name=constraint)
+            return IntegrityError("INSERT", {}, orig)
+
+        assert violated_unique_columns(error("dup", "ix_clients_cpf")) == ["cpf"]
+        assert violated_unique_columns(error("dup", "products_barcode_key")) == [
+            "barcode"
+        ]
+        mysql = error("Duplicate entry 'x' for key 'users.ix_users_email'")
+        assert violated_unique_columns(mysql) == ["email"]
+        assert violated_unique_columns(error("NOT NULL constraint failed")) is None
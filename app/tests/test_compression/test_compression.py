@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import os
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import Response, StreamingResponse
+
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.utils.file_utils import IMAGE_FOLDER, delete_image, precompress_image
+
+LARGE_JSON = b'{"items": [' + b",".join([b'{"id": 1, "name": "abc"}'] * 200) + b"]}"
+
+
+def make_client(body: bytes, media_type: str, streaming: bool = False):
+    async def app(scope, receive, send):
+        if streaming:
+            chunks = [body[i : i + 512] for i in range(0, len(body), 512)]
+
+            async def iterate():
+                for chunk in chunks:
+                    yield chunk
+
+            response = StreamingResponse(iterate(), media_type=media_type)
+        else:
+            response = Response(body, media_type=media_type)
+        await response(scope, receive, send)
+
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+# Testes do middleware de compressão
+class TestCompressionMiddleware:
+
+    def test_large_json_is_gzipped(self):
+        client = make_client(LARGE_JSON, "application/json")
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.content == LARGE_JSON
+
+    def test_small_response_is_not_compressed(self):
+        client = make_client(b'{"id": 1}', "application/json")
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_content_type_outside_allowlist_is_not_compressed(self):
+        client = make_client(b"\x89PNG" + b"\x00" * 4096, "image/png")
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_client_without_accept_encoding_gets_identity(self):
+        client = make_client(LARGE_JSON, "application/json")
+        response = client.get("/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == LARGE_JSON
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        client = make_client(LARGE_JSON, "text/csv", streaming=True)
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.content == LARGE_JSON
+
+
+# Imagens pré-comprimidas no upload são servidas sem recomprimir
+class TestPrecompressedImages:
+
+    @pytest.fixture()
+    def compressible_image(self):
+        os.makedirs(IMAGE_FOLDER, exist_ok=True)
+        filename = f"{uuid.uuid4().hex}.svg"
+        with open(os.path.join(IMAGE_FOLDER, filename), "wb") as f:
+            f.write(b"<svg>" + b"<rect/>" * 500 + b"</svg>")
+        yield filename
+        asyncio.run(delete_image(filename))
+
+    def test_precompressed_image_is_served(self, client, compressible_image):
+        assert "gzip" in precompress_image(compressible_image)
+
+        response = client.get(
+            f"/products/images/{compressible_image}",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("image/svg+xml")
+        with open(os.path.join(IMAGE_FOLDER, compressible_image + ".gz"), "rb") as f:
+            assert gzip.decompress(f.read()) == response.content
+
+    def test_incompressible_image_is_not_precompressed(self):
+        os.makedirs(IMAGE_FOLDER, exist_ok=True)
+        filename = f"{uuid.uuid4().hex}.png"
+        with open(os.path.join(IMAGE_FOLDER, filename), "wb") as f:
+            f.write(os.urandom(2048))
+        try:
+            assert precompress_image(filename) == []
+        finally:
+            asyncio.run(delete_image(filename))
@@ -0,0 +1,165 @@
+import asyncio
+import pytest
+
+from app.db.database import get_db
+from app.main import app
+from app.models.user_model import User
+from app.utils.events import (
+    ORDER_CREATED,
+    ORDER_DELETED,
+    STOCK_CHANGED,
+    EventBroker,
+    broker,
+    sse_stream,
+)
+
+
+@pytest.fixture
+def user_id():
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    user = db.query(User).filter(User.email == "user@test.com").one()
+    sessions.close()
+    return user.id
+
+
+@pytest.fixture
+def subscribe():
+    subscriptions = []
+
+    def _subscribe(user_id, is_admin):
+        subscription = broker.subscribe(user_id, is_admin)
+        subscriptions.append(subscription)
+        return subscription
+
+    yield _subscribe
+    for subscription in subscriptions:
+        broker.unsubscribe(subscription)
+
+
+def event_types(subscription):
+    return [event.type for event in subscription.drain()]
+
+
+# Pub/sub em memória
+class TestEventBroker:
+
+    def test_slow_subscriber_drops_oldest(self):
+        local = EventBroker(queue_size=3, replay_size=10)
+        subscription = local.subscribe(1, is_admin=True)
+        for n in range(5):
+            local.publish(STOCK_CHANGED, {"n": n})
+
+        assert [event.data["n"] for event in subscription.drain()] == [2, 3, 4]
+        assert subscription.dropped == 2
+
+    def test_users_only_see_their_orders(self):
+        local = EventBroker()
+        admin = local.subscribe(1, is_admin=True)
+        owner = local.subscribe(2, is_admin=False)
+        other = local.subscribe(3, is_admin=False)
+        local.publish(ORDER_CREATED, {"id": 10}, user_id=2)
+        local.publish(STOCK_CHANGED, {"product_id": 1, "change": -1})
+
+        assert event_types(admin) == [ORDER_CREATED, STOCK_CHANGED]
+        assert event_types(owner) == [ORDER_CREATED, STOCK_CHANGED]
+        assert event_types(other) == [STOCK_CHANGED]
+
+    def test_resume_from_last_event_id(self):
+        local = EventBroker(replay_size=10)
+        first = local.publish(STOCK_CHANGED, {"n": 1})
+        local.publish(ORDER_CREATED, {"id": 5}, user_id=9)
+        local.publish(STOCK_CHANGED, {"n": 2})
+
+        subscription = local.subscribe(2, is_admin=False, last_event_id=first.id)
+        assert [event.data for event in subscription.drain()] == [{"n": 2}]
+
+    def test_sse_stream_format(self):
+        local = EventBroker()
+        event = local.publish(STOCK_CHANGED, {"product_id": 7, "change": -2})
+        checks = iter([False, True])
+
+        async def is_disconnected():
+            return next(checks)
+
+        async def collect():
+            stream = sse_stream(local, 1, True, is_disconnected, 0, keepalive=1)
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(collect())
+        assert (
+            chunks[1]
+            == (
+                f"id: {event.id}\nevent: stock.changed\n"
+                'data: {"product_id":7,"change":-2}\n\n'
+            ).encode()
+        )
+        assert not local._subscriptions
+
+    def test_stream_never_started_leaves_no_subscription(self):
+        local = EventBroker()
+
+        async def is_disconnected():
+            return True
+
+        # Resposta descartada antes de o corpo ser iterado
+        sse_stream(local, 1, True, is_disconnected)
+        assert not local._subscriptions
+
+
+# Eventos publicados pelos serviços depois do commit
+class TestServiceEvents:
+
+    def test_order_lifecycle_events(
+        self,
+        client,
+        token_user,
+        user_id,
+        subscribe,
+        create_test_client,
+        create_test_product,
+    ):
+        headers = {"Authorization": f"Bearer {token_user}"}
+        admin = subscribe(0, is_admin=True)
+        owner = subscribe(user_id, is_admin=False)
+        other = subscribe(user_id + 1000, is_admin=False)
+
+        payload = {
+            "client_id": create_test_client.id,
+            "products": [{"product_id": create_test_product.id, "quantity": 3}],
+        }
+        order_id = client.post("/orders/", json=payload, headers=headers).json()["id"]
+        client.delete(f"/orders/{order_id}", headers=headers)
+
+        expected = [ORDER_CREATED, STOCK_CHANGED, ORDER_DELETED, STOCK_CHANGED]
+        assert event_types(admin) == expected
+        events = owner.drain()
+        assert [event.type for event in events] == expected
+        assert events[1].data == {"product_id": create_test_product.id, "change": -3}
+        assert event_types(other) == [STOCK_CHANGED, STOCK_CHANGED]
+
+    def test_failed_order_publishes_nothing(
+        self, client, token_user, subscribe, create_test_client, create_test_product
+    ):
+        headers = {"Authorization": f"Bearer {token_user}"}
+        admin = subscribe(0, is_admin=True)
+        payload = {
+            "client_id": create_test_client.id,
+            "products": [{"product_id": create_test_product.id, "quantity": 999}],
+        }
+        response = client.post("/orders/", json=payload, headers=headers)
+
+        assert response.status_code == 400
+        assert admin.drain() == []
+
+    def test_events_requires_authentication(self, client):
+        assert client.get("/events").status_code == 401
+
+    def test_events_unavailable_when_broker_disabled(
+        self, client, token_user, monkeypatch
+    ):
+        monkeypatch.setattr(broker, "enabled", False)
+        headers = {"Authorization": f"Bearer {token_user}"}
+
+        assert client.get("/events", headers=headers).status_code == 503
+        assert broker.publish(STOCK_CHANGED, {"product_id": 1}) is None
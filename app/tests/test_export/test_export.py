@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+import orjson
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.schemas.export_schema import ExportFormat
+from app.services.export_service import products_statement, stream_export
+
+SYNTHETIC_ROWS = 1_000_000
+
+
+@pytest.fixture
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+# Memória residente atual do processo (Linux)
+def current_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+# Testes das rotas de exportação
+class TestExportRoutes:
+
+    def test_export_products_csv(self, client, admin_headers, create_test_product):
+        response = client.get("/export/products", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "products.csv" in response.headers["content-disposition"]
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        exported = next(r for r in rows if r["id"] == str(create_test_product.id))
+        assert exported["barcode"] == create_test_product.barcode
+
+    def test_export_clients_ndjson(self, client, admin_headers, create_test_client):
+        response = client.get("/export/clients?format=ndjson", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        rows = [orjson.loads(line) for line in response.text.splitlines()]
+        exported = next(r for r in rows if r["id"] == create_test_client.id)
+        assert exported["email"] == create_test_client.email
+
+    def test_export_orders_has_one_row_per_line(
+        self, client, admin_headers, create_test_order
+    ):
+        response = client.get("/export/orders?format=ndjson", headers=admin_headers)
+        assert response.status_code == 200
+        rows = [orjson.loads(line) for line in response.text.splitlines()]
+        lines = [r for r in rows if r["order_id"] == create_test_order.id]
+        assert len(lines) == 1
+        assert lines[0]["quantity"] == 2
+
+    def test_export_requires_authentication(self, client):
+        assert client.get("/export/orders").status_code == 401
+
+    def test_invalid_format_is_rejected(self, client, admin_headers):
+        response = client.get("/export/products?format=xml", headers=admin_headers)
+        assert response.status_code == 422
+
+
+# A exportação de 1M linhas deve manter a memória constante
+class TestExportMemory:
+
+    @pytest.fixture
+    def synthetic_session(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "WITH RECURSIVE seq(n) AS ("
+                    " SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :total)"
+                    " INSERT INTO products"
+                    " (id, description, price, barcode, section, stock, image_path)"
+                    " SELECT n, 'Produto ' || n, n * 0.01, 'bar' || n, 'Roupas',"
+                    " n % 100, 'img.png' FROM seq"
+                ),
+                {"total": SYNTHETIC_ROWS},
+            )
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+        engine.dispose()
+
+    @pytest.mark.skipif(
+        not os.path.exists("/proc/self/statm"), reason="Requer /proc (Linux)"
+    )
+    def test_rss_stays_flat_for_one_million_rows(self, synthetic_session):
+        rows = 0
+        samples = []
+        for chunk in stream_export(
+            synthetic_session, products_statement(), ExportFormat.ndjson
+        ):
+            rows += chunk.count(b"\n")
+            if rows % 100_000 < 1000:
+                samples.append(current_rss())
+
+        assert rows == SYNTHETIC_ROWS
+        # Após o aquecimento, a memória não cresce com o número de linhas
+        growth = max(samples[1:]) - samples[1]
+        assert growth < 20 * 1024 * 1024
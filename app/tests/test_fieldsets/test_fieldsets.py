@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@pytest.fixture
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+@pytest.fixture
+def captured_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+# Testes do parâmetro fields nas listagens
+class TestSparseFieldsets:
+
+    def test_orders_without_products_skip_product_tables(
+        self, client, admin_headers, create_test_order, captured_queries
+    ):
+        response = client.get("/orders/?fields=id,status", headers=admin_headers)
+        assert response.status_code == 200
+        order = next(o for o in response.json() if o["id"] == create_test_order.id)
+        assert order == {"id": create_test_order.id, "status": "pending"}
+
+        order_queries = [q for q in captured_queries if "FROM users" not in q]
+        assert len(order_queries) == 1
+        assert "order_products" not in order_queries[0]
+        assert "image_path" not in order_queries[0]
+
+    def test_orders_nested_fields(self, client, admin_headers, create_test_order):
+        response = client.get(
+            "/orders/?fields=id,products.quantity,products.product.description",
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        order = next(o for o in response.json() if o["id"] == create_test_order.id)
+        assert order["products"] == [
+            {"quantity": 2, "product": {"description": "Produto Teste"}}
+        ]
+
+    def test_products_fields(self, client, admin_headers, create_test_product):
+        response = client.get(
+            "/products/?fields=id,price&limit=1000", headers=admin_headers
+        )
+        assert response.status_code == 200
+        product = next(p for p in response.json() if p["id"] == create_test_product.id)
+        assert product == {"id": create_test_product.id, "price": 49.99}
+
+    def test_clients_fields(self, client, admin_headers, create_test_client):
+        response = client.get(
+            f"/clients/?fields=name&email={create_test_client.email}",
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"name": "Test Client"}]
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/orders/?fields=id,total",
+            "/orders/?fields=products.product.unknown",
+            "/orders/?fields=status.value",
+            "/products/?fields=hashed_password",
+            "/clients/?fields=,",
+        ],
+    )
+    def test_invalid_fields_are_rejected(self, client, admin_headers, url):
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 400
+        assert "Invalid field" in response.json()["detail"]
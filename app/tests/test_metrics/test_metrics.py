@@ -0,0 +1,36 @@
+from prometheus_client import REGISTRY
+
+
+# Testes do endpoint de métricas
+class TestMetrics:
+
+    def test_metrics_endpoint_exposes_prometheus_format(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "http_request_duration_seconds" in body
+        assert "db_query_duration_seconds" in body
+        assert "whatsapp_send_failures_total" in body
+
+    # A rota é registrada pelo template, não pelo caminho com IDs
+    def test_request_latency_uses_route_template(self, client, token_admin):
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        client.get("/products/999999", headers=headers)
+
+        count = REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count",
+            {"method": "GET", "route": "/products/{product_id}", "status": "404"},
+        )
+        assert count and count > 0
+
+        body = client.get("/metrics").text
+        assert 'route="/products/{product_id}"' in body
+        assert 'route="/products/999999"' not in body
+
+    def test_db_queries_are_observed(self, client, token_admin):
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        client.get("/clients/", headers=headers)
+
+        body = client.get("/metrics").text
+        assert 'db_query_duration_seconds_count{operation="SELECT"}' in body
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, update
+from sqlalchemy.engine import Engine
+
+from app.db.database import get_db
+from app.main import app
+from app.models.order_model import Order
+
+
+# Usa a mesma sessão de testes configurada no conftest
+def age_orders(order_ids, days):
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids))
+        .values(created_at=datetime.utcnow() - timedelta(days=days))
+    )
+    db.commit()
+    sessions.close()
+
+
+def get_stock(client, headers, product_id):
+    return client.get(f"/products/{product_id}", headers=headers).json()["stock"]
+
+
+# Cancelamento de pedidos em massa
+class TestBulkOrderDeletion:
+
+    def test_delete_by_ids_restores_stock(
+        self, client, admin_headers, create_product, create_order
+    ):
+        product_a, product_b = create_product(stock=100), create_product(stock=100)
+        first = create_order([(product_a, 3), (product_b, 1)]).json()["id"]
+        second = create_order([(product_a, 2)]).json()["id"]
+        assert get_stock(client, admin_headers, product_a) == 95
+
+        response = client.delete(
+            f"/orders/?ids={first},{second},999999", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["deleted"] == 2
+        assert response.json()["missing_ids"] == [999999]
+        assert get_stock(client, admin_headers, product_a) == 100
+        assert get_stock(client, admin_headers, product_b) == 100
+        assert client.get(f"/orders/{first}", headers=admin_headers).status_code == 404
+
+    def test_delete_stale_pending_orders(
+        self, client, admin_headers, create_product, create_order
+    ):
+        product = create_product(stock=100)
+        stale = create_order([(product, 4)]).json()["id"]
+        stale_paid = create_order([(product, 1)], status="paid").json()["id"]
+        recent = create_order([(product, 2)]).json()["id"]
+        age_orders([stale, stale_paid], days=30)
+
+        response = client.delete(
+            "/orders/?status=pending&older_than_days=7", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert get_stock(client, admin_headers, product) == 97
+        assert client.get(f"/orders/{stale}", headers=admin_headers).status_code == 404
+        for kept in (stale_paid, recent):
+            assert (
+                client.get(f"/orders/{kept}", headers=admin_headers).status_code == 200
+            )
+
+    # Um UPDATE de estoque por lote, independente do número de pedidos
+    def test_single_stock_update_per_batch(
+        self, client, admin_headers, create_product, create_order
+    ):
+        products = [create_product(stock=100) for _ in range(3)]
+        ids = [create_order([(p, 1) for p in products]).json()["id"] for _ in range(10)]
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.delete(
+                f"/orders/?ids={','.join(map(str, ids))}", headers=admin_headers
+            )
+        finally:
+            event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == 200
+        assert len([s for s in statements if s.startswith("UPDATE products")]) == 1
+
+    def test_filter_is_required(self, client, admin_headers):
+        response = client.delete("/orders/", headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_regular_user_cannot_bulk_delete(self, client, token_user):
+        headers = {"Authorization": f"Bearer {token_user}"}
+        response = client.delete("/orders/?ids=1", headers=headers)
+        assert response.status_code == 403
@@ -0,0 +1,180 @@
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+
+from app.db.database import get_db
+from app.main import app
+from app.models import Order, Product, StockMovement, User
+
+
+@pytest.fixture
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+@pytest.fixture
+def user_headers(token_user):
+    return {"Authorization": f"Bearer {token_user}"}
+
+
+def new_session():
+    return next(app.dependency_overrides[get_db]())
+
+
+class CapturedStatements(list):
+    def __call__(self, conn, cursor, statement, *args):
+        self.append(" ".join(statement.split()).lower())
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self)
+
+
+# PATCH /orders/{id}/status: máquina de estados com UPDATE condicional
+class TestOrderStatus:
+    def patch(self, client, order_id, headers, **body):
+        return client.patch(f"/orders/{order_id}/status", json=body, headers=headers)
+
+    def test_full_lifecycle(self, client, user_headers, create_test_order):
+        order_id = create_test_order.id
+        for new_status in ("paid", "shipped", "delivered"):
+            response = self.patch(client, order_id, user_headers, status=new_status)
+            assert response.status_code == 200
+            assert response.json() == {
+                "id": order_id,
+                "client_id": create_test_order.client_id,
+                "status": new_status,
+                "created_by": create_test_order.created_by,
+            }
+
+        response = self.patch(client, order_id, user_headers, status="cancelled")
+        assert response.status_code == 409
+        assert response.json()["detail"] == (
+            "Invalid status transition: delivered -> cancelled"
+        )
+
+    def test_single_conditional_update(self, client, admin_headers, create_test_order):
+        with CapturedStatements() as statements:
+            response = self.patch(
+                client, create_test_order.id, admin_headers, status="paid"
+            )
+        assert response.status_code == 200
+        updates = [s for s in statements if s.startswith("update orders")]
+        assert len(updates) == 1
+        assert "where orders.id = ? and orders.status in (?)" in updates[0]
+        assert not any("order_products" in s for s in statements)
+
+        # Os itens continuam intactos
+        order = client.get(f"/orders/{create_test_order.id}", headers=admin_headers)
+        assert len(order.json()["products"]) == 1
+
+    def test_invalid_transitions(self, client, admin_headers, create_test_order):
+        order_id = create_test_order.id
+        response = self.patch(client, order_id, admin_headers, status="delivered")
+        assert response.status_code == 409
+        assert response.json()["detail"] == (
+            "Invalid status transition: pending -> delivered"
+        )
+
+        response = self.patch(client, order_id, admin_headers, status="pending")
+        assert response.status_code == 400
+
+        response = self.patch(
+            client, order_id, admin_headers, status="paid", expected_status="delivered"
+        )
+        assert response.status_code == 400
+
+        response = self.patch(client, order_id, admin_headers, status="confirmed")
+        assert response.status_code == 422
+
+    def test_expected_status_detects_concurrent_change(
+        self, client, admin_headers, create_test_order
+    ):
+        order_id = create_test_order.id
+        response = self.patch(client, order_id, admin_headers, status="cancelled")
+        assert response.status_code == 200
+
+        response = self.patch(
+            client, order_id, admin_headers, status="paid", expected_status="pending"
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"] == (
+            "Order status is cancelled, expected pending"
+        )
+
+    def test_cancel_restores_stock(
+        self, client, admin_headers, db, create_product, create_order
+    ):
+        product = create_product(stock=50)
+        order_id = create_order([(product, 3), (product, 2)]).json()["id"]
+        assert db.get(Product, product).stock == 45
+
+        response = self.patch(client, order_id, admin_headers, status="cancelled")
+        assert response.status_code == 200
+        db.expire_all()
+        assert db.get(Product, product).stock == 50
+        assert db.execute(
+            select(StockMovement.quantity)
+            .where(StockMovement.order_id == order_id)
+            .where(StockMovement.reason == "order_cancel")
+        ).scalars().all() == [5]
+
+        # Outras transições não mexem no estoque
+        order_id = create_order([(product, 4)]).json()["id"]
+        self.patch(client, order_id, admin_headers, status="paid")
+        db.expire_all()
+        assert db.get(Product, product).stock == 46
+
+    def test_access_rules(self, client, user_headers, create_test_order):
+        response = self.patch(client, 999999, user_headers, status="paid")
+        assert response.status_code == 404
+
+        db = new_session()
+        admin = db.execute(select(User).where(User.email == "admin@test.com")).scalar()
+        order = Order(client_id=create_test_order.client_id, created_by=admin.id)
+        db.add(order)
+        db.commit()
+        response = self.patch(client, order.id, user_headers, status="paid")
+        assert response.status_code == 403
+        db.refresh(order)
+        assert order.status == "pending"
+        db.close()
+
+    def test_put_without_products_keeps_lines(
+        self, client, admin_headers, create_test_order
+    ):
+        response = client.put(
+            f"/orders/{create_test_order.id}",
+            json={"status": "paid"},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "paid"
+        assert len(response.json()["products"]) == 1
+
+    def test_status_queue_uses_partial_index(
+        self, client, admin_headers, create_test_order
+    ):
+        self.patch(client, create_test_order.id, admin_headers, status="paid")
+        response = client.get(
+            "/orders/?status=paid&fields=id,status", headers=admin_headers
+        )
+        assert response.status_code == 200
+        orders = response.json()
+        assert {"id": create_test_order.id, "status": "paid"} in orders
+        assert {order["status"] for order in orders} == {"paid"}
+
+        db = new_session()
+        plan = (
+            db.connection()
+            .exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id, created_at FROM orders "
+                "WHERE status = 'paid' ORDER BY created_at, id"
+            )
+            .all()
+        )
+        db.close()
+        assert "ix_orders_paid_created_at" in " ".join(str(row) for row in plan)
@@ -0,0 +1,182 @@
+import uuid
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
+
+@pytest.fixture
+def admin_headers(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+@pytest.fixture
+def create_products(client, admin_headers):
+    def _create(count, stock=100):
+        ids = []
+        for i in range(count):
+            payload = {
+                "description": f"Produto Lote {i}",
+                "price": 10.0,
+                "barcode": uuid.uuid4().hex,
+                "section": "Roupas",
+                "stock": stock,
+                "image_base64": VALID_IMAGE,
+            }
+            response = client.post("/products/", json=payload, headers=admin_headers)
+            ids.append(response.json()["id"])
+        return ids
+
+    return _create
+
+
+def count_queries(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "FROM users" not in statement:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = fn()
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+    return response, len(statements)
+
+
+def get_stock(client, headers, product_id):
+    return client.get(f"/products/{product_id}", headers=headers).json()["stock"]
+
+
+# Atualização de pedidos com diff em lote
+class TestOrderUpdateBatch:
+
+    def update_all_lines(self, client, headers, client_id, product_ids):
+        payload = {
+            "client_id": client_id,
+            "products": [{"product_id": pid, "quantity": 2} for pid in product_ids],
+        }
+        order = client.post("/orders/", json=payload, headers=headers).json()
+
+        # Muda a quantidade da primeira metade, remove o resto e adiciona um novo
+        half = order["products"][: len(product_ids) // 2]
+        update = {
+            "products": [
+                {"id": line["id"], "product_id": line["product_id"], "quantity": 5}
+                for line in half
+            ]
+            + [{"id": 0, "product_id": product_ids[-1], "quantity": 1}]
+        }
+        return count_queries(
+            lambda: client.put(f"/orders/{order['id']}", json=update, headers=headers)
+        )
+
+    def test_query_count_does_not_depend_on_line_count(
+        self, client, admin_headers, create_test_client, create_products
+    ):
+        small, small_queries = self.update_all_lines(
+            client, admin_headers, create_test_client.id, create_products(2)
+        )
+        large, large_queries = self.update_all_lines(
+            client, admin_headers, create_test_client.id, create_products(40)
+        )
+        assert small.status_code == 200
+        assert large.status_code == 200
+        assert len(large.json()["products"]) == 21
+        assert small_queries == large_queries
+
+    def test_stock_deltas_are_applied_per_product(
+        self, client, admin_headers, create_test_client, create_products
+    ):
+        kept, removed, added = create_products(3)
+        payload = {
+            "client_id": create_test_client.id,
+            "products": [
+                {"product_id": kept, "quantity": 4},
+                {"product_id": removed, "quantity": 3},
+            ],
+        }
+        order = client.post("/orders/", json=payload, headers=admin_headers).json()
+        kept_line = next(p for p in order["products"] if p["product_id"] == kept)
+
+        update = {
+            "products": [
+                {"id": kept_line["id"], "product_id": kept, "quantity": 10},
+                {"id": 0, "product_id": added, "quantity": 7},
+            ]
+        }
+        response = client.put(
+            f"/orders/{order['id']}", json=update, headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert get_stock(client, admin_headers, kept) == 90
+        assert get_stock(client, admin_headers, removed) == 100
+        assert get_stock(client, admin_headers, added) == 93
+
+    def test_insufficient_stock_rolls_back_everything(
+        self, client, admin_headers, create_test_client, create_products
+    ):
+        product_a, product_b = create_products(2, stock=5)
+        payload = {
+            "client_id": create_test_client.id,
+            "products": [{"product_id": product_a, "quantity": 1}],
+        }
+        order = client.post("/orders/", json=payload, headers=admin_headers).json()
+        line = order["products"][0]
+
+        update = {
+            "status": "shipped",
+            "products": [
+                {"id": line["id"], "product_id": product_a, "quantity": 3},
+                {"id": 0, "product_id": product_b, "quantity": 6},
+            ],
+        }
+        response = client.put(
+            f"/orders/{order['id']}", json=update, headers=admin_headers
+        )
+        assert response.status_code == 400
+        assert get_stock(client, admin_headers, product_a) == 4
+        assert get_stock(client, admin_headers, product_b) == 5
+
+        current = client.get(f"/orders/{order['id']}", headers=admin_headers).json()
+        assert current["status"] == "pending"
+        assert current["products"][0]["quantity"] == 1
+
+    def test_insufficient_stock_names_the_short_product(
+        self, client, admin_headers, create_test_client, create_products
+    ):
+        product_a, product_b = create_products(2, stock=5)
+        payload = {
+            "client_id": create_test_client.id,
+            "products": [{"product_id": product_a, "quantity": 1}],
+        }
+        order = client.post("/orders/", json=payload, headers=admin_headers).json()
+        line = order["products"][0]
+
+        # A passa (4 - 3 = 1); só B fica negativo. O diagnóstico não pode ver
+        # a baixa de A que o UPDATE já aplicou
+        update = {
+            "products": [
+                {"id": line["id"], "product_id": product_a, "quantity": 4},
+                {"id": 0, "product_id": product_b, "quantity": 10},
+            ],
+        }
+        response = client.put(
+            f"/orders/{order['id']}", json=update, headers=admin_headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"].endswith("Produto Lote 1")
+        assert get_stock(client, admin_headers, product_a) == 4
+
+    def test_unknown_product_returns_404(
+        self, client, admin_headers, create_test_order
+    ):
+        update = {"products": [{"id": 0, "product_id": 999999, "quantity": 1}]}
+        response = client.put(
+            f"/orders/{create_test_order.id}", json=update, headers=admin_headers
+        )
+        assert response.status_code == 404
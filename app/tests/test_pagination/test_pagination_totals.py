@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+
+from app.db.database import get_db
+from app.main import app
+from app.models import Client, Product
+from app.utils.counts import count_cache
+
+
+def db_count(model):
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    try:
+        return db.query(func.count(model.id)).scalar()
+    finally:
+        sessions.close()
+
+
+class CountQueries:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, *args):
+        self.count += "count(" in statement.lower()
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self)
+
+
+# Envelope de paginação com total exato ou estimado
+class TestPaginationTotals:
+    @pytest.fixture(autouse=True)
+    def setup(self, token_admin):
+        self.headers = {"Authorization": f"Bearer {token_admin}"}
+        count_cache.clear()
+        yield
+        count_cache.clear()
+
+    def test_list_without_flag_is_unchanged(self, client, create_test_product):
+        response = client.get("/products/?limit=2", headers=self.headers)
+        assert isinstance(response.json(), list)
+
+    def test_envelope_with_exact_total(self, client, create_test_product):
+        response = client.get(
+            "/products/?limit=2&skip=0&with_total=true", headers=self.headers
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert page["total"] == db_count(Product)
+        assert page["total_exact"] is True
+        assert (page["skip"], page["limit"]) == (0, 2)
+        assert len(page["items"]) == min(2, page["total"])
+        assert "description" in page["items"][0]
+
+    def test_filtered_total_and_fields(self, client, create_test_client):
+        response = client.get(
+            f"/clients/?email={create_test_client.email}&fields=id&with_total=true",
+            headers=self.headers,
+        )
+        assert response.json() == {
+            "items": [{"id": create_test_client.id}],
+            "total": 1,
+            "total_exact": True,
+            "skip": 0,
+            "limit": 10,
+        }
+
+    def test_unfiltered_total_cached_until_write(self, client, create_test_client):
+        url = "/clients/?limit=1&with_total=true"
+        first = client.get(url, headers=self.headers).json()["total"]
+        with CountQueries() as queries:
+            assert client.get(url, headers=self.headers).json()["total"] == first
+        assert queries.count == 0
+
+        payload = {
+            "name": "Novo",
+            "email": f"{uuid.uuid4().hex[:8]}@example.com",
+            "cpf": str(uuid.uuid4().int)[:11],
+        }
+        created = client.post("/clients/", json=payload, headers=self.headers).json()
+        assert client.get(url, headers=self.headers).json()["total"] == first + 1
+
+        client.delete(f"/clients/{created['id']}", headers=self.headers)
+        assert client.get(url, headers=self.headers).json()["total"] == first
+
+    def test_large_table_uses_estimate(self, client, monkeypatch):
+        monkeypatch.setattr(
+            "app.utils.counts.table_estimate", lambda db, table: 2_500_000
+        )
+        with CountQueries() as queries:
+            page = client.get("/clients/?with_total=true", headers=self.headers).json()
+        assert (page["total"], page["total_exact"]) == (2_500_000, False)
+        assert queries.count == 0
+
+    def test_small_filtered_estimate_falls_back_to_count(
+        self, client, monkeypatch, create_test_client
+    ):
+        monkeypatch.setattr("app.utils.counts.query_estimate", lambda db, query: 3)
+        page = client.get(
+            f"/clients/?name={create_test_client.name}&with_total=true",
+            headers=self.headers,
+        ).json()
+        total = db_count(Client)
+        assert page["total_exact"] is True
+        assert 1 <= page["total"] <= total
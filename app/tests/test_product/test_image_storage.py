@@ -0,0 +1,199 @@
+import asyncio
+import base64
+import gzip
+import os
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import file_utils
+from app.utils import image_storage as storage_module
+from app.utils.fake_s3 import FakeS3
+from app.utils.image_storage import (
+    LocalImageStorage,
+    S3ImageStorage,
+    S3StorageError,
+)
+
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
+# Bytes repetidos: a versão gzip compensa e é gerada no upload
+COMPRESSIBLE_IMAGE = (
+    "data:image/png;base64," + base64.b64encode(b"\x00" * 4096).decode()
+)
+
+BUCKET = "imagens"
+
+
+def s3_storage(fake: FakeS3, secret_key: str = "fake-secret") -> S3ImageStorage:
+    return S3ImageStorage(
+        endpoint_url="http://s3.test",
+        bucket=BUCKET,
+        access_key=fake.access_key,
+        secret_key=secret_key,
+        region=fake.region,
+        prefix="images/",
+        transport=httpx.ASGITransport(app=fake),
+    )
+
+
+@pytest.fixture()
+def fake_s3():
+    fake = FakeS3()
+    fake.create_bucket(BUCKET)
+    return fake
+
+
+# Troca o armazenamento das rotas pelo S3 falso: nada vai para o disco
+@pytest.fixture()
+def s3_backend(monkeypatch, fake_s3):
+    monkeypatch.setattr(file_utils, "image_storage", s3_storage(fake_s3))
+    return fake_s3.buckets[BUCKET]
+
+
+def product_payload(image_base64: str = VALID_IMAGE) -> dict:
+    return {
+        "description": "Produto com imagem",
+        "price": 10.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 5,
+        "image_base64": image_base64,
+    }
+
+
+class TestLocalImageStorage:
+    def test_put_get_delete(self, tmp_path):
+        storage = LocalImageStorage(str(tmp_path), fsync=False)
+        asyncio.run(storage.put("a.png", b"imagem"))
+        assert asyncio.run(storage.get("a.png")) == b"imagem"
+        # Só o arquivo final: o temporário foi renomeado
+        assert os.listdir(tmp_path) == ["a.png"]
+
+        asyncio.run(storage.delete("a.png", "a.png.gz"))
+        assert asyncio.run(storage.get("a.png")) is None
+
+    def test_fsync_file_and_folder(self, tmp_path, monkeypatch):
+        synced = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(
+            storage_module.os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd)
+        )
+        asyncio.run(LocalImageStorage(str(tmp_path), fsync=True).put("a.png", b"x"))
+        assert len(synced) == 2
+
+        synced.clear()
+        asyncio.run(LocalImageStorage(str(tmp_path), fsync=False).put("b.png", b"x"))
+        assert synced == []
+
+    def test_paths_are_rejected(self, tmp_path):
+        storage = LocalImageStorage(str(tmp_path / "images"), fsync=False)
+        with pytest.raises(ValueError):
+            asyncio.run(storage.put("../fora.png", b"x"))
+        assert asyncio.run(storage.get("../images")) is None
+        assert asyncio.run(storage.response("..", None, {})) is None
+
+
+class TestS3ImageStorage:
+    def test_put_get_delete(self, fake_s3):
+        storage = s3_storage(fake_s3)
+        asyncio.run(storage.put("a.png", b"imagem", "image/png"))
+        assert fake_s3.buckets[BUCKET]["images/a.png"] == (b"imagem", "image/png")
+        assert asyncio.run(storage.get("a.png")) == b"imagem"
+
+        asyncio.run(storage.delete("a.png", "a.png.br"))
+        assert fake_s3.buckets[BUCKET] == {}
+        assert asyncio.run(storage.get("a.png")) is None
+
+    def test_wrong_secret_is_rejected(self, fake_s3):
+        storage = s3_storage(fake_s3, secret_key="outra")
+        with pytest.raises(S3StorageError):
+            asyncio.run(storage.put("a.png", b"imagem"))
+        assert fake_s3.buckets[BUCKET] == {}
+
+    def test_created_and_closed_by_app_lifespan(self, monkeypatch, fake_s3):
+        storage = s3_storage(fake_s3)
+        monkeypatch.setattr(file_utils, "image_storage", None)
+        monkeypatch.setattr(file_utils, "get_image_storage", lambda: storage)
+
+        # Nada é criado no import: o storage nasce no startup do worker
+        with TestClient(app):
+            assert file_utils.image_storage is storage
+            assert not storage._client.is_closed
+        assert storage._client.is_closed
+        assert file_utils.image_storage is None
+
+    def test_missing_configuration(self):
+        with pytest.raises(RuntimeError):
+            S3ImageStorage(endpoint_url=None, bucket=None)
+
+
+class TestProductImagesOnS3:
+    def test_create_serve_and_delete(self, client, token_admin, s3_backend):
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        response = client.post("/products/", json=product_payload(), headers=headers)
+        assert response.status_code == 200
+        product = response.json()
+        image = product["image_path"]
+        assert f"images/{image}" in s3_backend
+        assert not os.path.exists(os.path.join(file_utils.IMAGE_FOLDER, image))
+
+        served = client.get(f"/products/images/{image}")
+        assert served.status_code == 200
+        assert served.content == base64.b64decode(VALID_IMAGE.split(",")[-1])
+
+        response = client.delete(f"/products/{product['id']}", headers=headers)
+        assert response.status_code == 200
+        assert s3_backend == {}
+        assert client.get(f"/products/images/{image}").status_code == 404
+
+    def test_precompressed_version_is_served(self, client, token_admin, s3_backend):
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        payload = product_payload(COMPRESSIBLE_IMAGE)
+        image = client.post("/products/", json=payload, headers=headers).json()[
+            "image_path"
+        ]
+        assert f"images/{image}.gz" in s3_backend
+
+        served = client.get(
+            f"/products/images/{image}", headers={"Accept-Encoding": "gzip"}
+        )
+        assert served.headers["content-encoding"] == "gzip"
+        assert served.headers["content-type"] == "image/png"
+        compressed = s3_backend[f"images/{image}.gz"][0]
+        assert gzip.decompress(compressed) == b"\x00" * 4096
+
+    def test_duplicate_barcode_removes_uploaded_image(
+        self, client, token_admin, s3_backend
+    ):
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        payload = product_payload()
+        assert (
+            client.post("/products/", json=payload, headers=headers).status_code == 200
+        )
+        stored = dict(s3_backend)
+
+        response = client.post("/products/", json=payload, headers=headers)
+        assert response.status_code == 400
+        assert s3_backend == stored
+
+    def test_failed_upload_leaves_nothing_behind(self, monkeypatch, fake_s3):
+        storage = s3_storage(fake_s3)
+        monkeypatch.setattr(file_utils, "image_storage", storage)
+        real_put = storage.put
+
+        # O original é gravado por último; a falha nele apaga as versões
+        async def failing_put(key, data, content_type=None):
+            if key.endswith(".png"):
+                raise S3StorageError("falha simulada")
+            await real_put(key, data, content_type)
+
+        monkeypatch.setattr(storage, "put", failing_put)
+        with pytest.raises(S3StorageError):
+            asyncio.run(file_utils.save_base64_image(COMPRESSIBLE_IMAGE))
+        assert fake_s3.buckets[BUCKET] == {}
@@ -0,0 +1,107 @@
+import time
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middlewares.profiling_middleware import ProfilingMiddleware
+from app.routes import profile_route
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def profiled_client(**options):
+    test_app = FastAPI()
+    test_app.dependency_overrides = app.dependency_overrides
+
+    @test_app.put("/orders/{order_id}")
+    def slow_update(order_id: int):
+        busy_loop(0.05)
+        return {"id": order_id}
+
+    test_app.include_router(profile_route.router)
+    test_app.add_middleware(ProfilingMiddleware, interval_ms=1, **options)
+    return TestClient(test_app)
+
+
+def load_profile(folder, response):
+    return orjson.loads((folder / response.headers["X-Profile-File"]).read_bytes())
+
+
+# Perfil de CPU por requisição, sob demanda ou 1 em cada N
+class TestProfiling:
+    @pytest.fixture(autouse=True)
+    def profiles_folder(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.utils.profiler.PROFILING_DIR", str(tmp_path))
+        self.folder = tmp_path
+
+    def test_admin_header_writes_speedscope_file(self, token_admin):
+        client = profiled_client()
+        response = client.put(
+            "/orders/7",
+            headers={"Authorization": f"Bearer {token_admin}", "X-Profile": "1"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"id": 7}
+
+        profile = load_profile(self.folder, response)
+        assert profile["name"].startswith("PUT /orders/{order_id}")
+        names = {frame["name"] for frame in profile["shared"]["frames"]}
+        assert "busy_loop" in names
+        worker = [p for p in profile["profiles"] if p["name"].startswith("worker")]
+        assert worker and len(worker[0]["samples"]) == len(worker[0]["weights"])
+        assert sum(worker[0]["weights"]) > 10
+
+    def test_query_flag_also_works(self, token_admin):
+        response = profiled_client().put(
+            "/orders/1?profile=1", headers={"Authorization": f"Bearer {token_admin}"}
+        )
+        assert "X-Profile-File" in response.headers
+
+    def test_flag_ignored_for_non_admin(self, token_user):
+        client = profiled_client()
+        response = client.put(
+            "/orders/1",
+            headers={"Authorization": f"Bearer {token_user}", "X-Profile": "1"},
+        )
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+        response = client.put("/orders/1", headers={"X-Profile": "1"})
+        assert "X-Profile-File" not in response.headers
+        assert list(self.folder.iterdir()) == []
+
+    def test_rolling_capture_one_in_n(self):
+        client = profiled_client(sample_route="PUT /orders/{order_id}", sample_every=3)
+        profiled = [
+            "X-Profile-File" in client.put(f"/orders/{i}").headers for i in range(6)
+        ]
+        assert profiled == [False, False, True, False, False, True]
+        assert "X-Profile-File" not in client.get("/profiles/").headers
+        assert len(list(self.folder.iterdir())) == 2
+
+    def test_download_restricted_to_admin(self, token_admin, token_user):
+        client = profiled_client(sample_route="PUT /orders/{order_id}", sample_every=1)
+        name = client.put("/orders/1").headers["X-Profile-File"]
+        admin = {"Authorization": f"Bearer {token_admin}"}
+
+        listed = client.get("/profiles/", headers=admin).json()
+        assert [profile["name"] for profile in listed] == [name]
+        response = client.get(f"/profiles/{name}", headers=admin)
+        assert response.status_code == 200
+        assert response.json()["$schema"].startswith("https://www.speedscope.app")
+
+        user = {"Authorization": f"Bearer {token_user}"}
+        assert client.get(f"/profiles/{name}", headers=user).status_code == 403
+        assert client.get("/profiles/..%2Fdev.db", headers=admin).status_code == 404
+
+    def test_old_profiles_are_rotated(self, monkeypatch):
+        monkeypatch.setattr("app.utils.profiler.PROFILING_MAX_FILES", 2)
+        client = profiled_client(sample_route="PUT /orders/{order_id}", sample_every=1)
+        names = [client.put(f"/orders/{i}").headers["X-Profile-File"] for i in range(3)]
+        assert sorted(p.name for p in self.folder.iterdir()) == sorted(names[1:])
@@ -0,0 +1,522 @@
+import asyncio
+import inspect
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.models import Client, Order, Product, RefreshToken, User
+from app.schemas.client_schema import ClientCreate, ClientUpdate
+from app.schemas.export_schema import ExportFormat
+from app.schemas.order_schema import (
+    OrderCreate,
+    OrderProductCreate,
+    OrderStatusUpdate,
+    OrderUpdate,
+)
+from app.schemas.product_schema import ProductCreate, ProductUpdate
+from app.services import (
+    alert_service,
+    auth_service,
+    client_service,
+    export_service,
+    order_service,
+    product_service,
+    stock_service,
+)
+from app.tools.seed import DEFAULT_PASSWORD, generate
+from app.utils.query_plans import StatementCapture, find_full_scans
+
+# Tabelas a partir desse tamanho não podem ser lidas por inteiro
+MIN_ROWS = 500
+
+VALID_IMAGE = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+)
+
+# Funções sem query própria: montam filtros/respostas ou são cobertas pelos
+# casos da função que as chama
+NO_OWN_QUERIES = {
+    "_credentials_exception",
+    "require_admin",
+    "decode_session_token",
+    "_issue_tokens",
+    "revoke_family",
+    "low_stock_filter",
+    "format_alerts",
+    "products_statement",
+    "clients_statement",
+    "orders_statement",
+    "_csv_chunk",
+    "_ndjson_chunk",
+    "filter_clients",
+    "filter_products",
+    "_raise_status_conflict",
+    "_update_order_lines",
+    "_delete_orders_batch",
+    "record_movements",
+}
+
+SERVICES = (
+    alert_service,
+    auth_service,
+    client_service,
+    export_service,
+    order_service,
+    product_service,
+    stock_service,
+)
+
+
+class Case:
+    # allowed: tabelas que a query lê por inteiro de propósito (listagem sem
+    # filtro, LIKE '%x%', exportação completa), com o motivo no comentário
+    def __init__(self, name, run, covers, allowed=()):
+        self.name = name
+        self.run = run
+        self.covers = covers
+        self.allowed = allowed
+
+
+def new_client(db, data):
+    return client_service.create_client(
+        db,
+        ClientCreate(
+            name="Plano",
+            email=f"{uuid.uuid4().hex[:10]}@example.com",
+            cpf=str(uuid.uuid4().int)[:11],
+        ),
+    )
+
+
+def new_product(db, data):
+    return asyncio.run(
+        product_service.create_product(
+            db,
+            ProductCreate(
+                description="Plano",
+                price=10.0,
+                barcode=str(uuid.uuid4().int)[:13],
+                section="Roupas",
+                stock=5,
+                image_base64=VALID_IMAGE,
+            ),
+        )
+    )
+
+
+def new_order(db, data):
+    order_in = OrderCreate(
+        client_id=data.client_id,
+        products=[OrderProductCreate(product_id=data.product_id, quantity=1)],
+    )
+    return order_service.create_order(db, order_in, data.user_id)
+
+
+def delete_new_client(db, data):
+    client = new_client(db, data)
+    with data.capture():
+        client_service.delete_client(db, client.id)
+
+
+def delete_new_product(db, data):
+    product = new_product(db, data)
+    with data.capture():
+        asyncio.run(product_service.delete_product(db, product.id))
+
+
+def refresh(db, data):
+    user = db.get(User, data.user_id)
+    _, refresh_token = auth_service.generate_tokens(db, user)
+    with data.capture():
+        auth_service.refresh_tokens(db, refresh_token)
+
+
+def logout(db, data):
+    user = db.get(User, data.user_id)
+    access_token, _ = auth_service.generate_tokens(db, user)
+    with data.capture():
+        auth_service.logout(db, access_token)
+
+
+def principal(db, data):
+    user = db.get(User, data.user_id)
+    access_token, _ = auth_service.generate_tokens(db, user)
+    with data.capture():
+        auth_service.get_current_principal(access_token, db)
+        auth_service.get_current_user(access_token, db)
+
+
+def delete_new_user(db, data):
+    user = auth_service.create_user(db, f"{uuid.uuid4().hex}@example.com", "x")
+    auth_service.generate_tokens(db, user)
+    with data.capture():
+        auth_service.delete_user(db, user)
+
+
+def status_conflict(db, data):
+    order = new_order(db, data)
+    with data.capture():
+        with pytest.raises(Exception):
+            order_service.update_order_status(
+                db,
+                order.id,
+                OrderStatusUpdate(status="delivered"),
+                data.user_id,
+                False,
+            )
+
+
+def export(statement):
+    def run(db, data):
+        for _ in export_service.stream_export(db, statement, ExportFormat.csv):
+            pass
+
+    return run
+
+
+CASES = [
+    # Clientes
+    Case(
+        "get_clients",
+        lambda db, data: client_service.get_clients(db),
+        ("get_clients",),
+        # Sem filtro, com LIMIT: a leitura para nas primeiras linhas
+        allowed=("clients",),
+    ),
+    Case(
+        "get_clients_by_name",
+        lambda db, data: client_service.get_clients(db, name="Cliente 1"),
+        ("get_clients",),
+        # contains() vira LIKE '%x%', que nenhum índice B-tree atende
+        allowed=("clients",),
+    ),
+    Case(
+        "count_clients",
+        lambda db, data: client_service.count_clients(db),
+        ("count_clients",),
+        # COUNT(*) da tabela inteira; fica em cache até a próxima escrita
+        allowed=("clients",),
+    ),
+    Case(
+        "get_clients_by_ids",
+        lambda db, data: client_service.get_clients_by_ids(db, [1, 2, 3]),
+        ("get_clients_by_ids",),
+    ),
+    Case(
+        "get_client_by_id",
+        lambda db, data: client_service.get_client_by_id(db, data.client_id),
+        ("get_client_by_id",),
+    ),
+    Case("create_client", new_client, ("create_client",)),
+    Case(
+        "update_client",
+        lambda db, data: client_service.update_client(
+            db, data.client_id, ClientUpdate(name="Renomeado")
+        ),
+        ("update_client",),
+    ),
+    Case("delete_client", delete_new_client, ("delete_client",)),
+    # Produtos
+    Case(
+        "get_products",
+        lambda db, data: product_service.get_products(db),
+        ("get_products",),
+        # Sem filtro, com LIMIT
+        allowed=("products",),
+    ),
+    Case(
+        "get_products_by_section",
+        lambda db, data: product_service.get_products(db, section="Roupas"),
+        ("get_products",),
+    ),
+    Case(
+        "get_products_by_price",
+        lambda db, data: product_service.get_products(db, min_price=10, max_price=20),
+        ("get_products",),
+    ),
+    Case(
+        "get_available_products",
+        lambda db, data: product_service.get_products(db, available=False),
+        ("get_products",),
+    ),
+    Case(
+        "count_products_by_section",
+        lambda db, data: product_service.count_products(db, section="Roupas"),
+        ("count_products",),
+    ),
+    Case(
+        "get_products_by_ids",
+        lambda db, data: product_service.get_products_by_ids(db, [1, 2, 3]),
+        ("get_products_by_ids",),
+    ),
+    Case(
+        "get_product_by_id",
+        lambda db, data: product_service.get_product_by_id(db, data.product_id),
+        ("get_product_by_id",),
+    ),
+    Case("create_product", new_product, ("create_product", "_insert_product")),
+    Case(
+        "update_product",
+        lambda db, data: asyncio.run(
+            product_service.update_product(db, data.product_id, ProductUpdate(stock=50))
+        ),
+        ("update_product", "_apply_product_updates"),
+    ),
+    Case(
+        "delete_product",
+        delete_new_product,
+        ("delete_product", "_delete_product_row"),
+    ),
+    # Pedidos
+    Case(
+        "get_order",
+        lambda db, data: order_service.get_order(db, data.order_id, 0, True),
+        ("get_order",),
+    ),
+    Case(
+        "list_orders_admin",
+        lambda db, data: order_service.list_orders(db, data.admin_id, True),
+        ("list_orders",),
+        # Admin sem filtro lista todos os pedidos
+        allowed=("orders",),
+    ),
+    Case(
+        "list_orders_user",
+        lambda db, data: order_service.list_orders(db, data.user_id, False),
+        ("list_orders",),
+    ),
+    Case(
+        "list_pending_orders",
+        lambda db, data: order_service.list_orders(
+            db, data.admin_id, True, order_status="pending"
+        ),
+        ("list_orders",),
+    ),
+    Case(
+        "get_orders_by_ids",
+        lambda db, data: order_service.get_orders_by_ids(
+            db, [data.order_id], data.user_id, False
+        ),
+        ("get_orders_by_ids",),
+    ),
+    Case("create_order", new_order, ("create_order",)),
+    Case(
+        "update_order",
+        lambda db, data: order_service.update_order(
+            db,
+            new_order(db, data).id,
+            OrderUpdate(status="paid", products=[]),
+            data.admin_id,
+            True,
+        ),
+        ("update_order",),
+    ),
+    Case(
+        "update_order_status",
+        lambda db, data: order_service.update_order_status(
+            db,
+            new_order(db, data).id,
+            OrderStatusUpdate(status="paid"),
+            data.user_id,
+            False,
+        ),
+        ("update_order_status",),
+    ),
+    Case("update_order_status_conflict", status_conflict, ("update_order_status",)),
+    Case(
+        "delete_order",
+        lambda db, data: order_service.delete_order(
+            db, new_order(db, data).id, data.admin_id, True
+        ),
+        ("delete_order",),
+    ),
+    Case(
+        "delete_orders_by_ids",
+        lambda db, data: order_service.delete_orders(db, ids=[new_order(db, data).id]),
+        ("delete_orders",),
+    ),
+    Case(
+        "delete_old_pending_orders",
+        lambda db, data: order_service.delete_orders(
+            db, order_status="pending", older_than_days=3650
+        ),
+        ("delete_orders",),
+    ),
+    # Autenticação
+    Case(
+        "authenticate_user",
+        lambda db, data: auth_service.authenticate_user(
+            db, data.user_email, DEFAULT_PASSWORD
+        ),
+        ("authenticate_user",),
+    ),
+    Case("principal", principal, ("get_current_principal", "get_current_user")),
+    Case(
+        "generate_tokens",
+        lambda db, data: auth_service.generate_tokens(db, db.get(User, data.user_id)),
+        ("generate_tokens",),
+    ),
+    Case("refresh_tokens", refresh, ("refresh_tokens",)),
+    Case("logout", logout, ("logout",)),
+    Case(
+        "create_user",
+        lambda db, data: auth_service.create_user(
+            db, f"{uuid.uuid4().hex}@example.com", "x"
+        ),
+        ("create_user",),
+    ),
+    Case("delete_user", delete_new_user, ("delete_user",)),
+    Case(
+        "toggle_admin",
+        lambda db, data: auth_service.toggle_admin(db, db.get(User, data.user_id)),
+        ("toggle_admin",),
+    ),
+    Case(
+        "purge_expired_refresh_tokens",
+        lambda db, data: auth_service.purge_expired_refresh_tokens(db),
+        ("purge_expired_refresh_tokens",),
+    ),
+    # Estoque, alertas e exportação
+    Case(
+        "compact_movements",
+        lambda db, data: stock_service.compact_movements(db, retention_days=3650),
+        ("compact_movements",),
+    ),
+    Case(
+        "reconcile_stock",
+        lambda db, data: stock_service.reconcile_stock(db),
+        ("reconcile_stock",),
+        # Auditoria: compara o estoque de todos os produtos com o livro
+        allowed=("products", "stock_movements"),
+    ),
+    Case(
+        "scan_stock_alerts",
+        lambda db, data: alert_service.scan_stock_alerts(
+            db, send=lambda number, body: None, numbers=[]
+        ),
+        ("scan_stock_alerts",),
+    ),
+    Case(
+        "export_products",
+        export(export_service.products_statement()),
+        ("stream_export",),
+        # Exportação completa, em streaming
+        allowed=("products",),
+    ),
+    Case(
+        "export_clients",
+        export(export_service.clients_statement()),
+        ("stream_export",),
+        allowed=("clients",),
+    ),
+    Case(
+        "export_user_orders",
+        lambda db, data: export(export_service.orders_statement(data.user_id, False))(
+            db, data
+        ),
+        ("stream_export",),
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def plans_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans')}/plans.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        generate(
+            conn,
+            users=5,
+            clients=MIN_ROWS + 100,
+            products=2_000,
+            orders=1_500,
+            lines_per_order=2,
+            days=30,
+            log=lambda message: None,
+        )
+        conn.execute(
+            RefreshToken.__table__.insert(),
+            [
+                {
+                    "jti": str(uuid.uuid4()),
+                    "family_id": str(uuid.uuid4()),
+                    "user_id": 1,
+                    "expires_at": datetime.utcnow() + timedelta(days=1),
+                }
+                for _ in range(MIN_ROWS)
+            ],
+        )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def plan_data(plans_engine):
+    db = sessionmaker(bind=plans_engine)()
+    user = db.execute(select(User).where(User.is_admin == 0).order_by(User.id)).scalar()
+    order = db.execute(
+        select(Order).where(Order.created_by == user.id).order_by(Order.id)
+    ).scalar()
+    product = db.execute(select(Product).where(Product.stock > 100)).scalar()
+    data = SimpleNamespace(
+        user_id=user.id,
+        user_email=user.email,
+        admin_id=db.execute(select(User.id).where(User.is_admin == 1)).scalar(),
+        client_id=db.execute(select(Client.id).order_by(Client.id)).scalar(),
+        product_id=product.id,
+        order_id=order.id,
+        capture=lambda: StatementCapture(plans_engine),
+    )
+    db.close()
+    return data
+
+
+# Cada query dos serviços passa pelo EXPLAIN: varredura completa em tabela
+# grande (fora das permitidas) falha o teste
+class TestQueryPlans:
+    @pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+    def test_no_full_scan_on_large_tables(self, case, plans_engine, plan_data):
+        db = sessionmaker(bind=plans_engine)()
+        captures = []
+        capture = plan_data.capture
+
+        # Casos que preparam dados capturam só o trecho medido
+        def scoped_capture():
+            captures.append(capture())
+            return captures[-1]
+
+        plan_data.capture = scoped_capture
+        try:
+            with StatementCapture(plans_engine) as everything:
+                case.run(db, plan_data)
+        finally:
+            plan_data.capture = capture
+            db.close()
+
+        statements = [s for c in captures for s in c] if captures else everything
+        assert statements, "o caso não executou nenhuma query"
+        with plans_engine.connect() as conn:
+            problems = find_full_scans(conn, statements, MIN_ROWS, case.allowed)
+        assert problems == []
+
+    def test_every_service_function_is_covered(self):
+        covered = {name for case in CASES for name in case.covers}
+        missing = []
+        for module in SERVICES:
+            for name, function in inspect.getmembers(module, inspect.isfunction):
+                if function.__module__ != module.__name__:
+                    continue
+                if name not in covered and name not in NO_OWN_QUERIES:
+                    missing.append(f"{module.__name__}.{name}")
+        assert missing == []
+
+    def test_detects_missing_index(self, plans_engine):
+        statement = "SELECT id FROM order_products WHERE quantity = ?"
+        with plans_engine.connect() as conn:
+            problems = find_full_scans(conn, [(statement, (3,))], MIN_ROWS)
+        assert problems == [("order_products", statement)]
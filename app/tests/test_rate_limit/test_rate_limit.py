@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+import pytest
+from jose import jwt
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middlewares.rate_limit_middleware import (
+    AUTH_PATHS,
+    RateLimitMiddleware,
+    RateLimitRule,
+)
+from app.utils.rate_limit import MemoryRateLimitStore, parse_limit
+
+
+def limited_client(*rules):
+    return TestClient(
+        RateLimitMiddleware(app, rules=rules, store=MemoryRateLimitStore())
+    )
+
+
+def login(client, username, password="admin123"):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+# Token bucket em memória
+class TestMemoryStore:
+
+    def test_parse_limit(self):
+        assert parse_limit("20/60") == (20, 60.0)
+        assert parse_limit("5") == (5, 60.0)
+
+    def test_bucket_refills_over_time(self):
+        store = MemoryRateLimitStore()
+
+        def consume(now):
+            return asyncio.run(store.consume("key", 2, 10, now=now))
+
+        assert consume(0) == 0
+        assert consume(0) == 0
+        assert consume(0) == pytest.approx(5)
+        assert consume(5) == 0
+        assert consume(5) == pytest.approx(5)
+
+    def test_least_recently_used_buckets_are_evicted(self):
+        store = MemoryRateLimitStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            asyncio.run(store.consume(key, 1, 60, now=0))
+
+        assert asyncio.run(store.consume("a", 1, 60, now=0)) == 0
+        assert asyncio.run(store.consume("c", 1, 60, now=0)) > 0
+
+
+# Middleware de rate limiting
+class TestRateLimitMiddleware:
+
+    def test_login_limited_per_username(self):
+        client = limited_client(
+            RateLimitRule("auth_username", "2/60", "username", AUTH_PATHS, ("POST",))
+        )
+        assert login(client, "admin@test.com").status_code == 200
+        assert login(client, "Admin@Test.com", "errada").status_code == 401
+
+        response = login(client, "admin@test.com")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) == 30
+        assert login(client, "user@test.com", "user123").status_code == 200
+
+    def test_auth_limited_per_ip(self):
+        client = limited_client(
+            RateLimitRule("auth_ip", "2/60", "ip", AUTH_PATHS, ("POST",))
+        )
+        payload = {"email": f"{uuid.uuid4()}@test.com", "password": "senha123"}
+        assert client.post("/auth/register", json=payload).status_code != 429
+        assert login(client, f"{uuid.uuid4()}@test.com").status_code == 401
+        assert login(client, f"{uuid.uuid4()}@test.com").status_code == 429
+
+    def test_writes_limited_per_user(self, token_admin, token_user, create_test_client):
+        client = limited_client(
+            RateLimitRule("writes_user", "1/60", "user", ("/orders", "/products"))
+        )
+        payload = {"client_id": create_test_client.id, "products": []}
+
+        def post_order(token):
+            headers = {"Authorization": f"Bearer {token}"}
+            return client.post("/orders/", json=payload, headers=headers)
+
+        assert post_order(token_admin).status_code == 201
+        assert post_order(token_admin).status_code == 429
+        assert post_order(token_user).status_code == 201
+        assert (
+            client.get(
+                "/orders/", headers={"Authorization": f"Bearer {token_admin}"}
+            ).status_code
+            == 200
+        )
+
+    def test_forged_token_does_not_drain_real_user(
+        self, token_admin, create_test_client
+    ):
+        client = limited_client(
+            RateLimitRule("writes_user", "1/60", "user", ("/orders", "/products"))
+        )
+        payload = {"client_id": create_test_client.id, "products": []}
+        forged = jwt.encode(
+            {"sub": "admin@test.com", "is_admin": True}, "outra-chave", "HS256"
+        )
+
+        def post_order(token):
+            headers = {"Authorization": f"Bearer {token}"}
+            return client.post("/orders/", json=payload, headers=headers)
+
+        # Assinatura inválida: conta no limite do IP, não no do admin
+        assert post_order(forged).status_code == 401
+        assert post_order(forged).status_code == 429
+        assert post_order(token_admin).status_code == 201
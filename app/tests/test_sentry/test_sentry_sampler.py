@@ -0,0 +1,45 @@
+from app.core.config import SENTRY_TRACES_HOT_SAMPLE_RATE, SENTRY_TRACES_SAMPLE_RATE
+from app.utils.sentry import boost_route, route_key, traces_sampler
+
+
+def sampling_context(method, path, parent_sampled=None):
+    return {
+        "parent_sampled": parent_sampled,
+        "asgi_scope": {"type": "http", "method": method, "path": path},
+    }
+
+
+# Testes da amostragem adaptativa de traces
+class TestTracesSampler:
+
+    def test_hot_get_routes_use_hot_rate(self):
+        assert traces_sampler(sampling_context("GET", "/products/")) == (
+            SENTRY_TRACES_HOT_SAMPLE_RATE
+        )
+        assert traces_sampler(
+            sampling_context("GET", "/products/images/abc123.png")
+        ) == (SENTRY_TRACES_HOT_SAMPLE_RATE)
+
+    def test_writes_use_default_rate(self):
+        assert traces_sampler(sampling_context("POST", "/products/")) == (
+            SENTRY_TRACES_SAMPLE_RATE
+        )
+
+    def test_metrics_is_never_traced(self):
+        assert traces_sampler(sampling_context("GET", "/metrics")) == 0.0
+
+    def test_parent_decision_is_respected(self):
+        assert traces_sampler(sampling_context("GET", "/products/", True)) == 1.0
+        assert traces_sampler(sampling_context("POST", "/orders/", False)) == 0.0
+
+    # Rotas com erro ou lentidão recente passam a ser sempre rastreadas
+    def test_boosted_route_is_always_sampled(self):
+        boost_route("PUT", "/orders/42")
+        assert traces_sampler(sampling_context("PUT", "/orders/7")) == 1.0
+        assert traces_sampler(sampling_context("GET", "/orders/7")) == (
+            SENTRY_TRACES_SAMPLE_RATE
+        )
+
+    def test_route_key_groups_ids(self):
+        assert route_key("GET", "/orders/1") == route_key("GET", "/orders/999/")
+        assert route_key("GET", "/orders/") == "GET /orders"
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import socket
+import sys
+
+import pytest
+
+from app.server import (
+    Master,
+    RequestLimit,
+    default_workers,
+    restrict_events,
+    rss_bytes,
+)
+from app.utils.events import broker
+
+
+async def ok_app(scope, receive, send):
+    pass
+
+
+def call(app, scope_type="http"):
+    asyncio.run(app({"type": scope_type}, None, None))
+
+
+# Peças do servidor pré-forkado que não dependem de fork
+class TestServer:
+    def test_default_workers_from_cpus(self):
+        assert default_workers() >= 1
+
+    def test_request_limit_asks_graceful_exit(self):
+        class FakeServer:
+            should_exit = False
+
+        limited = RequestLimit(ok_app, max_requests=3)
+        limited.server = FakeServer()
+        call(limited, "lifespan")
+        call(limited)
+        call(limited)
+        assert not limited.server.should_exit
+        call(limited)
+        assert limited.server.should_exit
+
+    def test_request_limit_disabled(self):
+        limited = RequestLimit(ok_app, max_requests=0)
+        for _ in range(5):
+            call(limited)
+        assert limited.server is None
+
+    def test_events_need_single_worker(self, monkeypatch):
+        monkeypatch.setattr(broker, "enabled", True)
+        restrict_events(1)
+        assert broker.enabled
+        restrict_events(4)
+        assert not broker.enabled
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="usa /proc")
+    def test_memory_cap_replaces_worker_first(self, monkeypatch):
+        sock = socket.socket()
+        master = Master(ok_app, sock, workers=1, max_rss_mb=1)
+        master.workers = {os.getpid(): 0.0}
+        calls = []
+        monkeypatch.setattr(master, "spawn", lambda: calls.append("spawn"))
+        monkeypatch.setattr(
+            "app.server.os.kill", lambda pid, sig: calls.append(("kill", pid, sig))
+        )
+
+        assert rss_bytes(os.getpid()) > 1024 * 1024
+        master.check_memory()
+        sock.close()
+
+        assert calls[0] == "spawn"
+        assert calls[1][1] == os.getpid()
+        assert os.getpid() in master.retiring
+        assert os.getpid() not in master.workers
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta
+import orjson
+from sqlalchemy import select, update
+
+from app.models.product_model import Product
+from app.models.stock_movement_model import StockMovement
+from app.schemas.product_schema import ProductUpdate
+from app.services.product_service import update_product
+from app.services.stock_service import compact_movements, reconcile_stock
+
+
+def movements(db, product_id):
+    return db.execute(
+        select(StockMovement.quantity, StockMovement.reason)
+        .where(StockMovement.product_id == product_id)
+        .order_by(StockMovement.id)
+    ).all()
+
+
+def drift_for(db, product_id):
+    return [d for d in reconcile_stock(db) if d["product_id"] == product_id]
+
+
+# Livro de movimentações de estoque
+class TestStockLedger:
+
+    def test_order_lifecycle_is_recorded(
+        self, client, admin_headers, db, create_product, create_order
+    ):
+        product = create_product()
+        order = create_order([(product, 5)]).json()
+        order_id, line_id = order["id"], order["products"][0]["id"]
+        client.put(
+            f"/orders/{order_id}",
+            json={"products": [{"id": line_id, "product_id": product, "quantity": 2}]},
+            headers=admin_headers,
+        )
+        client.delete(f"/orders/{order_id}", headers=admin_headers)
+
+        assert [tuple(m) for m in movements(db, product)] == [
+            (50, "initial"),
+            (-5, "order_create"),
+            (3, "order_update"),
+            (2, "order_delete"),
+        ]
+        assert drift_for(db, product) == []
+
+    def test_manual_stock_change_is_recorded(
+        self, client, admin_headers, db, create_product
+    ):
+        product = create_product()
+        client.put(f"/products/{product}", json={"stock": 42}, headers=admin_headers)
+
+        assert movements(db, product)[-1] == (-8, "manual")
+        assert drift_for(db, product) == []
+
+    def test_manual_change_after_concurrent_order(
+        self, db, create_product, create_order
+    ):
+        product = create_product()
+        stale = db.get(Product, product)
+        assert stale.stock == 50
+
+        # Pedido gravado por outra sessão depois da leitura do produto
+        create_order([(product, 3)])
+        asyncio.run(update_product(db, product, ProductUpdate(stock=60)))
+
+        assert movements(db, product)[-1] == (13, "manual")
+        assert drift_for(db, product) == []
+
+    # Pedido recusado não deixa pedido, itens nem movimentação para trás
+    def test_insufficient_stock_leaves_no_trace(
+        self, admin_headers, db, create_product, create_order
+    ):
+        product = create_product(stock=1)
+        response = create_order([(product, 3)])
+
+        assert response.status_code == 400
+        assert movements(db, product) == [(1, "initial")]
+
+    def test_compaction_folds_old_movements(
+        self, admin_headers, db, create_product, create_order
+    ):
+        product = create_product()
+        create_order([(product, 4)])
+        create_order([(product, 1)])
+        db.execute(
+            update(StockMovement)
+            .where(StockMovement.product_id == product)
+            .values(created_at=datetime.utcnow() - timedelta(days=60))
+        )
+        db.commit()
+        create_order([(product, 2)])
+
+        compact_movements(db, retention_days=30)
+
+        assert [tuple(m) for m in movements(db, product)] == [
+            (-2, "order_create"),
+            (45, "snapshot"),
+        ]
+        assert drift_for(db, product) == []
+
+    def test_reconcile_reports_drift(self, db, create_product):
+        product = create_product()
+        db.execute(update(Product).where(Product.id == product).values(stock=47))
+        db.commit()
+
+        assert drift_for(db, product) == [
+            {"product_id": product, "stock": 47, "ledger_stock": 50, "drift": -3}
+        ]
+
+    def test_deleting_product_keeps_its_history(
+        self, client, admin_headers, db, create_product
+    ):
+        product = create_product()
+        client.put(f"/products/{product}", json={"stock": 40}, headers=admin_headers)
+        history = [
+            row.id
+            for row in db.execute(
+                select(StockMovement.id).where(StockMovement.product_id == product)
+            )
+        ]
+
+        response = client.delete(f"/products/{product}", headers=admin_headers)
+        assert response.status_code == 200
+
+        # As movimentações continuam no livro, soltas do produto, e a de
+        # exclusão zera o saldo com o retrato do produto
+        closing = db.execute(
+            select(StockMovement).where(
+                StockMovement.product_snapshot.like(f'{{"id":{product},%')
+            )
+        ).scalar_one()
+        rows = db.execute(
+            select(StockMovement.quantity, StockMovement.reason)
+            .where(StockMovement.id.in_([*history, closing.id]))
+            .where(StockMovement.product_id.is_(None))
+            .order_by(StockMovement.id)
+        ).all()
+        assert [tuple(row) for row in rows] == [
+            (50, "initial"),
+            (-10, "manual"),
+            (-40, "product_delete"),
+        ]
+        assert orjson.loads(closing.product_snapshot)["description"] == "Produto Teste"
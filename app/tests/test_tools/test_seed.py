@@ -0,0 +1,105 @@
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+from app.models import Client, Order, OrderProduct, Product, StockMovement, User
+from app.services.stock_service import reconcile_stock
+from app.tools.seed import cpf_for, generate, valid_cpf
+
+
+def cpf_is_valid(cpf: str) -> bool:
+    if len(cpf) != 11 or len(set(cpf)) == 1:
+        return False
+    return valid_cpf(int(cpf[:9])) == cpf
+
+
+def seed_database(**options):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        counts = generate(conn, log=lambda message: None, **options)
+    return engine, counts
+
+
+OPTIONS = dict(users=5, clients=200, products=500, orders=1000, chunk_size=300)
+
+
+class TestSeedGenerator:
+    def test_cpf_check_digits(self):
+        # CPF conhecido: 529.982.247-25
+        assert valid_cpf(529982247) == "52998224725"
+        assert all(cpf_is_valid(cpf_for(n)) for n in range(1, 2000))
+        assert len({cpf_for(n) for n in range(1, 20000)}) == 19999
+
+    def test_generates_requested_volume(self):
+        engine, counts = seed_database(**OPTIONS)
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count(User.id))).scalar() == 5
+            assert conn.execute(select(func.count(Client.id))).scalar() == 200
+            assert conn.execute(select(func.count(Product.id))).scalar() == 500
+            assert conn.execute(select(func.count(Order.id))).scalar() == 1000
+            lines = conn.execute(select(func.count(OrderProduct.id))).scalar()
+            assert lines == counts["order_lines"]
+            assert 1000 <= lines <= 5000
+            admins = conn.execute(select(func.sum(User.is_admin))).scalar()
+            assert admins == 1
+            # Uma senha só: todos os usuários com o mesmo hash
+            hashes = conn.execute(select(User.hashed_password).distinct()).all()
+            assert len(hashes) == 1
+
+        # O estoque semeado bate com o livro de estoque
+        with Session(engine) as db:
+            assert reconcile_stock(db) == []
+            assert db.query(StockMovement).count() == 500
+
+    def test_same_seed_same_data(self):
+        engine_a, _ = seed_database(**OPTIONS)
+        engine_b, _ = seed_database(**OPTIONS)
+        engine_c, _ = seed_database(seed=7, **OPTIONS)
+
+        def snapshot(engine):
+            with engine.connect() as conn:
+                return conn.execute(
+                    select(
+                        OrderProduct.order_id,
+                        OrderProduct.product_id,
+                        OrderProduct.quantity,
+                    ).order_by(OrderProduct.id)
+                ).all()
+
+        assert snapshot(engine_a) == snapshot(engine_b)
+        assert snapshot(engine_a) != snapshot(engine_c)
+
+    def test_skewed_distributions(self):
+        engine, _ = seed_database(
+            hot_sku_fraction=0.01, hot_sku_share=0.5, client_zipf=1.2, **OPTIONS
+        )
+        with engine.connect() as conn:
+            per_product = Counter(
+                conn.execute(select(OrderProduct.product_id)).scalars()
+            )
+            per_client = Counter(conn.execute(select(Order.client_id)).scalars())
+
+        total = sum(per_product.values())
+        hot = sum(count for _, count in per_product.most_common(5))
+        # 1% dos SKUs (5 produtos) com cerca de metade dos itens
+        assert hot / total > 0.4
+        # Zipf: o cliente mais frequente tem muito mais pedidos que a mediana
+        counts = sorted(per_client.values())
+        assert per_client.most_common(1)[0][1] > 10 * counts[len(counts) // 2]
+
+    def test_continues_after_existing_rows(self):
+        engine, _ = seed_database(**OPTIONS)
+        with engine.begin() as conn:
+            generate(conn, log=lambda message: None, **OPTIONS)
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count(Client.id))).scalar() == 400
+            emails = conn.execute(select(Client.email)).scalars().all()
+            assert len(set(emails)) == 400
+
+    def test_orders_require_related_rows(self):
+        with pytest.raises(SystemExit):
+            seed_database(users=0, clients=0, products=0, orders=10)
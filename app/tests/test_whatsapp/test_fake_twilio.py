@@ -0,0 +1,52 @@
+import time
+
+import pytest
+from twilio.base.exceptions import TwilioRestException
+
+from app.utils import send_sms
+from app.utils.fake_twilio import FakeTwilioClient
+from app.utils.metrics import WHATSAPP_SEND_FAILURES
+
+
+class TestFakeTwilioClient:
+    def test_create_returns_message_with_sid(self):
+        client = FakeTwilioClient("sid", "token")
+        message = client.messages.create(
+            body="Olá", from_="whatsapp:+14155238886", to="whatsapp:+5511999999999"
+        )
+        assert message.sid.startswith("SM")
+        assert message.to == "whatsapp:+5511999999999"
+        assert list(client.sent) == [message]
+
+    def test_simulated_latency(self):
+        client = FakeTwilioClient(latency_ms=20, seed=1)
+        start = time.perf_counter()
+        for _ in range(20):
+            client.messages.create(body="x", from_="a", to="b")
+        # Média exponencial de 20 ms: 20 envios levam bem mais que zero
+        assert time.perf_counter() - start > 0.1
+
+    def test_error_rate(self):
+        client = FakeTwilioClient(error_rate=0.3, seed=1)
+        failures = 0
+        for _ in range(1000):
+            try:
+                client.messages.create(body="x", from_="a", to="b")
+            except TwilioRestException as exc:
+                assert exc.status == 503
+                failures += 1
+        assert 250 < failures < 350
+        assert len(client.sent) == 1000 - failures
+
+    def test_send_whatsapp_message_uses_fake(self, monkeypatch):
+        fake = FakeTwilioClient(error_rate=1.0)
+        monkeypatch.setattr(send_sms, "client", fake)
+        before = WHATSAPP_SEND_FAILURES._value.get()
+        with pytest.raises(TwilioRestException):
+            send_sms.send_whatsapp_message("+5511999999999", "Olá")
+        assert WHATSAPP_SEND_FAILURES._value.get() == before + 1
+
+        fake.error_rate = 0
+        sid = send_sms.send_whatsapp_message("+5511999999999", "Olá")
+        assert fake.sent[-1].sid == sid
+        assert fake.sent[-1].to == "whatsapp:+5511999999999"
@@ -0,0 +1,332 @@
+"""Gerador de dados sintéticos em volume de produção.
+
+Insere usuários, clientes (CPF válido e e-mail únicos), produtos, pedidos e
+itens de pedido direto pelo Core do SQLAlchemy, em lotes, sem passar pela API
+nem pelo ORM. No PostgreSQL usa COPY. Todos os usuários recebem o mesmo hash
+de senha, calculado uma vez só. Com a mesma semente os dados são os mesmos
+(as datas são relativas ao dia da execução).
+
+Distribuições:
+- clientes com frequência Zipfiana (poucos clientes fazem muitos pedidos);
+- SKUs quentes: uma fração pequena dos produtos recebe boa parte dos itens.
+
+Os IDs continuam a partir do maior ID de cada tabela, então dá para rodar de
+novo sobre um banco já populado.
+
+Uso: python -m app.tools.seed --clients 10000 --products 100000 --orders 330000
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.core.security import hash_password
+from app.models import Client, Order, OrderProduct, Product, StockMovement, User
+from app.models.stock_movement_model import REASON_SNAPSHOT
+
+load_dotenv()
+
+SECTIONS = ("Roupas", "Calçados", "Bebidas", "Mercearia", "Eletrônicos", "Limpeza")
+STATUSES = ("pending", "paid", "shipped", "delivered", "cancelled")
+STATUS_WEIGHTS = (10, 15, 15, 55, 5)
+DEFAULT_PASSWORD = "seed123"
+
+
+# Dígitos verificadores do CPF a partir dos 9 primeiros dígitos
+def valid_cpf(base: int) -> str:
+    digits = [int(d) for d in f"{base:09d}"]
+    for size in (9, 10):
+        total = sum(d * w for d, w in zip(digits, range(size + 1, 1, -1)))
+        digits.append(total * 10 % 11 % 10)
+    return "".join(map(str, digits))
+
+
+# Embaralha n -> base de CPF sem repetir (3^18 é primo com 10^9); pula as
+# bases de dígitos iguais, que nenhum validador aceita
+def cpf_for(n: int) -> str:
+    base = (n * 387_420_489 + 123_456_789) % 10**9
+    if len(set(f"{base:09d}")) == 1:
+        base = (base + 1) % 10**9
+    return valid_cpf(base)
+
+
+def zipf_cum_weights(n: int, s: float) -> list:
+    return list(accumulate(1 / rank**s for rank in range(1, n + 1)))
+
+
+def next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def copy_rows(conn, table, rows: list):
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def insert_chunk(conn, table, chunk: list):
+    if conn.dialect.name == "postgresql":
+        copy_rows(conn, table, chunk)
+    else:
+        conn.execute(insert(table), chunk)
+
+
+# Insere em lotes: COPY no PostgreSQL, executemany do Core nos outros bancos
+def bulk_insert(conn, model, rows, chunk_size: int) -> int:
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            insert_chunk(conn, model.__table__, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        insert_chunk(conn, model.__table__, chunk)
+        count += len(chunk)
+    return count
+
+
+# IDs explícitos não avançam as sequences do PostgreSQL
+def reset_sequences(conn, models):
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__table__.name
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            )
+        )
+
+
+def existing_ids(conn, model) -> list:
+    return conn.execute(select(model.id).order_by(model.id)).scalars().all()
+
+
+def generate(
+    conn,
+    users: int = 10,
+    admins: int = 1,
+    clients: int = 1_000,
+    products: int = 10_000,
+    orders: int = 30_000,
+    lines_per_order: int = 3,
+    client_zipf: float = 1.1,
+    user_zipf: float = 1.1,
+    hot_sku_fraction: float = 0.01,
+    hot_sku_share: float = 0.5,
+    whatsapp_share: float = 0.0,
+    days: int = 365,
+    seed: int = 42,
+    password: str = DEFAULT_PASSWORD,
+    chunk_size: int = 10_000,
+    log=print,
+) -> dict:
+    rng = random.Random(seed)
+    counts = {}
+    now = datetime.utcnow().replace(microsecond=0)
+
+    # Usuários: um só bcrypt para todos
+    start_id = next_id(conn, User)
+    hashed = hash_password(password) if users else None
+    counts["users"] = bulk_insert(
+        conn,
+        User,
+        (
+            {
+                "id": user_id,
+                "email": f"usuario{user_id}@example.com",
+                "hashed_password": hashed,
+                "is_active": 1,
+                "is_admin": 1 if n < admins else 0,
+                "token_version": 0,
+            }
+            for n, user_id in enumerate(range(start_id, start_id + users))
+        ),
+        chunk_size,
+    )
+    user_ids = list(range(start_id, start_id + users)) or existing_ids(conn, User)
+    log(f"usuários: {counts['users']}")
+
+    start_id = next_id(conn, Client)
+    counts["clients"] = bulk_insert(
+        conn,
+        Client,
+        (
+            {
+                "id": client_id,
+                "name": f"Cliente {client_id}",
+                "email": f"cliente{client_id}@example.com",
+                "cpf": cpf_for(client_id),
+                "whatsapp": (
+                    f"+55119{client_id % 10**8:08d}"
+                    if whatsapp_share and rng.random() < whatsapp_share
+                    else None
+                ),
+            }
+            for client_id in range(start_id, start_id + clients)
+        ),
+        chunk_size,
+    )
+    client_ids = list(range(start_id, start_id + clients)) or existing_ids(conn, Client)
+    log(f"clientes: {counts['clients']}")
+
+    # Produtos com o estoque atual registrado como snapshot no livro de estoque
+    start_id = next_id(conn, Product)
+    stocks = {}
+
+    def product_rows():
+        today = date.today()
+        for product_id in range(start_id, start_id + products):
+            stocks[product_id] = rng.randint(0, 500)
+            yield {
+                "id": product_id,
+                "description": f"Produto {product_id}",
+                "price": round(rng.lognormvariate(3, 1), 2),
+                "barcode": f"789{product_id:010d}",
+                "section": rng.choice(SECTIONS),
+                "stock": stocks[product_id],
+                "expiration_date": (
+                    today + timedelta(days=rng.randint(-30, 720))
+                    if rng.random() < 0.3
+                    else None
+                ),
+                "image_path": "static/images/seed.png",
+            }
+
+    counts["products"] = bulk_insert(conn, Product, product_rows(), chunk_size)
+    bulk_insert(
+        conn,
+        StockMovement,
+        (
+            {
+                "product_id": product_id,
+                "quantity": stock,
+                "reason": REASON_SNAPSHOT,
+                "order_id": None,
+                "created_at": now,
+            }
+            for product_id, stock in stocks.items()
+        ),
+        chunk_size,
+    )
+    product_ids = list(stocks) or existing_ids(conn, Product)
+    log(f"produtos: {counts['products']}")
+
+    if orders and not (user_ids and client_ids and product_ids):
+        raise SystemExit("Pedidos precisam de usuários, clientes e produtos")
+
+    # Ranking Zipfiano em ordem aleatória: os clientes "quentes" não são
+    # simplesmente os de menor ID
+    client_ranking = rng.sample(client_ids, len(client_ids))
+    client_weights = zipf_cum_weights(len(client_ranking), client_zipf)
+    user_ranking = rng.sample(user_ids, len(user_ids))
+    user_weights = zipf_cum_weights(len(user_ranking), user_zipf)
+    hot_skus = rng.sample(product_ids, max(1, int(len(product_ids) * hot_sku_fraction)))
+
+    def pick(ranking, weights):
+        return ranking[bisect_left(weights, rng.random() * weights[-1])]
+
+    def pick_product():
+        if rng.random() < hot_sku_share:
+            return rng.choice(hot_skus)
+        return rng.choice(product_ids)
+
+    # Pedidos em ordem cronológica, em lotes: cada lote de pedidos é gravado
+    # antes dos seus itens, sem acumular milhões de linhas em memória
+    start_id = next_id(conn, Order)
+    first_at = now - timedelta(days=days)
+    span = days * 86_400
+    max_lines = min(2 * lines_per_order - 1, len(product_ids))
+    counts["orders"] = counts["order_lines"] = 0
+    for chunk_start in range(0, orders, chunk_size):
+        order_chunk, lines = [], []
+        for n in range(chunk_start, min(chunk_start + chunk_size, orders)):
+            order_id = start_id + n
+            order_chunk.append(
+                {
+                    "id": order_id,
+                    "client_id": pick(client_ranking, client_weights),
+                    "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                    "created_at": first_at + timedelta(seconds=span * n // orders),
+                    "created_by": pick(user_ranking, user_weights),
+                }
+            )
+            chosen = set()
+            size = rng.randint(1, max_lines)
+            while len(chosen) < size:
+                chosen.add(pick_product())
+            lines += [
+                {
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": rng.randint(1, 5),
+                }
+                for product_id in sorted(chosen)
+            ]
+        counts["orders"] += bulk_insert(conn, Order, order_chunk, chunk_size)
+        counts["order_lines"] += bulk_insert(conn, OrderProduct, lines, chunk_size)
+    log(f"pedidos: {counts['orders']}, itens: {counts['order_lines']}")
+
+    reset_sequences(conn, (User, Client, Product, Order))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=30_000)
+    parser.add_argument("--lines-per-order", type=int, default=3, help="média")
+    parser.add_argument("--client-zipf", type=float, default=1.1)
+    parser.add_argument("--user-zipf", type=float, default=1.1)
+    parser.add_argument("--hot-sku-fraction", type=float, default=0.01)
+    parser.add_argument("--hot-sku-share", type=float, default=0.5)
+    parser.add_argument(
+        "--whatsapp-share", type=float, default=0.0, help="clientes com WhatsApp"
+    )
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = create_engine(os.getenv("DATABASE_URL"))
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        generate(conn, **vars(args))
+    print(
+        f"Concluído em {time.perf_counter() - started:.1f}s. "
+        f"Senha de todos os usuários: {args.password}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from typing import Any, Iterable
+from fastapi import HTTPException, Response
+from app.core.config import BATCH_MAX_IDS
+
+# Header com os IDs pedidos que não foram encontrados
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+# Converte "3,1,2" em [3, 1, 2], sem duplicados e respeitando o limite do lote
+def parse_ids(ids: str, max_ids: int = BATCH_MAX_IDS) -> list[int]:
+    parsed = []
+    for value in ids.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            parsed.append(int(value))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid id: {value}")
+
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No ids informed")
+    if len(parsed) > max_ids:
+        raise HTTPException(
+            status_code=400, detail=f"Too many ids: maximum is {max_ids}"
+        )
+    return parsed
+
+
+# Reordena os resultados na ordem pedida e separa os IDs não encontrados
+def order_by_ids(items: Iterable[Any], ids: list[int]) -> tuple[list, list[int]]:
+    by_id = {item.id: item for item in items}
+    found = [by_id[item_id] for item_id in ids if item_id in by_id]
+    missing = [item_id for item_id in ids if item_id not in by_id]
+    return found, missing
+
+
+def with_missing_ids(response: Response, missing: list[int]) -> Response:
+    response.headers[MISSING_IDS_HEADER] = ",".join(str(i) for i in missing)
+    return response
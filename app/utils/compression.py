@@ -0,0 +1,55 @@
+import gzip
+import zlib
+
+# brotli é opcional: sem ele, só gzip é oferecido
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+# Codificações aceitas pelo cliente, na ordem de preferência do servidor
+def accepted_encodings(accept_encoding: str) -> list[str]:
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        token, _, params = item.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(token.strip())
+
+    encodings = []
+    if brotli is not None and "br" in accepted:
+        encodings.append("br")
+    if "gzip" in accepted:
+        encodings.append("gzip")
+    return encodings
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+# Compressor incremental para respostas em streaming
+class StreamCompressor:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
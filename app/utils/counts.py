@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import Optional, Tuple
+
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import COUNT_CACHE_SECONDS, COUNT_ESTIMATE_THRESHOLD
+
+# (total, exato?)
+Total = Tuple[int, bool]
+
+
+# Totais das listagens sem filtro, por tabela. Inserts e deletes feitos pelo
+# ORM invalidam a tabela no commit; escritas de outros workers aparecem em
+# até ttl_seconds
+class CountCache:
+    def __init__(self, ttl_seconds: float = COUNT_CACHE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> Optional[Total]:
+        cached = self._totals.get(table)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def set(self, table: str, total: Total):
+        with self._lock:
+            self._totals[table] = (total, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, table: str):
+        with self._lock:
+            self._totals.pop(table, None)
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+
+
+count_cache = CountCache()
+
+
+# Estimativa do planner do PostgreSQL para a tabela inteira (atualizada pelo
+# ANALYZE/autovacuum); -1 ou 0 quando a tabela nunca foi analisada
+def table_estimate(db: Session, table: str) -> Optional[int]:
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar()
+    return int(estimate) if estimate and estimate > 0 else None
+
+
+# Linhas estimadas pelo EXPLAIN para a query com filtros, sem executá-la
+def query_estimate(db: Session, query: Query) -> Optional[int]:
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def exact_count(query: Query) -> int:
+    return query.order_by(None).count()
+
+
+# Total de uma listagem: COUNT(*) exato para conjuntos pequenos; acima de
+# COUNT_ESTIMATE_THRESHOLD (só no PostgreSQL) usa a estimativa do planner.
+# Sem filtros, o resultado fica em cache até a próxima escrita na tabela
+def count_total(
+    db: Session,
+    query: Query,
+    table: str,
+    filtered: bool,
+    threshold: int = COUNT_ESTIMATE_THRESHOLD,
+) -> Total:
+    if not filtered:
+        cached = count_cache.get(table)
+        if cached is not None:
+            return cached
+        estimate = table_estimate(db, table)
+    else:
+        estimate = query_estimate(db, query)
+
+    if estimate is not None and estimate >= threshold:
+        total = (estimate, False)
+    else:
+        total = (exact_count(query), True)
+    if not filtered:
+        count_cache.set(table, total)
+    return total
+
+
+def _collect_changed_tables(session: Session, flush_context, instances):
+    tables = session.info.setdefault("count_tables", set())
+    for obj in (*session.new, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+def _invalidate_changed_tables(session: Session):
+    for table in session.info.pop("count_tables", ()):
+        count_cache.invalidate(table)
+
+
+# Registra a invalidação do cache em todas as sessões (inclusive a de testes).
+# Um rollback não limpa a lista: invalidar a mais só custa um COUNT
+def track_count_invalidation():
+    if event.contains(Session, "before_flush", _collect_changed_tables):
+        return
+    event.listen(Session, "before_flush", _collect_changed_tables)
+    event.listen(Session, "after_commit", _invalidate_changed_tables)
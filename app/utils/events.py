@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+
+from app.core.config import (
+    EVENTS_KEEPALIVE_SECONDS,
+    EVENTS_QUEUE_SIZE,
+    EVENTS_REPLAY_SIZE,
+)
+
+ORDER_CREATED = "order.created"
+ORDER_UPDATED = "order.updated"
+ORDER_DELETED = "order.deleted"
+STOCK_CHANGED = "stock.changed"
+
+
+class Event:
+    def __init__(self, event_id: int, event_type: str, data: dict, user_id=None):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        # Dono do evento; None = visível para todos os usuários autenticados
+        self.user_id = user_id
+
+    def visible_to(self, user_id: int, is_admin: bool) -> bool:
+        return is_admin or self.user_id is None or self.user_id == user_id
+
+    # Formato text/event-stream
+    def encode(self) -> bytes:
+        return (
+            f"id: {self.id}\nevent: {self.type}\ndata: ".encode()
+            + orjson.dumps(self.data)
+            + b"\n\n"
+        )
+
+
+# Fila limitada de um assinante: quando enche, descarta o evento mais antigo
+class Subscription:
+    def __init__(self, broker, user_id: int, is_admin: bool, queue_size: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def bind_loop(self):
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self.queue:
+            self._wakeup.set()
+
+    # Chamado com o lock do broker, de qualquer thread
+    def push(self, event: Event):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def drain(self) -> List[Event]:
+        events = []
+        while self.queue:
+            events.append(self.queue.popleft())
+        return events
+
+    async def wait(self, timeout: float) -> List[Event]:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._wakeup.clear()
+        return self.drain()
+
+
+# Pub/sub em memória do processo; os serviços publicam depois do commit. Os
+# ids e o replay também são do processo: com vários workers cada conexão só
+# veria os eventos do próprio worker e o Last-Event-ID de um não vale no
+# outro, então o servidor pré-forkado desliga o broker (enabled=False)
+class EventBroker:
+    def __init__(
+        self,
+        queue_size: int = EVENTS_QUEUE_SIZE,
+        replay_size: int = EVENTS_REPLAY_SIZE,
+    ):
+        self.queue_size = queue_size
+        self._replay = deque(maxlen=replay_size)
+        self._subscriptions = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def publish(self, event_type: str, data: dict, user_id=None) -> Optional[Event]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            event = Event(next(self._ids), event_type, data, user_id)
+            self._replay.append(event)
+            for subscription in self._subscriptions:
+                if event.visible_to(subscription.user_id, subscription.is_admin):
+                    subscription.push(event)
+        return event
+
+    # Com Last-Event-ID, reenvia o que ainda estiver no buffer de replay
+    def subscribe(
+        self, user_id: int, is_admin: bool, last_event_id: Optional[int] = None
+    ) -> Subscription:
+        subscription = Subscription(self, user_id, is_admin, self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._replay:
+                    if event.id > last_event_id and event.visible_to(user_id, is_admin):
+                        subscription.push(event)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+broker = EventBroker()
+
+
+def publish_order_event(event_type: str, order) -> Optional[Event]:
+    data = {
+        "id": order.id,
+        "status": order.status,
+        "client_id": order.client_id,
+        "created_by": order.created_by,
+    }
+    return broker.publish(event_type, data, user_id=order.created_by)
+
+
+def publish_order_deleted(order_id: int, created_by: int) -> Optional[Event]:
+    return broker.publish(ORDER_DELETED, {"id": order_id}, user_id=created_by)
+
+
+def publish_stock_changes(stock_deltas: Dict[int, int]):
+    for product_id, change in stock_deltas.items():
+        if change:
+            broker.publish(STOCK_CHANGED, {"product_id": product_id, "change": change})
+
+
+# Corpo da resposta SSE; comentários de keep-alive mantêm proxies com a conexão
+# aberta. A inscrição é feita aqui dentro, no mesmo escopo do unsubscribe: se
+# o corpo nunca começar (cliente caiu antes), nada fica preso no broker
+async def sse_stream(
+    broker: EventBroker,
+    user_id: int,
+    is_admin: bool,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    last_event_id: Optional[int] = None,
+    keepalive: float = EVENTS_KEEPALIVE_SECONDS,
+) -> AsyncIterator[bytes]:
+    subscription = broker.subscribe(user_id, is_admin, last_event_id)
+    try:
+        subscription.bind_loop()
+        yield b"retry: 3000\n\n"
+        while not await is_disconnected():
+            events = await subscription.wait(keepalive)
+            if not events:
+                yield b": keep-alive\n\n"
+            for event in events:
+                yield event.encode()
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,103 @@
+import hashlib
+from datetime import datetime, UTC
+from typing import Dict, Tuple
+from urllib.parse import unquote
+
+from app.utils.image_storage import sign_s3_request
+
+
+# Substituto local de um serviço compatível com S3 (app ASGI): guarda os
+# objetos em memória e confere a assinatura SigV4 de cada requisição. Usado
+# com httpx.ASGITransport, sem rede
+class FakeS3:
+    def __init__(
+        self,
+        access_key: str = "fake-access",
+        secret_key: str = "fake-secret",
+        region: str = "us-east-1",
+    ):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.buckets: Dict[str, Dict[str, Tuple[bytes, str]]] = {}
+        # Requisições recebidas (método, caminho), para inspeção em testes
+        self.requests = []
+
+    def create_bucket(self, bucket: str):
+        self.buckets.setdefault(bucket, {})
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        method = scope["method"]
+        path = scope.get("raw_path") or scope["path"].encode()
+        path = path.decode()
+        headers = {k.decode(): v.decode() for k, v in scope["headers"]}
+        self.requests.append((method, path))
+
+        if not self.authorized(method, path, body, headers):
+            await self.reply(
+                send, 403, b"<Error><Code>SignatureDoesNotMatch</Code></Error>"
+            )
+            return
+
+        bucket, _, key = unquote(path).lstrip("/").partition("/")
+        objects = self.buckets.get(bucket)
+        if objects is None or not key:
+            await self.reply(send, 404, b"<Error><Code>NoSuchBucket</Code></Error>")
+            return
+
+        if method == "PUT":
+            objects[key] = (body, headers.get("content-type", "binary/octet-stream"))
+            await self.reply(send, 200)
+        elif method == "DELETE":
+            objects.pop(key, None)
+            await self.reply(send, 204)
+        elif method in ("GET", "HEAD") and key in objects:
+            data, content_type = objects[key]
+            await self.reply(send, 200, data if method == "GET" else b"", content_type)
+        elif method in ("GET", "HEAD"):
+            await self.reply(send, 404, b"<Error><Code>NoSuchKey</Code></Error>")
+        else:
+            await self.reply(send, 405)
+
+    # Recalcula a assinatura com a mesma data e confere o hash do corpo
+    def authorized(self, method: str, path: str, body: bytes, headers: dict) -> bool:
+        if headers.get("x-amz-content-sha256") != hashlib.sha256(body).hexdigest():
+            return False
+        try:
+            now = datetime.strptime(headers["x-amz-date"], "%Y%m%dT%H%M%SZ")
+        except (KeyError, ValueError):
+            return False
+        expected = sign_s3_request(
+            method,
+            headers.get("host", ""),
+            path,
+            body,
+            self.access_key,
+            self.secret_key,
+            self.region,
+            now.replace(tzinfo=UTC),
+        )
+        return headers.get("authorization") == expected["authorization"]
+
+    @staticmethod
+    async def reply(
+        send, status: int, body: bytes = b"", content_type: str = "application/xml"
+    ):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,70 @@
+import itertools
+from collections import deque
+import random
+import threading
+import time
+from typing import Optional
+
+from twilio.base.exceptions import TwilioRestException
+
+
+class FakeMessage:
+    def __init__(self, sid: str, body: str, from_: str, to: str):
+        self.sid = sid
+        self.body = body
+        self.from_ = from_
+        self.to = to
+        self.status = "queued"
+
+
+class FakeMessages:
+    def __init__(self, owner: "FakeTwilioClient"):
+        self._owner = owner
+
+    # Mesma assinatura usada de twilio.rest.Client.messages.create; bloqueia a
+    # thread como o cliente real e falha com TwilioRestException
+    def create(self, body: str, from_: str, to: str) -> FakeMessage:
+        owner = self._owner
+        latency, fails = owner.next_outcome()
+        if latency:
+            time.sleep(latency)
+        if fails:
+            raise TwilioRestException(
+                503, "fake://Messages.json", msg="Falha simulada do Twilio falso"
+            )
+        message = FakeMessage(owner.next_sid(), body, from_, to)
+        owner.sent.append(message)
+        return message
+
+
+# Substituto local de twilio.rest.Client para testes de carga sem rede
+class FakeTwilioClient:
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        latency_ms: float = 0,
+        error_rate: float = 0,
+        seed: Optional[int] = None,
+        keep_messages: int = 1000,
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.messages = FakeMessages(self)
+        # Últimas mensagens enviadas, para inspeção em testes
+        self.sent = deque(maxlen=keep_messages)
+        self._rng = random.Random(seed)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_outcome(self):
+        # Latência exponencial em torno da média, como uma API externa real
+        with self._lock:
+            latency = (
+                self._rng.expovariate(1000 / self.latency_ms) if self.latency_ms else 0
+            )
+            fails = self._rng.random() < self.error_rate
+        return latency, fails
+
+    def next_sid(self) -> str:
+        return f"SMFAKE{next(self._counter):026d}"
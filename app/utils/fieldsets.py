@@ -0,0 +1,102 @@
+from typing import Any, Iterable, Optional, Type, get_args, get_origin
+import orjson
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+# Um fieldset é uma árvore de campos: {"id": {}, "products": {"quantity": {}}}
+Fieldset = dict[str, "Fieldset"]
+
+
+# Schema aninhado de um campo (OrderOut.products -> OrderProductOut), se houver
+def _nested_model(model: Type[BaseModel], name: str) -> Optional[Type[BaseModel]]:
+    annotation = model.model_fields[name].annotation
+    if get_origin(annotation) in (list, tuple):
+        annotation = get_args(annotation)[0]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+# Árvore com todos os campos do schema
+def full_fieldset(model: Type[BaseModel]) -> Fieldset:
+    tree = {}
+    for name in model.model_fields:
+        nested = _nested_model(model, name)
+        tree[name] = full_fieldset(nested) if nested else {}
+    return tree
+
+
+# Converte "id,status,products.quantity" na árvore de campos do schema.
+# Um campo aninhado sem subcampos ("products") traz o objeto completo.
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Fieldset]:
+    if not fields:
+        return None
+
+    tree: Fieldset = {}
+    for path in fields.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        current_model, node = model, tree
+        parts = path.split(".")
+        for i, part in enumerate(parts):
+            if current_model is None or part not in current_model.model_fields:
+                raise HTTPException(status_code=400, detail=f"Invalid field: {path}")
+            nested = _nested_model(current_model, part)
+            is_last = i == len(parts) - 1
+            if is_last and nested:
+                node[part] = full_fieldset(nested)
+            else:
+                node = node.setdefault(part, {})
+            current_model = nested
+
+    if not tree:
+        raise HTTPException(status_code=400, detail="Invalid field: empty fieldset")
+    return tree
+
+
+# Opções de carregamento do ORM: só as colunas pedidas e só os relacionamentos
+# pedidos (com selectinload, evitando uma query por linha)
+def loader_options(orm_class, tree: Fieldset) -> list:
+    mapper = inspect(orm_class)
+    column_keys = {prop.key for prop in mapper.column_attrs}
+    columns = {name for name in tree if name in column_keys}
+    options = []
+
+    for name, subtree in tree.items():
+        relationship = mapper.relationships.get(name)
+        if relationship is None:
+            continue
+        # Colunas locais (ex: product_id) são necessárias para carregar a relação
+        for column in relationship.local_columns:
+            columns.add(mapper.get_property_by_column(column).key)
+        options.append(
+            selectinload(getattr(orm_class, name)).options(
+                *loader_options(relationship.mapper.class_, subtree)
+            )
+        )
+
+    columns.update(mapper.get_property_by_column(pk).key for pk in mapper.primary_key)
+    options.append(load_only(*(getattr(orm_class, name) for name in columns)))
+    return options
+
+
+def _extract(obj: Any, tree: Fieldset) -> Any:
+    row = {}
+    for name, subtree in tree.items():
+        value = getattr(obj, name)
+        if subtree and value is not None:
+            if isinstance(value, (list, tuple)):
+                value = [_extract(item, subtree) for item in value]
+            else:
+                value = _extract(value, subtree)
+        row[name] = value
+    return row
+
+
+# Serializa apenas os campos pedidos, lendo direto dos objetos do ORM
+def fieldset_response(items: Iterable[Any], tree: Fieldset) -> Response:
+    rows = [_extract(item, tree) for item in items]
+    return Response(content=orjson.dumps(rows), media_type="application/json")
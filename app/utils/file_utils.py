@@ -1,29 +1,115 @@
 import base64
+import mimetypes
 import uuid
 import os
+from typing import Optional
 from fastapi import HTTPException
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from app.core.config import IMAGE_STORAGE_DIR
+from app.utils.compression import accepted_encodings, brotli, compress
+from app.utils.image_storage import get_image_storage
 
-IMAGE_FOLDER = "app/static/images"
+IMAGE_FOLDER = IMAGE_STORAGE_DIR
 
+# Backend de IMAGE_STORAGE_BACKEND, criado no lifespan da aplicação (no worker,
+# depois do fork do app.server: o cliente HTTP do S3 não pode vir do mestre) ou
+# no primeiro uso fora dela; os testes trocam pelo S3 falso
+image_storage = None
 
-def save_base64_image(image_base64: str) -> str:
-    try:
-        os.makedirs(IMAGE_FOLDER, exist_ok=True)
-        image_data = base64.b64decode(image_base64.split(",")[-1])
-        filename = f"{uuid.uuid4().hex}.png"
-        filepath = os.path.join(IMAGE_FOLDER, filename)
 
-        with open(filepath, "wb") as f:
-            f.write(image_data)
+def get_storage():
+    global image_storage
+    if image_storage is None:
+        image_storage = get_image_storage()
+    return image_storage
+
+
+async def close_image_storage():
+    global image_storage
+    if image_storage is not None:
+        await get_storage().aclose()
+        image_storage = None
+
 
-        return filename
-    except Exception as e:
+# Extensões das versões pré-comprimidas das imagens
+PRECOMPRESSED_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+# Nível máximo: a compressão é feita uma vez só, no upload
+PRECOMPRESS_LEVELS = {"br": 11, "gzip": 9}
+
+# Só mantém a versão comprimida se ela for ao menos 10% menor que o original
+PRECOMPRESS_MAX_RATIO = 0.9
+
+
+# Decodifica a imagem e grava o original e as versões pré-comprimidas no
+# armazenamento configurado (pasta local ou S3). O original vai por último: se
+# uma gravação falhar, nada fica visível e as versões já gravadas são apagadas
+async def save_base64_image(image_base64: str) -> str:
+    try:
+        image_data = base64.b64decode(image_base64.split(",")[-1])
+    except Exception:
         raise HTTPException(status_code=400, detail="Imagem inválida")
 
+    filename = f"{uuid.uuid4().hex}.png"
+    content_type = mimetypes.guess_type(filename)[0]
+    # brotli no nível 11 é CPU pura: fica fora do event loop
+    variants = await run_in_threadpool(precompressed_variants, image_data)
+    keys = [filename + extension for extension in variants]
+    try:
+        for key, data in zip(keys, variants.values()):
+            await get_storage().put(key, data, content_type)
+        await get_storage().put(filename, image_data, content_type)
+    except BaseException:
+        await get_storage().delete(*keys)
+        raise
+    return filename
+
 
-def delete_image(image_path):
+async def delete_image(image_path):
     if image_path:
-        try:
-            os.remove(os.path.join(IMAGE_FOLDER, image_path))
-        except FileNotFoundError:
-            pass
+        await get_storage().delete(
+            image_path,
+            *(image_path + ext for ext in PRECOMPRESSED_EXTENSIONS.values()),
+        )
+
+
+# Versões .br/.gz dos bytes da imagem que compensam (extensão -> dados)
+def precompressed_variants(data: bytes) -> dict[str, bytes]:
+    variants = {}
+    for encoding, extension in PRECOMPRESSED_EXTENSIONS.items():
+        if encoding == "br" and brotli is None:
+            continue
+        compressed = compress(data, encoding, PRECOMPRESS_LEVELS[encoding])
+        if len(compressed) <= len(data) * PRECOMPRESS_MAX_RATIO:
+            variants[extension] = compressed
+    return variants
+
+
+# Gera as versões .br/.gz de uma imagem já gravada na pasta local
+# (app/utils/precompress_images.py)
+def precompress_image(filename: str) -> list[str]:
+    filepath = os.path.join(IMAGE_FOLDER, filename)
+    with open(filepath, "rb") as f:
+        variants = precompressed_variants(f.read())
+
+    for extension, compressed in variants.items():
+        with open(filepath + extension, "wb") as f:
+            f.write(compressed)
+    encodings = {ext: enc for enc, ext in PRECOMPRESSED_EXTENSIONS.items()}
+    return [encodings[extension] for extension in variants]
+
+
+# Resposta com a melhor versão da imagem aceita pelo cliente (pré-comprimida
+# quando existir), ou None se a imagem não existir
+async def image_response(filename: str, accept_encoding: str) -> Optional[Response]:
+    media_type = mimetypes.guess_type(filename)[0]
+    for encoding in accepted_encodings(accept_encoding):
+        response = await get_storage().response(
+            filename + PRECOMPRESSED_EXTENSIONS[encoding],
+            media_type,
+            {"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if response is not None:
+            return response
+    return await get_storage().response(filename, media_type, {})
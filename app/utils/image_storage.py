@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import uuid
+from datetime import UTC, datetime
+from typing import Optional
+from urllib.parse import quote
+
+import httpx
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import (
+    IMAGE_S3_ACCESS_KEY,
+    IMAGE_S3_BUCKET,
+    IMAGE_S3_ENDPOINT_URL,
+    IMAGE_S3_PREFIX,
+    IMAGE_S3_REGION,
+    IMAGE_S3_SECRET_KEY,
+    IMAGE_STORAGE_BACKEND,
+    IMAGE_STORAGE_DIR,
+    IMAGE_STORAGE_FSYNC,
+)
+
+
+# Nomes gerados no upload ("<hex>.png", "<hex>.png.br"): nada de caminhos
+def valid_key(key: str) -> bool:
+    return bool(key) and not key.startswith(".") and "/" not in key and "\\" not in key
+
+
+# Pasta local. A E/S roda no threadpool para não segurar o event loop; cada
+# arquivo é gravado em um temporário e renomeado (leitores nunca veem imagem
+# pela metade). Com fsync, o arquivo e a pasta vão para o disco antes de a
+# requisição responder
+class LocalImageStorage:
+    def __init__(
+        self, folder: str = IMAGE_STORAGE_DIR, fsync: bool = IMAGE_STORAGE_FSYNC
+    ):
+        self.folder = folder
+        self.fsync = fsync
+
+    def _write(self, key: str, data: bytes):
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, key)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if self.fsync:
+            # O rename só é durável depois do fsync da pasta
+            fd = os.open(self.folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.folder, key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove(self, keys):
+        for key in keys:
+            try:
+                os.remove(os.path.join(self.folder, key))
+            except FileNotFoundError:
+                pass
+
+    def _is_file(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self.folder, key))
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        if not valid_key(key):
+            raise ValueError(f"Nome de imagem inválido: {key}")
+        await run_in_threadpool(self._write, key, data)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not valid_key(key):
+            return None
+        return await run_in_threadpool(self._read, key)
+
+    async def delete(self, *keys: str):
+        await run_in_threadpool(self._remove, [k for k in keys if valid_key(k)])
+
+    async def aclose(self):
+        pass
+
+    # FileResponse: o arquivo é enviado em pedaços, com ETag e Last-Modified
+    async def response(
+        self, key: str, media_type: Optional[str], headers: dict
+    ) -> Optional[Response]:
+        if not valid_key(key) or not await run_in_threadpool(self._is_file, key):
+            return None
+        return FileResponse(
+            os.path.join(self.folder, key), media_type=media_type, headers=headers
+        )
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+# Assinatura AWS Signature Version 4 (cabeçalho Authorization) de uma
+# requisição ao S3; o corpo entra no hash (x-amz-content-sha256)
+def sign_s3_request(
+    method: str,
+    host: str,
+    path: str,
+    body: bytes,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: Optional[datetime] = None,
+) -> dict:
+    now = now or datetime.now(UTC)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    day = amz_date[:8]
+    payload_hash = hashlib.sha256(body).hexdigest()
+    signed_headers = "host;x-amz-content-sha256;x-amz-date"
+    canonical_request = "\n".join(
+        [
+            method,
+            path,
+            "",
+            f"host:{host}",
+            f"x-amz-content-sha256:{payload_hash}",
+            f"x-amz-date:{amz_date}",
+            "",
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    scope = f"{day}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    signing_key = _hmac(
+        _hmac(_hmac(_hmac(f"AWS4{secret_key}".encode(), day), region), "s3"),
+        "aws4_request",
+    )
+    signature = hmac.new(
+        signing_key, string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "authorization": (
+            f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        ),
+    }
+
+
+class S3StorageError(Exception):
+    pass
+
+
+# Bucket S3 (ou compatível: MinIO, R2, Ceph) via API REST com httpx assíncrono,
+# no estilo de caminho (endpoint/bucket/chave). Todos os nós web veem as
+# mesmas imagens, sem disco compartilhado
+class S3ImageStorage:
+    def __init__(
+        self,
+        endpoint_url: Optional[str] = IMAGE_S3_ENDPOINT_URL,
+        bucket: Optional[str] = IMAGE_S3_BUCKET,
+        access_key: Optional[str] = IMAGE_S3_ACCESS_KEY,
+        secret_key: Optional[str] = IMAGE_S3_SECRET_KEY,
+        region: str = IMAGE_S3_REGION,
+        prefix: str = IMAGE_S3_PREFIX,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if not (endpoint_url and bucket and access_key and secret_key):
+            raise RuntimeError(
+                "IMAGE_STORAGE_BACKEND=s3 requer IMAGE_S3_ENDPOINT_URL, "
+                "IMAGE_S3_BUCKET, IMAGE_S3_ACCESS_KEY e IMAGE_S3_SECRET_KEY"
+            )
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self._client = httpx.AsyncClient(
+            base_url=endpoint_url, transport=transport, timeout=10
+        )
+
+    async def _request(
+        self, method: str, key: str, body: bytes = b"", headers: Optional[dict] = None
+    ) -> httpx.Response:
+        path = "/" + quote(f"{self.bucket}/{self.prefix}{key}", safe="/-_.~")
+        signed = sign_s3_request(
+            method,
+            self._client.base_url.netloc.decode(),
+            path,
+            body,
+            self.access_key,
+            self.secret_key,
+            self.region,
+        )
+        return await self._client.request(
+            method, path, content=body, headers={**(headers or {}), **signed}
+        )
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        if not valid_key(key):
+            raise ValueError(f"Nome de imagem inválido: {key}")
+        headers = {"content-type": content_type} if content_type else {}
+        response = await self._request("PUT", key, data, headers)
+        if response.status_code != 200:
+            raise S3StorageError(f"PUT {key}: HTTP {response.status_code}")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not valid_key(key):
+            return None
+        response = await self._request("GET", key)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise S3StorageError(f"GET {key}: HTTP {response.status_code}")
+        return response.content
+
+    # DELETE no S3 é idempotente (204 mesmo sem o objeto)
+    async def delete(self, *keys: str):
+        responses = await asyncio.gather(
+            *(self._request("DELETE", key) for key in keys if valid_key(key))
+        )
+        for response in responses:
+            if response.status_code not in (200, 204, 404):
+                raise S3StorageError(f"DELETE: HTTP {response.status_code}")
+
+    async def response(
+        self, key: str, media_type: Optional[str], headers: dict
+    ) -> Optional[Response]:
+        data = await self.get(key)
+        if data is None:
+            return None
+        return Response(data, media_type=media_type, headers=headers)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def get_image_storage(backend: str = IMAGE_STORAGE_BACKEND):
+    if backend == "s3":
+        return S3ImageStorage()
+    if backend == "local":
+        return LocalImageStorage()
+    raise RuntimeError(f"IMAGE_STORAGE_BACKEND desconhecido: {backend}")
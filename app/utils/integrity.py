@@ -0,0 +1,102 @@
+import re
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import UniqueConstraint, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+
+SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: ([\w., ]+)")
+MYSQL_DUPLICATE = re.compile(r"for key '(?:\w+\.)?(\w+)'")
+
+_unique_names: Dict[str, List[str]] = {}
+
+# Marca em session.info de que a transação atual já escreveu no banco
+WRITES_KEY = "has_writes"
+
+
+# Nome do índice/constraint único -> colunas, a partir dos modelos. Sem nome
+# explícito, o PostgreSQL chama a constraint de <tabela>_<coluna>_key
+def unique_constraint_columns() -> Dict[str, List[str]]:
+    if not _unique_names:
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                if index.unique:
+                    _unique_names[index.name] = [c.name for c in index.columns]
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint):
+                    columns = [c.name for c in constraint.columns]
+                    name = constraint.name or f"{table.name}_{'_'.join(columns)}_key"
+                    _unique_names[name] = columns
+    return _unique_names
+
+
+# Colunas da constraint única violada, ou None se o erro não for de unicidade
+def violated_unique_columns(exc: IntegrityError) -> Optional[List[str]]:
+    constraint = getattr(getattr(exc.orig, "diag", None), "constraint_name", None)
+    if constraint is None:
+        match = MYSQL_DUPLICATE.search(str(exc.orig))
+        constraint = match.group(1) if match else None
+    if constraint is not None:
+        return unique_constraint_columns().get(constraint)
+
+    # SQLite não informa o nome, só "tabela.coluna"
+    match = SQLITE_UNIQUE.search(str(exc.orig))
+    if match:
+        return [column.split(".")[-1] for column in match.group(1).split(", ")]
+    return None
+
+
+# A transação ganha a marca no flush do ORM e nos INSERT/UPDATE/DELETE feitos
+# com session.execute; perde no fim da transação raiz (commit ou rollback)
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_write(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WRITES_KEY, None)
+
+
+def has_writes(db: Session) -> bool:
+    return bool(db.new or db.dirty or db.deleted) or db.info.get(WRITES_KEY, False)
+
+
+# Escreve confiando nos índices únicos do banco, sem SELECT antes: a violação
+# vira o 400 de `messages` (coluna -> detalhe). Só abre savepoint se a
+# transação já tem escritas que precisam sobreviver à falha; numa transação
+# só de leitura (ex: o SELECT da autenticação), o rollback inteiro basta e
+# economiza o SAVEPOINT/RELEASE
+@contextmanager
+def unique_guard(db: Session, messages: Dict[str, str]):
+    savepoint = db.begin_nested() if has_writes(db) else None
+    try:
+        yield
+        db.flush()
+    except IntegrityError as exc:
+        if savepoint is not None:
+            savepoint.rollback()
+        else:
+            db.rollback()
+        columns = violated_unique_columns(exc) or []
+        detail = next((messages[c] for c in columns if c in messages), None)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail) from None
+    if savepoint is not None:
+        savepoint.commit()
@@ -0,0 +1,108 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Buckets pensados para latência de API (ms até alguns segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets menores para queries individuais no banco
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Requisições HTTP (rota usa o template, ex: /orders/{order_id})
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Banco de dados
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Latência das queries executadas no banco",
+    ["operation"],
+    buckets=QUERY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Conexões do pool atualmente em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_TOTAL = Counter(
+    "db_pool_checkouts",
+    "Total de conexões retiradas do pool",
+)
+
+# Hash de senha (bcrypt roda no threadpool das rotas síncronas)
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_operations_in_progress",
+    "Operações de bcrypt aguardando ou executando",
+    multiprocess_mode="livesum",
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "Duração das operações de bcrypt",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Envio de mensagens de WhatsApp (Twilio)
+WHATSAPP_SEND_DURATION = Histogram(
+    "whatsapp_send_duration_seconds",
+    "Latência do envio de mensagens de WhatsApp",
+    buckets=LATENCY_BUCKETS,
+)
+WHATSAPP_SEND_FAILURES = Counter(
+    "whatsapp_send_failures",
+    "Falhas no envio de mensagens de WhatsApp",
+)
+
+
+# Operação SQL resumida (SELECT, INSERT, ...) para evitar cardinalidade alta
+def _sql_operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    DB_QUERY_DURATION.labels(_sql_operation(statement)).observe(
+        time.perf_counter() - start
+    )
+
+
+def _on_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+    DB_POOL_CHECKOUT_TOTAL.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+# Registra os listeners em todas as engines/pools (inclusive a de testes)
+def instrument_sqlalchemy():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _on_error)
+    event.listen(Pool, "checkout", _on_checkout)
+    event.listen(Pool, "checkin", _on_checkin)
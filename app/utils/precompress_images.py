@@ -0,0 +1,32 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.file_utils import (
+    IMAGE_FOLDER,
+    PRECOMPRESSED_EXTENSIONS,
+    precompress_image,
+)
+
+
+# Gera as versões pré-comprimidas das imagens já existentes na pasta
+def precompress_existing_images():
+    if not os.path.isdir(IMAGE_FOLDER):
+        print(f"Pasta '{IMAGE_FOLDER}' não encontrada.")
+        return
+
+    extensions = tuple(PRECOMPRESSED_EXTENSIONS.values())
+    total = 0
+    for filename in sorted(os.listdir(IMAGE_FOLDER)):
+        if filename.endswith(extensions):
+            continue
+        created = precompress_image(filename)
+        if created:
+            total += 1
+            print(f"{filename}: {', '.join(created)}")
+    print(f"{total} imagem(ns) pré-comprimida(s).")
+
+
+if __name__ == "__main__":
+    precompress_existing_images()
@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.config import PROFILING_DIR, PROFILING_MAX_FILES
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+PROFILE_NAME = re.compile(r"^[\w.-]+\.speedscope\.json$")
+
+# Threads do pool do anyio (rotas síncronas rodam nelas)
+WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# Folhas em que a thread está só esperando: amostras descartadas
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+# Só um perfil por vez no processo: dois amostradores dobrariam o custo
+_active = threading.Lock()
+
+
+class SamplingProfiler:
+    # Amostrador em thread própria: a cada `interval` segundos lê a pilha da
+    # thread do event loop e das threads do pool, sem instrumentar chamadas
+    def __init__(self, interval: float, loop_thread: Optional[int] = None):
+        self.interval = interval
+        self.loop_thread = loop_thread or threading.get_ident()
+        self.frames: List[Tuple[str, str, int]] = []
+        self.frame_index: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[str, Tuple[list, list]] = {}  # thread -> (pilhas, pesos)
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> bool:
+        if not _active.acquire(blocking=False):
+            return False
+        self.started = time.perf_counter()
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        _active.release()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight = (now - last) * 1000
+            last = now
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.loop_thread:
+                    name = "event loop"
+                elif names.get(ident) == WORKER_THREAD_NAME:
+                    name = f"worker {ident}"
+                else:
+                    continue
+                stack = self._stack(frame)
+                if stack is not None:
+                    stacks, weights = self.samples.setdefault(name, ([], []))
+                    stacks.append(stack)
+                    weights.append(weight)
+
+    def _stack(self, frame) -> Optional[list]:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+            return None
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self.frame_index.get(key)
+            if index is None:
+                index = self.frame_index[key] = len(self.frames)
+                self.frames.append(key)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()  # speedscope espera a raiz primeiro
+        return stack
+
+    # Formato do speedscope (https://www.speedscope.app), que desenha o
+    # flamegraph; um perfil por thread
+    def speedscope(self, name: str) -> dict:
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }
+            for thread, (stacks, weights) in self.samples.items()
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "app.utils.profiler",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": func, "file": file, "line": line}
+                    for func, file, line in self.frames
+                ]
+            },
+            "profiles": profiles,
+        }
+
+
+def profile_filename(method: str) -> str:
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{method.lower()}-{os.getpid()}.speedscope.json"
+
+
+# Grava o perfil e apaga os mais antigos além de PROFILING_MAX_FILES
+def save_profile(data: dict, filename: str) -> str:
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    path = os.path.join(PROFILING_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data))
+    names = os.listdir(PROFILING_DIR)
+    profiles = sorted(name for name in names if PROFILE_NAME.match(name))
+    for old in profiles[: max(0, len(profiles) - PROFILING_MAX_FILES)]:
+        try:
+            os.remove(os.path.join(PROFILING_DIR, old))
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(PROFILING_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILING_DIR), reverse=True):
+        if PROFILE_NAME.match(name):
+            stat = os.stat(os.path.join(PROFILING_DIR, name))
+            profiles.append(
+                {
+                    "name": name,
+                    "size": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime, UTC),
+                }
+            )
+    return profiles
+
+
+def profile_path(name: str) -> Optional[str]:
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(PROFILING_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,22 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from app.services.auth_service import purge_expired_refresh_tokens
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+engine = create_engine(DATABASE_URL)
+
+if __name__ == "__main__":
+    session = Session(bind=engine)
+    try:
+        removed = purge_expired_refresh_tokens(session)
+    finally:
+        session.close()
+    print(f"{removed} refresh tokens expirados removidos.")
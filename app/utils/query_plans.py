@@ -0,0 +1,99 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+import orjson
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+# Comandos cujo plano interessa (INSERT não lê tabelas)
+EXPLAINED = ("select", "update", "delete", "with")
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(.*)$")
+ALIAS_SUFFIX = re.compile(r"_\d+$")
+
+
+# Guarda os comandos que chegam ao driver (já com o estilo de parâmetros do
+# dialeto), para rodar o EXPLAIN de cada um depois
+class StatementCapture(list):
+    def __init__(self, engine: Engine):
+        super().__init__()
+        self.engine = engine
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().lower().startswith(EXPLAINED):
+            self.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self)
+
+
+def _sqlite_full_scans(conn: Connection, statement: str, parameters) -> Set[str]:
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    tables = set()
+    for row in rows:
+        match = SQLITE_SCAN.match(row[-1])
+        # "SCAN t USING INDEX ..." percorre o índice, não a tabela
+        if match and "INDEX" not in match.group(2):
+            tables.add(match.group(1))
+    return tables
+
+
+def _postgresql_full_scans(conn: Connection, statement: str, parameters) -> Set[str]:
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = plan.scalar()
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    tables, nodes = set(), [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            tables.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return tables
+
+
+# Tabelas lidas por inteiro no plano do comando (aliases como products_1
+# voltam para o nome da tabela)
+def full_scans(conn: Connection, statement: str, parameters) -> Set[str]:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        scanned = _sqlite_full_scans(conn, statement, parameters)
+    elif dialect == "postgresql":
+        scanned = _postgresql_full_scans(conn, statement, parameters)
+    else:
+        raise NotImplementedError(f"EXPLAIN não suportado para {dialect}")
+    tables = set(inspect(conn).get_table_names())
+    return {
+        name if name in tables else ALIAS_SUFFIX.sub("", name)
+        for name in scanned
+        if name in tables or ALIAS_SUFFIX.sub("", name) in tables
+    }
+
+
+def table_sizes(conn: Connection) -> Dict[str, int]:
+    return {
+        table: conn.execute(text(f'SELECT count(*) FROM "{table}"')).scalar()
+        for table in inspect(conn).get_table_names()
+    }
+
+
+# Varreduras completas em tabelas com pelo menos `min_rows` linhas, fora das
+# permitidas. Retorna (tabela, comando) de cada uma
+def find_full_scans(
+    conn: Connection,
+    statements: Iterable[Tuple[str, object]],
+    min_rows: int,
+    allowed: Iterable[str] = (),
+) -> List[Tuple[str, str]]:
+    sizes = table_sizes(conn)
+    allowed = set(allowed)
+    problems = []
+    for statement, parameters in statements:
+        for table in sorted(full_scans(conn, statement, parameters)):
+            if table not in allowed and sizes.get(table, 0) >= min_rows:
+                problems.append((table, " ".join(statement.split())))
+    return problems
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import RATE_LIMIT_STORE_URL
+
+# redis é opcional: só é necessário com RATE_LIMIT_STORE_URL (vários workers)
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - depende do ambiente
+    redis = None
+
+
+# "20/60" -> capacidade de 20 requisições, reabastecida a cada 60 segundos
+def parse_limit(limit: str) -> Tuple[int, float]:
+    capacity, _, period = limit.partition("/")
+    return int(capacity), float(period or 60)
+
+
+# Token bucket em memória: serve para um único processo. Os buckets menos
+# usados são descartados quando passam de max_keys
+class MemoryRateLimitStore:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Retorna 0 se a requisição pode passar, senão os segundos até o próximo token
+    async def consume(
+        self, key: str, capacity: int, period: float, now: Optional[float] = None
+    ) -> float:
+        now = time.monotonic() if now is None else now
+        rate = capacity / period
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+# O mesmo algoritmo, atômico no Redis, para compartilhar os limites entre workers
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = capacity / period
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(period))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitStore:
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORE_URL requer o pacote redis")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def consume(
+        self, key: str, capacity: int, period: float, now: Optional[float] = None
+    ) -> float:
+        now = time.time() if now is None else now
+        result = await self._script(
+            keys=[self.prefix + key], args=[capacity, period, now]
+        )
+        return float(result)
+
+
+def get_rate_limit_store(url: Optional[str] = RATE_LIMIT_STORE_URL):
+    if url:
+        return RedisRateLimitStore(url)
+    return MemoryRateLimitStore()
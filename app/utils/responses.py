@@ -0,0 +1,26 @@
+from typing import Any, Iterable
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+# Valida os objetos do ORM e gera o JSON direto no pydantic-core (Rust), sem
+# dicts intermediários nem o json da biblioteca padrão
+def json_list_response(adapter: TypeAdapter, items: Iterable[Any]) -> Response:
+    models = adapter.validate_python(items, from_attributes=True)
+    return Response(content=adapter.dump_json(models), media_type="application/json")
+
+
+# Envolve uma listagem já serializada em {"items": [...], "total": ...}, sem
+# desserializar os itens de novo
+def paginated_response(
+    response: Response, total: int, total_exact: bool, skip: int, limit: int
+) -> Response:
+    page = {
+        "items": orjson.Fragment(response.body),
+        "total": total,
+        "total_exact": total_exact,
+        "skip": skip,
+        "limit": limit,
+    }
+    return Response(content=orjson.dumps(page), media_type="application/json")
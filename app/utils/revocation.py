@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    TOKEN_REVOCATION_SYNC_SECONDS,
+    TOKEN_VERSION_CACHE_SECONDS,
+)
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+
+
+# Famílias de token revogadas, em memória: get_current_user consulta sem ir ao
+# banco. Cada família só precisa ficar aqui enquanto um access token emitido
+# antes da revogação ainda pode estar válido. Revogações feitas por outros
+# workers chegam por uma consulta incremental a cada sync_seconds.
+class RevocationList:
+    def __init__(
+        self,
+        ttl_seconds: float = ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        sync_seconds: float = TOKEN_REVOCATION_SYNC_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.sync_seconds = sync_seconds
+        self._families = {}
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._synced_until = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+
+    def revoke(self, family_id: str):
+        with self._lock:
+            self._families[family_id] = time.monotonic() + self.ttl_seconds
+
+    def is_revoked(self, family_id: str) -> bool:
+        expires = self._families.get(family_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            self._families.pop(family_id, None)
+            return False
+        return True
+
+    # No máximo uma consulta por intervalo, e só das revogações novas
+    def sync(self, db: Session, force: bool = False):
+        now = time.monotonic()
+        if not force and now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_seconds
+
+        # Margem para transações que gravaram revoked_at antes de commitar
+        since = self._synced_until - timedelta(seconds=2 * self.sync_seconds)
+        rows = db.execute(
+            select(RefreshToken.family_id, func.max(RefreshToken.revoked_at))
+            .where(RefreshToken.revoked_at > since)
+            .group_by(RefreshToken.family_id)
+        ).all()
+        with self._lock:
+            for family_id, revoked_at in rows:
+                self._families[family_id] = now + self.ttl_seconds
+                self._synced_until = max(self._synced_until, revoked_at)
+            for family_id, expires in list(self._families.items()):
+                if expires < now:
+                    del self._families[family_id]
+
+
+revoked_families = RevocationList()
+
+
+# Versão atual dos tokens de cada usuário, com validade curta: rebaixar um
+# admin (ou excluir a conta) derruba os tokens antigos em até ttl_seconds
+class TokenVersionCache:
+    def __init__(
+        self, ttl_seconds: float = TOKEN_VERSION_CACHE_SECONDS, max_entries=100_000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._versions = {}
+
+    def get(self, db: Session, user_id: int) -> Optional[int]:
+        now = time.monotonic()
+        cached = self._versions.get(user_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        version = db.execute(
+            select(User.token_version).where(User.id == user_id)
+        ).scalar()
+        if len(self._versions) >= self.max_entries:
+            self._versions.clear()
+        self._versions[user_id] = (version, now + self.ttl_seconds)
+        return version
+
+    def invalidate(self, user_id: int):
+        self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersionCache()
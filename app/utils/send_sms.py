@@ -1,15 +1,32 @@
 import os
 from twilio.rest import Client
+from app.core.config import TWILIO_FAKE, TWILIO_FAKE_ERROR_RATE, TWILIO_FAKE_LATENCY_MS
+from app.utils.fake_twilio import FakeTwilioClient
+from app.utils.metrics import WHATSAPP_SEND_DURATION, WHATSAPP_SEND_FAILURES
 
 twilio_sid = os.getenv("TWILIO_ACCOUNT_SID")
 twilio_token = os.getenv("TWILIO_AUTH_TOKEN")
 twilio_whatsapp_from = "whatsapp:+14155238886"
 
-client = Client(twilio_sid, twilio_token)
+# TWILIO_FAKE=true troca o cliente real por um local (testes de carga offline)
+if TWILIO_FAKE:
+    client = FakeTwilioClient(
+        twilio_sid,
+        twilio_token,
+        latency_ms=TWILIO_FAKE_LATENCY_MS,
+        error_rate=TWILIO_FAKE_ERROR_RATE,
+    )
+else:
+    client = Client(twilio_sid, twilio_token)
 
 
 def send_whatsapp_message(to_number: str, message: str):
-    message = client.messages.create(
-        body=message, from_=twilio_whatsapp_from, to=f"whatsapp:{to_number}"
-    )
+    with WHATSAPP_SEND_DURATION.time():
+        try:
+            message = client.messages.create(
+                body=message, from_=twilio_whatsapp_from, to=f"whatsapp:{to_number}"
+            )
+        except Exception:
+            WHATSAPP_SEND_FAILURES.inc()
+            raise
     return message.sid
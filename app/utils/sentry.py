@@ -1,12 +1,80 @@
-import os
-from dotenv import load_dotenv
+import re
+import time
 import sentry_sdk
+from app.core.config import (
+    SENTRY_DSN,
+    SENTRY_SEND_DEFAULT_PII,
+    SENTRY_TRACES_SAMPLE_RATE,
+    SENTRY_TRACES_HOT_SAMPLE_RATE,
+    SENTRY_BOOST_SECONDS,
+)
 
-load_dotenv()
+# Rotas GET muito acessadas e baratas: amostradas com taxa bem menor
+HOT_ROUTES = (
+    re.compile(r"^/products/?$"),
+    re.compile(r"^/products/images/"),
+)
 
-def init_sentry():
-    sentry_sdk.init(
-        dsn=os.getenv("SENTRY_DSN"),
-        send_default_pii=True,
-        traces_sample_rate=1.0
-    )
\ No newline at end of file
+# Rotas que nunca geram trace
+IGNORED_ROUTES = ("/metrics",)
+
+# Limite de rotas em boost para não crescer sem controle
+MAX_BOOSTED_ROUTES = 1000
+
+# Rotas que tiveram erro ou lentidão recente -> amostradas em 100% até o prazo
+_boosted_until: dict[str, float] = {}
+
+
+# Normaliza o caminho trocando segmentos com números (IDs, nomes de arquivo) por "*"
+def route_key(method: str, path: str) -> str:
+    segments = [
+        "*" if any(c.isdigit() for c in segment) else segment
+        for segment in path.rstrip("/").split("/")
+    ]
+    return f"{method} {'/'.join(segments) or '/'}"
+
+
+# Marca a rota para ser amostrada integralmente por um tempo (erro ou lentidão)
+def boost_route(method: str, path: str, seconds: int = SENTRY_BOOST_SECONDS):
+    if len(_boosted_until) >= MAX_BOOSTED_ROUTES:
+        _boosted_until.clear()
+    _boosted_until[route_key(method, path)] = time.monotonic() + seconds
+
+
+def is_route_boosted(method: str, path: str) -> bool:
+    until = _boosted_until.get(route_key(method, path))
+    return until is not None and until > time.monotonic()
+
+
+# Decide a taxa de amostragem de cada transação pelo método e rota
+def traces_sampler(sampling_context: dict) -> float:
+    # Mantém a decisão de quem iniciou o trace (trace distribuído)
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        return float(parent_sampled)
+
+    scope = sampling_context.get("asgi_scope") or {}
+    path = scope.get("path", "")
+    method = scope.get("method", "GET")
+
+    if path in IGNORED_ROUTES:
+        return 0.0
+    if is_route_boosted(method, path):
+        return 1.0
+    if method == "GET" and any(pattern.match(path) for pattern in HOT_ROUTES):
+        return SENTRY_TRACES_HOT_SAMPLE_RATE
+    return SENTRY_TRACES_SAMPLE_RATE
+
+
+def build_sentry_options(**overrides) -> dict:
+    options = {
+        "dsn": SENTRY_DSN,
+        "send_default_pii": SENTRY_SEND_DEFAULT_PII,
+        "traces_sampler": traces_sampler,
+    }
+    options.update(overrides)
+    return options
+
+
+def init_sentry(**overrides):
+    sentry_sdk.init(**build_sentry_options(**overrides))
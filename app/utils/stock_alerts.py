@@ -0,0 +1,48 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from app.core.config import ALERT_SCAN_INTERVAL_SECONDS
+from app.services.alert_service import scan_stock_alerts
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+engine = create_engine(DATABASE_URL)
+
+
+def scan():
+    session = Session(bind=engine)
+    try:
+        result = scan_stock_alerts(session)
+    finally:
+        session.close()
+    print(
+        f"{len(result['low_stock'])} produtos com estoque baixo, "
+        f"{len(result['expiring'])} vencendo, {result['messages']} mensagens."
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] not in ("--once", "--interval"):
+        print("Uso: python stock_alerts.py [--once | --interval SEGUNDOS]")
+        sys.exit(1)
+
+    if "--once" in sys.argv:
+        scan()
+        sys.exit(0)
+
+    interval = ALERT_SCAN_INTERVAL_SECONDS
+    if "--interval" in sys.argv:
+        interval = int(sys.argv[sys.argv.index("--interval") + 1])
+    while True:
+        try:
+            scan()
+        except Exception as exc:
+            print(f"Falha na varredura de alertas: {exc}")
+        time.sleep(interval)
@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from app.core.config import STOCK_LEDGER_RETENTION_DAYS
+from app.services.stock_service import compact_movements, reconcile_stock
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+engine = create_engine(DATABASE_URL)
+
+
+# Compacta o livro de estoque; com intervalo, roda periodicamente
+def compact(retention_days: int, interval: int = 0):
+    while True:
+        session = Session(bind=engine)
+        try:
+            removed = compact_movements(session, retention_days)
+        finally:
+            session.close()
+        print(
+            f"{removed} movimentações compactadas (mais antigas que {retention_days} dias)."
+        )
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+# Lista produtos com estoque divergente do livro; sai com código 1 se houver
+def reconcile() -> int:
+    session = Session(bind=engine)
+    try:
+        drifts = reconcile_stock(session)
+    finally:
+        session.close()
+
+    for drift in drifts:
+        print(
+            f"Produto {drift['product_id']}: estoque {drift['stock']}, "
+            f"livro {drift['ledger_stock']} (diferença {drift['drift']})"
+        )
+    if not drifts:
+        print("Estoque e livro de movimentações conferem.")
+    return 1 if drifts else 0
+
+
+if __name__ == "__main__":
+    usage = (
+        "Uso: python stock_ledger.py compact [dias] [--interval SEGUNDOS]\n"
+        "     python stock_ledger.py reconcile"
+    )
+    args = sys.argv[1:]
+    if not args or args[0] not in ("compact", "reconcile"):
+        print(usage)
+        sys.exit(1)
+
+    if args[0] == "reconcile":
+        sys.exit(reconcile())
+
+    interval = 0
+    if "--interval" in args:
+        position = args.index("--interval")
+        interval = int(args[position + 1])
+        del args[position : position + 2]
+    retention_days = int(args[1]) if len(args) > 1 else STOCK_LEDGER_RETENTION_DAYS
+    compact(retention_days, interval)
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
 from app.db.database import Base
 from app.models.user_model import User
+from app.services.auth_service import toggle_admin
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,8 +24,8 @@ def toggle_admin_status(user_identifier: str):
         print(f"Usuário '{user_identifier}' não encontrado.")
         return
 
-    user.is_admin = 0 if user.is_admin == 1 else 1
-    session.commit()
+    # Também incrementa a versão dos tokens: o papel antigo deixa de valer
+    toggle_admin(session, user)
     status = "admin" if user.is_admin == 1 else "usuário normal"
     print(f"Usuário '{user_identifier}' agora é {status}.")
 
@@ -2,9 +2,11 @@
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional
+from sqlalchemy import case, select, update
 from app.models.product_model import Product
 from app.schemas.order_schema import OrderProductBase
+from app.services.stock_service import record_movements
 
 
 def validate_stock(db: Session, items: List[OrderProductBase]):
@@ -25,19 +27,53 @@ def validate_stock(db: Session, items: List[OrderProductBase]):
             )
 
 
-def adjust_stock(db: Session, product_id: int, quantity_change: int):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(
-            status_code=404, detail=f"Produto {product_id} não encontrado"
-        )
+# Aplica a variação de estoque de vários produtos em um único UPDATE condicional:
+# nenhum produto pode ficar com estoque negativo, mesmo com pedidos concorrentes.
+# As movimentações vão para o livro de estoque e o UPDATE é o último comando
+# antes do commit, para segurar o lock da linha do produto o mínimo possível.
+def apply_stock_deltas(
+    db: Session,
+    stock_deltas: Dict[int, int],
+    reason: str,
+    order_id: Optional[int] = None,
+):
+    deltas = {product_id: delta for product_id, delta in stock_deltas.items() if delta}
+    if not deltas:
+        return
+
+    record_movements(db, deltas, reason, order_id)
+    new_stock = Product.stock + case(deltas, value=Product.id)
+    result = db.execute(
+        update(Product)
+        .where(Product.id.in_(deltas), new_stock >= 0)
+        .values(stock=new_stock)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(deltas):
+        return
 
-    new_stock = product.stock + quantity_change
-    if new_stock < 0:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Estoque insuficiente para produto {product.description}",
+    # Caminho de erro: descobre qual produto faltou ou ficaria negativo. O
+    # rollback vem antes da leitura, senão ela veria o estoque dos produtos
+    # que o UPDATE já baixou e somaria a variação duas vezes
+    db.rollback()
+    rows = db.execute(
+        select(Product.id, Product.description, Product.stock).where(
+            Product.id.in_(deltas)
         )
+    ).all()
+    db.rollback()
 
-    product.stock = new_stock
-    db.add(product)
+    found = {row.id: row for row in rows}
+    for product_id in deltas:
+        if product_id not in found:
+            raise HTTPException(
+                status_code=404, detail=f"Produto {product_id} não encontrado"
+            )
+    for product_id, delta in deltas.items():
+        product = found[product_id]
+        if product.stock + delta < 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Estoque insuficiente para produto {product.description}",
+            )
+    raise HTTPException(status_code=409, detail="Estoque alterado durante a operação")